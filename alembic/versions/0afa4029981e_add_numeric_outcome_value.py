@@ -0,0 +1,48 @@
+"""add numeric outcome value
+
+Revision ID: 0afa4029981e
+Revises: b94d612fa042
+Create Date: 2026-10-19 17:29:18.644689
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0afa4029981e'
+down_revision: Union[str, Sequence[str], None] = 'b94d612fa042'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outcome', sa.Column('outcome_numeric', sa.Float(), nullable=True))
+
+    # Backfill using the same rules as OutcomeRepository.parse_outcome_value:
+    # "a/b" fractions and "85%" percentages are scaled to the type's range (100 for
+    # exams, 10 for ratings), otherwise the leading number ("8", "7 - decent") is used.
+    op.execute(r"""
+        UPDATE outcome SET outcome_numeric = CASE
+            WHEN outcome_value ~ '^\s*-?\d+(\.\d+)?\s*/\s*\d+(\.\d+)?\s*$'
+                 AND split_part(outcome_value, '/', 2)::float > 0
+            THEN split_part(outcome_value, '/', 1)::float / split_part(outcome_value, '/', 2)::float
+                 * (CASE WHEN outcome_type = 'exam_score' THEN 100 ELSE 10 END)
+            WHEN outcome_value ~ '^\s*-?\d+(\.\d+)?\s*%'
+            THEN substring(outcome_value from '^\s*(-?\d+(?:\.\d+)?)')::float / 100
+                 * (CASE WHEN outcome_type = 'exam_score' THEN 100 ELSE 10 END)
+            ELSE substring(outcome_value from '^\s*(-?\d+(?:\.\d+)?)')::float
+        END
+        WHERE outcome_value IS NOT NULL
+    """)
+
+    op.create_index('ix_outcome_user_type_date', 'outcome', ['user_id', 'outcome_type', 'date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outcome_user_type_date', table_name='outcome')
+    op.drop_column('outcome', 'outcome_numeric')
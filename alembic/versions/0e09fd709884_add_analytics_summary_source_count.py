@@ -0,0 +1,30 @@
+"""add analytics_summary source_count
+
+Revision ID: 0e09fd709884
+Revises: 620e26674cd1
+Create Date: 2026-10-19 18:08:22.445087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e09fd709884'
+down_revision: Union[str, Sequence[str], None] = '620e26674cd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('analytics_summary', sa.Column('source_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('analytics_summary', 'source_count')
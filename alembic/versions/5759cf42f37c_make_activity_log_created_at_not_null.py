@@ -0,0 +1,32 @@
+"""make activity log created_at not null
+
+Revision ID: 5759cf42f37c
+Revises: c4459449dd15
+Create Date: 2026-10-19 18:26:49.594664
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5759cf42f37c'
+down_revision: Union[str, Sequence[str], None] = 'c4459449dd15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pages order by (created_at, log_id) and cannot reach rows without a
+    # created_at; logs written without one are dated by their activity date
+    op.execute("UPDATE activity_log SET created_at = date WHERE created_at IS NULL")
+    op.alter_column('activity_log', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('activity_log', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,122 @@
+"""partition chat_message by month
+
+Revision ID: 620e26674cd1
+Revises: 80748a6b7621
+Create Date: 2026-10-19 18:04:38.268104
+
+Downtime: the upgrade renames chat_message and copies every row into the new
+partitioned table in one transaction, holding an ACCESS EXCLUSIVE lock on the
+table until it commits. Chat reads and writes block for the whole copy, which
+takes minutes on tens of millions of rows. Run it in a maintenance window. To
+shorten the copy, first archive old months with `python -m backend.db.chat_partitions`
+(after this revision) or delete chat rows you are not keeping.
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '620e26674cd1'
+down_revision: Union[str, Sequence[str], None] = '80748a6b7621'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Monthly partitions are created up to this many months past the current one;
+# backend.db.chat_partitions keeps extending them afterwards
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The existing table is swapped for a partitioned one and its rows copied
+    # over in this transaction; the message id sequence is kept. The rename
+    # locks chat_message exclusively until the copy commits (see the header).
+    op.execute('ALTER TABLE chat_message RENAME TO chat_message_unpartitioned')
+    op.execute('ALTER TABLE chat_message_unpartitioned RENAME CONSTRAINT chat_message_pkey TO chat_message_unpartitioned_pkey')
+    op.execute('ALTER INDEX IF EXISTS ix_chat_message_user_timestamp RENAME TO ix_chat_message_unpartitioned_user_timestamp')
+    op.execute('ALTER SEQUENCE chat_message_message_id_seq OWNED BY NONE')
+    op.execute("""
+        CREATE TABLE chat_message (
+            message_id INTEGER NOT NULL DEFAULT nextval('chat_message_message_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES "user"(user_id),
+            role VARCHAR(10) NOT NULL,
+            content TEXT NOT NULL,
+            "timestamp" TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (message_id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute('ALTER SEQUENCE chat_message_message_id_seq OWNED BY chat_message.message_id')
+    op.create_index('ix_chat_message_user_timestamp', 'chat_message', ['user_id', 'timestamp'], unique=False)
+
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text('SELECT min("timestamp") FROM chat_message_unpartitioned')).scalar()
+    current = datetime.utcnow().date().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE chat_message_y{month.year:04d}m{month.month:02d} PARTITION OF chat_message "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute('CREATE TABLE chat_message_default PARTITION OF chat_message DEFAULT')
+
+    # Messages saved without a timestamp are placed in the current month
+    op.execute("""
+        INSERT INTO chat_message (message_id, user_id, role, content, "timestamp")
+        SELECT message_id, user_id, role, content, COALESCE("timestamp", now() AT TIME ZONE 'utc')
+        FROM chat_message_unpartitioned
+    """)
+    op.execute('DROP TABLE chat_message_unpartitioned')
+
+    op.create_table('chat_message_archive',
+    sa.Column('archive_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('first_message_at', sa.DateTime(), nullable=False),
+    sa.Column('last_message_at', sa.DateTime(), nullable=False),
+    sa.Column('messages', sa.LargeBinary(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('archive_id')
+    )
+    op.create_index('ix_chat_message_archive_user_month', 'chat_message_archive', ['user_id', 'month'], unique=False)
+    # Payloads are already gzip-compressed; store them out of line without recompressing
+    op.execute('ALTER TABLE chat_message_archive ALTER COLUMN messages SET STORAGE EXTERNAL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Messages already moved to chat_message_archive are not restored
+    op.drop_index('ix_chat_message_archive_user_month', table_name='chat_message_archive')
+    op.drop_table('chat_message_archive')
+
+    op.execute('ALTER TABLE chat_message RENAME TO chat_message_partitioned')
+    op.execute('ALTER INDEX ix_chat_message_user_timestamp RENAME TO ix_chat_message_partitioned_user_timestamp')
+    op.execute('ALTER TABLE chat_message_partitioned RENAME CONSTRAINT chat_message_pkey TO chat_message_partitioned_pkey')
+    op.execute('ALTER SEQUENCE chat_message_message_id_seq OWNED BY NONE')
+    op.execute("""
+        CREATE TABLE chat_message (
+            message_id INTEGER NOT NULL DEFAULT nextval('chat_message_message_id_seq') PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES "user"(user_id),
+            role VARCHAR(10) NOT NULL,
+            content TEXT NOT NULL,
+            "timestamp" TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute('ALTER SEQUENCE chat_message_message_id_seq OWNED BY chat_message.message_id')
+    op.execute("""
+        INSERT INTO chat_message (message_id, user_id, role, content, "timestamp")
+        SELECT message_id, user_id, role, content, "timestamp" FROM chat_message_partitioned
+    """)
+    op.execute('DROP TABLE chat_message_partitioned')
+    op.create_index('ix_chat_message_user_timestamp', 'chat_message', ['user_id', 'timestamp'], unique=False)
@@ -0,0 +1,40 @@
+"""rescale percentage outcome values
+
+Revision ID: 7818205ecd07
+Revises: 0e09fd709884
+Create Date: 2026-10-19 18:23:08.804850
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7818205ecd07'
+down_revision: Union[str, Sequence[str], None] = '0e09fd709884'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+# "85%" outcome values; only these change between the old and new parsing rules
+PERCENT_ROWS = r"outcome_value ~ '^\s*-?\d+(\.\d+)?\s*%'"
+LEADING_NUMBER = r"substring(outcome_value from '^\s*(-?\d+(?:\.\d+)?)')::float"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases that ran 0afa4029981e before percentages were scaled stored 85 for
+    # an "85%" rating; rescale them like OutcomeRepository.parse_outcome_value
+    op.execute(f"""
+        UPDATE outcome
+        SET outcome_numeric = {LEADING_NUMBER} / 100
+            * (CASE WHEN outcome_type = 'exam_score' THEN 100 ELSE 10 END)
+        WHERE {PERCENT_ROWS}
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"UPDATE outcome SET outcome_numeric = {LEADING_NUMBER} WHERE {PERCENT_ROWS}")
@@ -0,0 +1,39 @@
+"""add habit risk score table
+
+Revision ID: 7d91d69d7aa8
+Revises: e15ed9e490f6
+Create Date: 2026-10-19 17:42:23.051131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d91d69d7aa8'
+down_revision: Union[str, Sequence[str], None] = 'e15ed9e490f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('habit_risk_score',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('risk', sa.Float(), nullable=True),
+    sa.Column('inputs', sa.JSON(), nullable=True),
+    sa.Column('stale', sa.Boolean(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('habit_risk_score')
@@ -0,0 +1,55 @@
+"""add per-user time indexes
+
+Revision ID: 80748a6b7621
+Revises: b6ca690162d6
+Create Date: 2026-10-19 17:56:35.066816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80748a6b7621'
+down_revision: Union[str, Sequence[str], None] = 'b6ca690162d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) for the per-user queries that filter by user and order by time
+INDEXES = [
+    ('ix_activity_log_user_date', 'activity_log', ['user_id', 'date']),
+    ('ix_activity_log_user_created', 'activity_log', ['user_id', 'created_at']),
+    ('ix_chat_message_user_timestamp', 'chat_message', ['user_id', 'timestamp']),
+    ('ix_analytics_summary_user_generated', 'analytics_summary', ['user_id', 'generated_at']),
+    ('ix_outcome_user_date', 'outcome', ['user_id', 'date']),
+]
+# Same columns under the names backend/db/schema.sql used before, dropped so databases
+# created from it do not keep two copies
+LEGACY_INDEXES = [
+    ('idx_activity_log_user_date', 'activity_log', ['user_id', 'date']),
+    ('idx_outcome_user_date', 'outcome', ['user_id', 'date']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; it builds without
+    # blocking writes. A failed build leaves an INVALID index that must be dropped
+    # before re-running.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in LEGACY_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        # Restore the legacy indexes first so the tables are never left without one
+        for name, table, columns in LEGACY_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""add behavior_flag table
+
+Revision ID: b6ca690162d6
+Revises: 7d91d69d7aa8
+Create Date: 2026-10-19 17:48:50.855870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6ca690162d6'
+down_revision: Union[str, Sequence[str], None] = '7d91d69d7aa8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('behavior_flag',
+    sa.Column('flag_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('metric', sa.String(length=30), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('severity', sa.Float(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.Column('detected_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('flag_id')
+    )
+    op.create_index('ix_behavior_flag_user_end', 'behavior_flag', ['user_id', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_behavior_flag_user_end', table_name='behavior_flag')
+    op.drop_table('behavior_flag')
@@ -0,0 +1,37 @@
+"""add routine centroid
+
+Revision ID: c4459449dd15
+Revises: 7818205ecd07
+Create Date: 2026-10-19 18:25:07.145028
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4459449dd15'
+down_revision: Union[str, Sequence[str], None] = '7818205ecd07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('routine_centroid',
+    sa.Column('cluster', sa.Integer(), nullable=False),
+    sa.Column('centroid', sa.JSON(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('trained_from', sa.String(length=40), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('cluster')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('routine_centroid')
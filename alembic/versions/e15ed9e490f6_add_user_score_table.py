@@ -0,0 +1,42 @@
+"""add user score table
+
+Revision ID: e15ed9e490f6
+Revises: 0afa4029981e
+Create Date: 2026-10-19 17:35:07.477608
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e15ed9e490f6'
+down_revision: Union[str, Sequence[str], None] = '0afa4029981e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_score',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period_days', sa.Integer(), nullable=False),
+    sa.Column('productivity_score', sa.Float(), nullable=True),
+    sa.Column('study_performance', sa.Float(), nullable=True),
+    sa.Column('habit_risk', sa.Float(), nullable=True),
+    sa.Column('routine_cluster', sa.Integer(), nullable=True),
+    sa.Column('routine_label', sa.String(length=50), nullable=True),
+    sa.Column('features', sa.JSON(), nullable=True),
+    sa.Column('scored_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_score')
@@ -52,6 +52,10 @@ class ReasoningAgent:
             
             Current Analytics:
             - Activity Distribution: {distribution}
+            - Goal Alignment Score (0-100, computed from focus areas vs logged time): {alignment}
+            - Under-served Focus Categories: {neglected}
+            - Routine Archetype (last 7 days, from the routine clustering model): {routine}
+            - Detected Burnout/Recovery/Anomaly Periods (last 14 days, statistical flags): {flags}
             - Recent Outcomes: {outcomes}
 
             Historical Context (Past Insights):
@@ -72,6 +76,10 @@ class ReasoningAgent:
             "goal": user_profile.get("primary_goal"),
             "focus": user_profile.get("focus_areas"),
             "distribution": analytics.get("activity_distribution"),
+            "alignment": analytics.get("goal_alignment_score", "Not available"),
+            "neglected": analytics.get("neglected_categories") or "None",
+            "routine": analytics.get("routine_label") or "Not available",
+            "flags": analytics.get("behavior_flags") or "None",
             "outcomes": analytics.get("recent_outcomes"),
             "history": history_text,
             "query": user_profile.get("user_query", "No specific query provided."),
@@ -0,0 +1,102 @@
+import re
+from typing import Dict, Any, List, Optional
+
+from backend.models import ActivityCategory
+
+CATEGORIES = [c.value for c in ActivityCategory]
+
+# Keywords that map free-text focus areas / priorities onto activity categories
+CATEGORY_KEYWORDS = {
+    "Academic": ["academic", "study", "studies", "learning", "learn", "research", "school", "exam", "university", "college", "education", "course", "homework"],
+    "Work": ["work", "career", "job", "coding", "programming", "business", "project", "productivity", "startup", "deep work", "meeting"],
+    "Health": ["health", "fitness", "exercise", "workout", "gym", "sleep", "wellness", "meditation", "mental", "running", "diet"],
+    "Leisure": ["leisure", "fun", "hobby", "hobbies", "relax", "rest", "social", "games", "gaming", "travel", "music"],
+    "Personal": ["personal", "family", "reading", "self", "growth", "finance", "mindfulness", "journaling", "relationships"],
+}
+
+# Whole-word patterns (a trailing plural "s" allowed), longest and multi-word
+# keywords first so "deep work" or "workout" wins over a generic "work"
+_KEYWORD_PATTERNS = [
+    (re.compile(rf"\b{re.escape(k)}s?\b"), cat)
+    for k, cat in sorted(
+        ((k, cat) for cat, keywords in CATEGORY_KEYWORDS.items() for k in keywords),
+        key=lambda kc: (-len(kc[0].split()), -len(kc[0]))
+    )
+]
+
+
+def map_to_category(area: str) -> Optional[str]:
+    """
+    Maps a focus area such as "Fitness" or "Learning" to an ActivityCategory value.
+    """
+    text = (area or "").strip().lower()
+    if not text:
+        return None
+    for cat in CATEGORIES:
+        if text == cat.lower():
+            return cat
+    for pattern, cat in _KEYWORD_PATTERNS:
+        if pattern.search(text):
+            return cat
+    return None
+
+
+def target_distribution(focus_areas: Optional[List[str]], priority_order: Optional[List[str]]) -> Dict[str, float]:
+    """
+    Turns focus areas and priority order into target time shares per category.
+    Ranked areas get linearly decreasing weights; unranked focus areas share the lowest rank.
+    """
+    ranked = [a for a in (priority_order or []) if isinstance(a, str)]
+    unranked = [a for a in (focus_areas or []) if isinstance(a, str) and a not in ranked]
+    n = len(ranked) + (1 if unranked else 0)
+
+    weights: Dict[str, float] = {}
+    for i, area in enumerate(ranked):
+        cat = map_to_category(area)
+        if cat:
+            weights[cat] = weights.get(cat, 0.0) + (n - i)
+    for area in unranked:
+        cat = map_to_category(area)
+        if cat:
+            weights[cat] = weights.get(cat, 0.0) + 1.0 / len(unranked)
+
+    total = sum(weights.values())
+    if not total:
+        return {}
+    return {cat: w / total for cat, w in weights.items()}
+
+
+def score_alignment(
+    focus_areas: Optional[List[str]],
+    priority_order: Optional[List[str]],
+    activity_distribution: Dict[str, int]
+) -> Dict[str, Any]:
+    """
+    Compares logged minutes per category against the targets implied by the profile.
+    The score (0-100) is the overlap between the target and actual time shares.
+    Returns None for the score when the profile has no mappable focus areas or nothing is logged.
+    """
+    targets = target_distribution(focus_areas, priority_order)
+    total_minutes = sum(activity_distribution.values()) if activity_distribution else 0
+
+    balance = {}
+    overlap = 0.0
+    for cat in CATEGORIES:
+        minutes = (activity_distribution or {}).get(cat, 0)
+        share = minutes / total_minutes if total_minutes else 0.0
+        target = targets.get(cat, 0.0)
+        overlap += min(share, target)
+        balance[cat] = {
+            "minutes": minutes,
+            "share": round(share, 3),
+            "target_share": round(target, 3),
+            "gap": round(share - target, 3)
+        }
+
+    score = round(overlap * 100, 1) if targets and total_minutes else None
+    neglected = [cat for cat in CATEGORIES if balance[cat]["target_share"] > 0 and balance[cat]["gap"] < -0.15]
+    return {
+        "score": score,
+        "balance": balance,
+        "neglected_categories": neglected
+    }
@@ -0,0 +1,329 @@
+"""
+Burnout, recovery and anomaly detection over daily activity series.
+
+Daily minutes, average energy and completion ratio are laid out as users x days
+matrices and scored in one pass with NumPy:
+  - trailing z-scores against each user's previous BASELINE_DAYS days
+  - mean-shift changepoints (last SHIFT_DAYS vs the BASELINE_DAYS before them)
+Runs of flagged days become periods stored in behavior_flag for the agents.
+
+Runs per write for one user (POST /api/activities/log) and in batch for everyone:
+    python -m backend.analytics.anomalies --chunk-size 1000
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, case, text
+from sqlalchemy.orm import Session
+
+from backend.db.connection import SessionLocal
+from backend.db.repositories.behavior_flag_repo import BehaviorFlagRepository
+from backend.models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+METRICS = ["minutes", "energy", "completion"]
+DETECTION_DAYS = 60
+BASELINE_DAYS = 14
+MIN_BASELINE_SAMPLES = 5
+SHIFT_DAYS = 7
+
+# Below these spreads a change is not meaningful even if the baseline is perfectly flat
+STD_FLOOR = {"minutes": 15.0, "energy": 0.5, "completion": 0.1}
+
+ANOMALY_Z = 3.0
+SHIFT_T = 3.0
+BURNOUT_MINUTES_Z = 1.0
+BURNOUT_DECLINE_Z = -1.0
+RECOVERY_MINUTES_Z = -0.5
+RECOVERY_ENERGY_Z = 0.5
+MIN_RUN_DAYS = 3
+
+
+def load_daily_matrices(
+    db: Session, start: datetime, days: int, user_ids: Optional[List[int]] = None
+) -> Tuple[np.ndarray, pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """
+    One aggregated query, returned as users x days matrices per metric. Days without
+    logs (and days without energy ratings, for energy) are NaN, so baselines only
+    describe days the user actually logged.
+    """
+    day = func.date_trunc("day", ActivityLog.date)
+    query = db.query(
+        ActivityLog.user_id,
+        day.label("day"),
+        func.coalesce(func.sum(ActivityLog.duration_minutes), 0).label("minutes"),
+        func.avg(ActivityLog.energy_level).label("energy"),
+        func.count(ActivityLog.log_id).label("logs"),
+        func.sum(case((ActivityLog.completed == True, 1), else_=0)).label("completed"),
+    ).filter(ActivityLog.date >= start, ActivityLog.date < start + timedelta(days=days))
+    if user_ids is not None:
+        query = query.filter(ActivityLog.user_id.in_(user_ids))
+    rows = query.group_by(ActivityLog.user_id, day).all()
+
+    dates = pd.date_range(start, periods=days, freq="D")
+    users = np.array(sorted(set(user_ids or []) | {r.user_id for r in rows}), dtype=np.int64)
+    matrices = {
+        "minutes": np.full((len(users), days), np.nan),
+        "energy": np.full((len(users), days), np.nan),
+        "completion": np.full((len(users), days), np.nan),
+    }
+    if rows:
+        raw = np.array([
+            (r.user_id, (r.day - start).days, float(r.minutes), np.nan if r.energy is None else float(r.energy),
+             float(r.completed) / r.logs if r.logs else np.nan)
+            for r in rows
+        ])
+        row_idx = np.searchsorted(users, raw[:, 0].astype(np.int64))
+        col_idx = raw[:, 1].astype(np.int64)
+        matrices["minutes"][row_idx, col_idx] = raw[:, 2]
+        matrices["energy"][row_idx, col_idx] = raw[:, 3]
+        matrices["completion"][row_idx, col_idx] = raw[:, 4]
+    return users, dates, matrices
+
+
+def _window_sums(X: np.ndarray):
+    """
+    Prefix sums of count, sum and sum of squares over the non-NaN entries of each row.
+    """
+    valid = ~np.isnan(X)
+    values = np.where(valid, X, 0.0)
+    pad = ((0, 0), (1, 0))
+    return (
+        np.pad(np.cumsum(valid, axis=1), pad).astype(np.float64),
+        np.pad(np.cumsum(values, axis=1), pad),
+        np.pad(np.cumsum(values ** 2, axis=1), pad),
+    )
+
+
+def _window_stats(sums, lo: np.ndarray, hi: np.ndarray):
+    """
+    Count, mean and sample variance over columns [lo, hi) for every row.
+    """
+    count_cs, sum_cs, sq_cs = sums
+    n = count_cs[:, hi] - count_cs[:, lo]
+    total = sum_cs[:, hi] - sum_cs[:, lo]
+    squares = sq_cs[:, hi] - sq_cs[:, lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / n
+        var = np.maximum(squares - n * mean ** 2, 0.0) / (n - 1)
+    return n, mean, var
+
+
+def rolling_zscores(X: np.ndarray, metric: str, window: int = BASELINE_DAYS) -> np.ndarray:
+    """
+    z-score of each day against the previous `window` days of the same user (NaN when
+    the baseline has fewer than MIN_BASELINE_SAMPLES values).
+    """
+    days = X.shape[1]
+    idx = np.arange(days)
+    n, mean, var = _window_stats(_window_sums(X), np.maximum(idx - window, 0), idx)
+    std = np.maximum(np.sqrt(var), STD_FLOOR[metric])
+    with np.errstate(invalid="ignore"):
+        z = (X - mean) / std
+    z[n < MIN_BASELINE_SAMPLES] = np.nan
+    return z
+
+
+def shift_scores(X: np.ndarray, metric: str, recent: int = SHIFT_DAYS, baseline: int = BASELINE_DAYS):
+    """
+    Welch t-statistic of the mean of the last `recent` days against the `baseline`
+    days before them, for every end day. Returns (t, recent_mean, baseline_mean).
+    """
+    days = X.shape[1]
+    idx = np.arange(days) + 1
+    sums = _window_sums(X)
+    split = np.maximum(idx - recent, 0)
+    n_r, mean_r, var_r = _window_stats(sums, split, idx)
+    n_b, mean_b, var_b = _window_stats(sums, np.maximum(split - baseline, 0), split)
+    floor = STD_FLOOR[metric] ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (mean_r - mean_b) / np.sqrt(np.maximum(var_r, floor) / n_r + np.maximum(var_b, floor) / n_b)
+    t[(n_r < 3) | (n_b < MIN_BASELINE_SAMPLES)] = np.nan
+    return t, mean_r, mean_b
+
+
+def find_runs(mask: np.ndarray, min_length: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (row, start, end) of every run of True values at least `min_length` long; end is exclusive.
+    """
+    padded = np.pad(mask.astype(np.int8), ((0, 0), (1, 1)))
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    keep = ends - starts >= min_length
+    return rows[keep], starts[keep], ends[keep]
+
+
+def _run_peaks(values: np.ndarray, rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Largest finite value inside each run.
+    """
+    width = values.shape[1] + 1
+    flat = np.pad(np.nan_to_num(values, nan=-np.inf), ((0, 0), (0, 1)), constant_values=-np.inf).ravel()
+    if not len(rows):
+        return np.zeros(0)
+    bounds = np.column_stack([rows * width + starts, rows * width + ends]).ravel()
+    return np.maximum.reduceat(flat, bounds)[::2]
+
+
+def detect_flags(users: np.ndarray, dates: pd.DatetimeIndex, matrices: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Scores every user at once and returns flagged periods as behavior_flag rows.
+    """
+    z = {m: rolling_zscores(matrices[m], m) for m in METRICS}
+    flags: List[Dict[str, Any]] = []
+
+    def add(kind: str, metric: Optional[str], mask: np.ndarray, score: np.ndarray, min_length: int, details=None):
+        rows, starts, ends = find_runs(mask, min_length)
+        peaks = _run_peaks(score, rows, starts, ends)
+        for i, (r, s, e) in enumerate(zip(rows, starts, ends)):
+            flags.append({
+                "user_id": int(users[r]),
+                "kind": kind,
+                "metric": metric,
+                "start_date": dates[s].date(),
+                "end_date": dates[e - 1].date(),
+                "severity": round(float(peaks[i]), 2),
+                "details": details(r, s, e) if details else None,
+            })
+
+    with np.errstate(invalid="ignore"):
+        # Burnout: sustained overload while energy or completion falls below the user's norm
+        declining = (z["energy"] <= BURNOUT_DECLINE_Z) | (z["completion"] <= BURNOUT_DECLINE_Z)
+        burnout = (z["minutes"] >= BURNOUT_MINUTES_Z) & declining
+        add("burnout", None, burnout, z["minutes"], MIN_RUN_DAYS,
+            lambda r, s, e: {"avg_minutes": _nan_mean(matrices["minutes"][r, s:e]),
+                             "avg_energy": _nan_mean(matrices["energy"][r, s:e])})
+
+        # Recovery: lighter days with energy back above the user's norm
+        recovery = (z["minutes"] <= RECOVERY_MINUTES_Z) & (z["energy"] >= RECOVERY_ENERGY_Z)
+        add("recovery", None, recovery, z["energy"], MIN_RUN_DAYS)
+
+        for metric in METRICS:
+            # Single-day outliers in either direction
+            add("anomaly", metric, np.abs(z[metric]) >= ANOMALY_Z, np.abs(z[metric]), 1,
+                lambda r, s, e, m=metric: {"values": [_nan_round(v) for v in matrices[m][r, s:e]]})
+
+            # Level shifts: the flagged period is the recent window of the strongest end day
+            t, recent_mean, baseline_mean = shift_scores(matrices[metric], metric)
+            for direction, mask in (("up", t >= SHIFT_T), ("down", t <= -SHIFT_T)):
+                rows, starts, ends = find_runs(mask)
+                peaks = _run_peaks(np.abs(t), rows, starts, ends)
+                for i, (r, s, e) in enumerate(zip(rows, starts, ends)):
+                    peak_day = s + int(np.nanargmax(np.abs(t[r, s:e])))
+                    flags.append({
+                        "user_id": int(users[r]),
+                        "kind": "shift",
+                        "metric": metric,
+                        "start_date": dates[max(peak_day - SHIFT_DAYS + 1, 0)].date(),
+                        "end_date": dates[e - 1].date(),
+                        "severity": round(float(peaks[i]), 2),
+                        "details": {
+                            "direction": direction,
+                            "before_mean": _nan_round(baseline_mean[r, peak_day]),
+                            "after_mean": _nan_round(recent_mean[r, peak_day]),
+                        },
+                    })
+    return flags
+
+
+def _nan_round(value, digits: int = 2):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _nan_mean(values: np.ndarray):
+    finite = values[np.isfinite(values)]
+    return _nan_round(finite.mean()) if len(finite) else None
+
+
+class BehaviorDetector:
+    """
+    Runs detection over the last DETECTION_DAYS days and replaces the stored flags
+    of the scored users in that window.
+    """
+
+    def __init__(self, db: Session, days: int = DETECTION_DAYS):
+        self.db = db
+        self.days = days
+
+    def detect_users(self, user_ids: List[int]) -> int:
+        start = datetime.combine(datetime.utcnow().date() - timedelta(days=self.days - 1), datetime.min.time())
+        users, dates, matrices = load_daily_matrices(self.db, start, self.days, user_ids)
+        flags = detect_flags(users, dates, matrices)
+        BehaviorFlagRepository(self.db).replace_flags(user_ids, start.date(), flags)
+        return len(flags)
+
+
+def detect_for_user(user_id: int):
+    """
+    Per-write entry point; opens its own session so it can run as a background task.
+    """
+    db = SessionLocal()
+    try:
+        BehaviorDetector(db).detect_users([user_id])
+    except Exception as e:
+        logger.error(f"❌ BEHAVIOR DETECTION ERROR (user {user_id}): {str(e)}")
+    finally:
+        db.close()
+
+
+def summarize_flags(flags) -> List[Dict[str, Any]]:
+    """
+    Compact view of stored flags for API responses and agent prompts.
+    """
+    return [
+        {
+            "kind": f.kind,
+            "metric": f.metric,
+            "start_date": f.start_date.isoformat(),
+            "end_date": f.end_date.isoformat(),
+            "severity": f.severity,
+            "details": f.details,
+        }
+        for f in flags
+    ]
+
+
+def run_batch(chunk_size: int = 1000, days: int = DETECTION_DAYS) -> Dict[str, int]:
+    """
+    Detects flags for every user, in keyset-ordered chunks of `chunk_size` users.
+    """
+    db = SessionLocal()
+    totals = {"users": 0, "flags": 0}
+    try:
+        detector = BehaviorDetector(db, days)
+        last_id = 0
+        while True:
+            ids = [r[0] for r in db.execute(
+                text('SELECT user_id FROM "user" WHERE user_id > :last_id ORDER BY user_id LIMIT :limit'),
+                {"last_id": last_id, "limit": chunk_size}
+            )]
+            if not ids:
+                return totals
+            totals["flags"] += detector.detect_users(ids)
+            totals["users"] += len(ids)
+            last_id = ids[-1]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect burnout, recovery and anomalies for all users.")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=DETECTION_DAYS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = datetime.utcnow()
+    totals = run_batch(args.chunk_size, args.days)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Scanned {totals['users']} users, stored {totals['flags']} flags in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Sequence
+from sqlalchemy import func, case
 from sqlalchemy.orm import Session
 from backend.models import ActivityLog, Outcome, Activity
 
@@ -11,48 +12,76 @@ class AnalyticsEngine:
         """
         Aggregates raw data into a structured format for AI agents.
         """
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Fetch data
-        logs = self.db.query(ActivityLog, Activity).join(Activity).filter(
+        return self.get_summaries(user_id, windows=[days])[days]
+
+    def get_summaries(self, user_id: int, windows: Sequence[int] = (7, 30, 90)) -> Dict[int, Dict[str, Any]]:
+        """
+        Builds the period summary for every requested window from a single
+        conditionally-aggregated query. Streak and outcome data are fetched
+        once and shared across windows.
+        """
+        windows = sorted(set(windows))
+        now = datetime.utcnow()
+        starts = {days: now - timedelta(days=days) for days in windows}
+        earliest = starts[windows[-1]]
+        day = func.date_trunc("day", ActivityLog.date)
+
+        # One row per category plus a ROLLUP row (category NULL) holding the totals
+        columns = [Activity.activity_category.label("category")]
+        for days in windows:
+            in_window = ActivityLog.date >= starts[days]
+            columns.append(func.coalesce(func.sum(case((in_window, ActivityLog.duration_minutes), else_=0)), 0).label(f"minutes_{days}"))
+            columns.append(func.count(func.distinct(case((in_window, day)))).label(f"days_{days}"))
+
+        rows = self.db.query(*columns).join(Activity).filter(
             ActivityLog.user_id == user_id,
-            ActivityLog.date >= start_date
-        ).all()
-        
+            ActivityLog.date >= earliest
+        ).group_by(func.rollup(Activity.activity_category)).all()
+
         outcomes = self.db.query(Outcome).filter(
             Outcome.user_id == user_id,
-            Outcome.date >= start_date
+            Outcome.date >= earliest
         ).all()
 
-        # Aggregate Metrics
-        activity_stats = {}
-        total_minutes = 0
-        logged_dates = set()
-        
-        for log, activity in logs:
-            cat = activity.activity_category.value
-            dur = log.duration_minutes or 0
-            activity_stats[cat] = activity_stats.get(cat, 0) + dur
-            total_minutes += dur
-            logged_dates.add(log.date.date())
-
-        outcome_history = [
-            {"type": o.outcome_type.value, "value": o.outcome_value, "date": o.date.isoformat()}
-            for o in outcomes
-        ]
-
         # Streak calculation
         streak = self.get_user_streak(user_id)
 
-        return {
-            "period_days": days,
-            "total_active_minutes": total_minutes,
-            "activity_distribution": activity_stats,
-            "outcome_count": len(outcomes),
-            "recent_outcomes": outcome_history,
-            "days_logged": len(logged_dates),
-            "streak_count": streak
-        }
+        summaries = {}
+        for days in windows:
+            activity_stats = {}
+            total_minutes = 0
+            days_logged = 0
+            for row in rows:
+                minutes = int(getattr(row, f"minutes_{days}") or 0)
+                if row.category is None:
+                    total_minutes = minutes
+                    days_logged = getattr(row, f"days_{days}")
+                elif minutes:
+                    activity_stats[row.category.value] = minutes
+
+            window_outcomes = [o for o in outcomes if o.date >= starts[days]]
+            outcome_history = [
+                {"type": o.outcome_type.value, "value": o.outcome_value, "numeric": o.outcome_numeric, "date": o.date.isoformat()}
+                for o in window_outcomes
+            ]
+            numeric = {}
+            for o in window_outcomes:
+                if o.outcome_numeric is not None:
+                    numeric.setdefault(o.outcome_type.value, []).append(o.outcome_numeric)
+            outcome_averages = {t: round(sum(v) / len(v), 2) for t, v in numeric.items()}
+
+            summaries[days] = {
+                "period_days": days,
+                "total_active_minutes": total_minutes,
+                "activity_distribution": activity_stats,
+                "outcome_count": len(window_outcomes),
+                "recent_outcomes": outcome_history,
+                "outcome_averages": outcome_averages,
+                "days_logged": days_logged,
+                "streak_count": streak
+            }
+
+        return summaries
 
     def get_user_streak(self, user_id: int) -> int:
         """
@@ -84,11 +113,13 @@ class AnalyticsEngine:
         
         return streak
 
-    def get_onboarding_status(self, user_id: int) -> Dict[str, Any]:
+    def get_onboarding_status(self, user_id: int, summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Returns the progress toward the initial 7-day/120-minute data gathering phase.
+        An already computed 7-day summary can be passed in to avoid refetching it.
         """
-        summary = self.get_summary_for_period(user_id, days=7)
+        if summary is None:
+            summary = self.get_summary_for_period(user_id, days=7)
         
         total_minutes = summary["total_active_minutes"]
         days_logged = summary["days_logged"]
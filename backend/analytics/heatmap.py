@@ -0,0 +1,148 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.models import ActivityLog
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+HEATMAP_DAYS = 90
+CACHE_TTL_SECONDS = 600
+
+# Splits every timed log into the hour slots it overlaps so a 90-minute session
+# starting at 9:30 counts 30 minutes at 9h and 60 minutes at 10h.
+# isodow - 1 gives Monday = 0, matching Python's datetime.weekday().
+HEATMAP_QUERY = text("""
+    WITH spans AS (
+        SELECT start_time AS span_start,
+               COALESCE(end_time, start_time + make_interval(mins => COALESCE(duration_minutes, 0))) AS span_end,
+               energy_level
+        FROM activity_log
+        WHERE user_id = :user_id AND start_time IS NOT NULL AND date >= :since
+    ), slots AS (
+        SELECT slot, energy_level,
+               EXTRACT(EPOCH FROM LEAST(span_end, slot + interval '1 hour') - GREATEST(span_start, slot)) / 60.0 AS minutes
+        FROM spans,
+             LATERAL generate_series(date_trunc('hour', span_start), span_end - interval '1 microsecond', interval '1 hour') AS slot
+        WHERE span_end > span_start
+    )
+    SELECT date_part('isodow', slot)::int - 1 AS dow,
+           date_part('hour', slot)::int AS hour,
+           SUM(minutes) AS minutes,
+           SUM(energy_level * minutes) AS energy_weighted,
+           SUM(CASE WHEN energy_level IS NOT NULL THEN minutes ELSE 0 END) AS energy_minutes
+    FROM slots
+    GROUP BY 1, 2
+""")
+
+
+class _HeatmapEntry:
+    def __init__(self):
+        self.minutes = np.zeros((7, 24))
+        self.energy_weighted = np.zeros((7, 24))
+        self.energy_minutes = np.zeros((7, 24))
+        self.computed_at = time.monotonic()
+
+
+def _log_span(start: datetime, end: Optional[datetime], duration_minutes: Optional[int]):
+    if end is None:
+        end = start + timedelta(minutes=duration_minutes or 0)
+    return start, end
+
+
+class HeatmapCache:
+    """
+    Per-worker cache of 7x24 weekday/hour heatmaps. Entries are built with a single
+    SQL aggregate, updated in place when new logs land and rebuilt after the TTL
+    (which also bounds staleness across workers and rolls the 90-day window).
+    """
+
+    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, _HeatmapEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry.computed_at > self.ttl_seconds:
+                entry = None
+        if entry is None:
+            entry = self._build(db, user_id)
+            with self._lock:
+                self._entries[user_id] = entry
+        return self._render(entry)
+
+    def record_log(self, log: ActivityLog):
+        """
+        Adds a newly created log to the cached heatmap of its user, if one is cached.
+        """
+        if log.start_time is None:
+            return
+        with self._lock:
+            entry = self._entries.get(log.user_id)
+            if entry is None:
+                return
+            start, end = _log_span(log.start_time, log.end_time, log.duration_minutes)
+            slot = start.replace(minute=0, second=0, microsecond=0)
+            while slot < end:
+                next_slot = slot + timedelta(hours=1)
+                minutes = (min(end, next_slot) - max(start, slot)).total_seconds() / 60.0
+                dow, hour = slot.weekday(), slot.hour
+                entry.minutes[dow, hour] += minutes
+                if log.energy_level is not None:
+                    entry.energy_weighted[dow, hour] += log.energy_level * minutes
+                    entry.energy_minutes[dow, hour] += minutes
+                slot = next_slot
+
+    def invalidate(self, user_id: int):
+        """
+        Drops a user's cached heatmap; used when logs are edited or deleted.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def _build(self, db: Session, user_id: int) -> _HeatmapEntry:
+        entry = _HeatmapEntry()
+        since = datetime.utcnow() - timedelta(days=HEATMAP_DAYS)
+        rows = db.execute(HEATMAP_QUERY, {"user_id": user_id, "since": since}).all()
+        for r in rows:
+            entry.minutes[r.dow, r.hour] = float(r.minutes or 0)
+            entry.energy_weighted[r.dow, r.hour] = float(r.energy_weighted or 0)
+            entry.energy_minutes[r.dow, r.hour] = float(r.energy_minutes or 0)
+        return entry
+
+    def _render(self, entry: _HeatmapEntry) -> Dict[str, Any]:
+        minutes = entry.minutes.copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_energy = np.where(entry.energy_minutes > 0, entry.energy_weighted / entry.energy_minutes, np.nan)
+
+        def top_slots(values: np.ndarray, n: int = 3):
+            flat = np.where(np.isnan(values), -np.inf, values).ravel()
+            order = np.argsort(flat)[::-1][:n]
+            return [
+                {"day": DAY_NAMES[i // 24], "hour": int(i % 24), "value": round(float(flat[i]), 2)}
+                for i in order if np.isfinite(flat[i]) and flat[i] > 0
+            ]
+
+        # Only trust energy in slots with at least an hour of logged time
+        reliable_energy = np.where(entry.energy_minutes >= 60, avg_energy, np.nan)
+
+        return {
+            "days": DAY_NAMES,
+            "hours": list(range(24)),
+            "minutes": np.round(minutes, 1).tolist(),
+            "avg_energy": [[None if np.isnan(v) else round(float(v), 2) for v in row] for row in avg_energy],
+            "minutes_by_day": np.round(minutes.sum(axis=1), 1).tolist(),
+            "minutes_by_hour": np.round(minutes.sum(axis=0), 1).tolist(),
+            "peak_focus_slots": top_slots(minutes),
+            "peak_energy_slots": top_slots(reliable_energy),
+            "period_days": HEATMAP_DAYS
+        }
+
+
+heatmap_cache = HeatmapCache()
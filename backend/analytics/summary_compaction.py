@@ -0,0 +1,158 @@
+"""
+Compaction of per-reply analytics summaries.
+
+Every chat turn stores an AnalyticsSummary with period_type "query_response"
+holding the full reply. For each user the latest KEEP_RESPONSES are kept as
+they are; older ones are rolled into one "query_digest" row per week whose
+key_insight lists the opening point of the replies it replaced, so the prompt
+history still reads as a timeline. Digests keep the generated_at of their
+newest reply and therefore sort where those replies were.
+
+Rows are replaced in batches of one user's summaries, each in its own short
+transaction, so the job never holds locks on more than one batch at a time:
+    python -m backend.analytics.summary_compaction --keep 20 --batch-size 500
+"""
+import argparse
+import logging
+import re
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.db.connection import SessionLocal
+from backend.db.repositories.summary_repo import AnalyticsSummaryRepository
+from backend.models import AnalyticsSummary
+
+QUERY_RESPONSE = "query_response"
+QUERY_DIGEST = "query_digest"
+KEEP_RESPONSES = 20
+BATCH_SIZE = 500
+# Points listed in a digest and the length of each
+DIGEST_POINTS = 8
+POINT_CHARS = 200
+
+_MARKDOWN = re.compile(r"[*_#>`]+")
+_FIRST_SENTENCE = re.compile(r"(.+?[.!?])(?:\s|$)")
+
+
+def week_start(value: datetime) -> datetime:
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def opening_point(text: Optional[str]) -> str:
+    """First sentence of a reply without markdown, cut to POINT_CHARS."""
+    text = " ".join(_MARKDOWN.sub("", text or "").split())
+    match = _FIRST_SENTENCE.match(text)
+    point = match.group(1) if match else text
+    return point if len(point) <= POINT_CHARS else point[:POINT_CHARS - 1].rstrip() + "…"
+
+
+def _digest_text(count: int, start: datetime, points: List[str]) -> str:
+    header = f"Digest of {count} coaching replies in the week of {start.date().isoformat()}:"
+    return "\n".join([header] + [f"- {p}" for p in points[-DIGEST_POINTS:]])
+
+
+def _mean_alignment(values: List[Optional[str]]) -> Optional[str]:
+    scores = []
+    for value in values:
+        try:
+            scores.append(float(value))
+        except (TypeError, ValueError):
+            continue
+    return str(round(sum(scores) / len(scores), 2)) if scores else None
+
+
+def merge_into_digest(digest: Optional[AnalyticsSummary], user_id: int, rows: List[AnalyticsSummary]) -> AnalyticsSummary:
+    """
+    Folds `rows` (one week, oldest first) into that week's digest, creating it
+    if needed. Focus distribution and balance come from the newest row, as the
+    state at the end of the week; goal alignment is averaged.
+    """
+    start = week_start(rows[0].generated_at)
+    if digest is None:
+        digest = AnalyticsSummary(
+            user_id=user_id,
+            period_type=QUERY_DIGEST,
+            period_start=start,
+            period_end=start + timedelta(days=7),
+            source_count=0
+        )
+    points = [line[2:] for line in (digest.key_insight or "").splitlines() if line.startswith("- ")]
+    # The existing average counts once per reply it already covers
+    alignments = [digest.goal_alignment] * (digest.source_count or 0)
+
+    newest = rows[-1]
+    digest.source_count = (digest.source_count or 0) + len(rows)
+    digest.generated_at = max(newest.generated_at, digest.generated_at or newest.generated_at)
+    digest.focus_distribution = newest.focus_distribution
+    digest.activity_balance = newest.activity_balance
+    digest.goal_alignment = _mean_alignment(alignments + [r.goal_alignment for r in rows])
+    digest.key_insight = _digest_text(digest.source_count, start, points + [opening_point(r.key_insight) for r in rows])
+    return digest
+
+
+def compact_user(db: Session, user_id: int, keep: int = KEEP_RESPONSES, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Rolls the user's replies older than the latest `keep` into weekly digests.
+    Returns how many reply summaries were replaced.
+    """
+    repo = AnalyticsSummaryRepository(db)
+    boundary = repo.get_keep_boundary(user_id, QUERY_RESPONSE, keep)
+    if boundary is None:
+        return 0
+    replaced = 0
+    while True:
+        rows = repo.get_summaries_before(user_id, QUERY_RESPONSE, boundary, batch_size)
+        if not rows:
+            return replaced
+        digests = []
+        for start, week in groupby(rows, key=lambda r: week_start(r.generated_at)):
+            existing = repo.get_summary_for_period(user_id, QUERY_DIGEST, start)
+            digests.append(merge_into_digest(existing, user_id, list(week)))
+        repo.replace_with_digests(digests, [r.summary_id for r in rows])
+        replaced += len(rows)
+
+
+def run_batch(keep: int = KEEP_RESPONSES, batch_size: int = BATCH_SIZE, chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Compacts every user with more than `keep` reply summaries, in keyset-ordered
+    chunks of `chunk_size` users.
+    """
+    db = SessionLocal()
+    totals = {"users": 0, "replaced": 0}
+    try:
+        repo = AnalyticsSummaryRepository(db)
+        last_id = 0
+        while True:
+            ids = repo.get_users_over_limit(QUERY_RESPONSE, keep, last_id, chunk_size)
+            if not ids:
+                return totals
+            for user_id in ids:
+                totals["replaced"] += compact_user(db, user_id, keep, batch_size)
+            totals["users"] += len(ids)
+            last_id = ids[-1]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll old per-reply analytics summaries into weekly digests.")
+    parser.add_argument("--keep", type=int, default=KEEP_RESPONSES, help="latest reply summaries kept per user")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="summaries replaced per transaction")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    if args.keep < 1:
+        parser.error("--keep must be at least 1")
+
+    logging.basicConfig(level=logging.INFO)
+    started = datetime.utcnow()
+    totals = run_batch(args.keep, args.batch_size, args.chunk_size)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Compacted {totals['users']} users, replaced {totals['replaced']} reply summaries in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from backend.models import ActivityLog, Activity, ActivityCategory, Outcome
+
+CATEGORIES = [c.value for c in ActivityCategory]
+
+
+def _slope(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """
+    Least-squares slope of y over x, ignoring NaN pairs.
+    """
+    mask = ~(np.isnan(x) | np.isnan(y))
+    if mask.sum() < 3:
+        return None
+    x, y = x[mask], y[mask]
+    x_dev = x - x.mean()
+    denom = (x_dev ** 2).sum()
+    if denom == 0:
+        return None
+    return float((x_dev * (y - y.mean())).sum() / denom)
+
+
+def _round_list(values: np.ndarray, digits: int = 2) -> List[Any]:
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+class TrendAnalyzer:
+    """
+    Multi-week trends computed over a user's daily activity series.
+    All metrics are derived from a single aggregated query per table and
+    computed with vectorized pandas/NumPy operations.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_daily_series(self, user_id: int, days: int = 90) -> pd.DataFrame:
+        """
+        Returns one row per calendar day (gaps filled with zero) with minutes
+        per category, total minutes, average energy and completion ratio.
+        """
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+        day = func.date_trunc("day", ActivityLog.date)
+
+        rows = self.db.query(
+            day.label("day"),
+            Activity.activity_category.label("category"),
+            func.coalesce(func.sum(ActivityLog.duration_minutes), 0).label("minutes"),
+            func.sum(ActivityLog.energy_level).label("energy_sum"),
+            func.count(ActivityLog.energy_level).label("energy_count"),
+            func.count(ActivityLog.log_id).label("log_count"),
+            func.sum(case((ActivityLog.completed == True, 1), else_=0)).label("completed_count"),
+        ).join(Activity).filter(
+            ActivityLog.user_id == user_id,
+            ActivityLog.date >= start
+        ).group_by(day, Activity.activity_category).all()
+
+        index = pd.date_range(start, end, freq="D")
+        frame = pd.DataFrame(0.0, index=index, columns=CATEGORIES)
+        if not rows:
+            frame["total_minutes"] = 0.0
+            frame["avg_energy"] = np.nan
+            frame["completion_ratio"] = np.nan
+            return frame
+
+        raw = pd.DataFrame(
+            [(r.day, r.category.value, r.minutes, r.energy_sum or 0, r.energy_count, r.log_count, r.completed_count or 0) for r in rows],
+            columns=["day", "category", "minutes", "energy_sum", "energy_count", "log_count", "completed_count"]
+        )
+        raw["day"] = pd.to_datetime(raw["day"]).dt.normalize()
+
+        minutes = raw.pivot_table(index="day", columns="category", values="minutes", aggfunc="sum")
+        frame.update(minutes.reindex(index))
+        frame = frame.fillna(0.0)
+        frame["total_minutes"] = frame[CATEGORIES].sum(axis=1)
+
+        per_day = raw.groupby("day")[["energy_sum", "energy_count", "log_count", "completed_count"]].sum().reindex(index)
+        frame["avg_energy"] = per_day["energy_sum"] / per_day["energy_count"].replace(0, np.nan)
+        frame["completion_ratio"] = per_day["completed_count"] / per_day["log_count"].replace(0, np.nan)
+        return frame
+
+    def load_daily_outcomes(self, user_id: int, days: int = 90) -> pd.DataFrame:
+        """
+        Returns numeric outcome values averaged per day, one column per outcome type.
+        """
+        start = datetime.utcnow().date() - timedelta(days=days - 1)
+        day = func.date_trunc("day", Outcome.date)
+        rows = self.db.query(
+            day.label("day"),
+            Outcome.outcome_type,
+            func.avg(Outcome.outcome_numeric).label("value")
+        ).filter(
+            Outcome.user_id == user_id,
+            Outcome.date >= start,
+            Outcome.outcome_numeric.isnot(None)
+        ).group_by(day, Outcome.outcome_type).all()
+        if not rows:
+            return pd.DataFrame()
+
+        raw = pd.DataFrame(
+            [(r.day, r.outcome_type.value, float(r.value)) for r in rows],
+            columns=["day", "type", "value"]
+        )
+        raw["day"] = pd.to_datetime(raw["day"]).dt.normalize()
+        return raw.pivot(index="day", columns="type", values="value")
+
+    def get_trends(self, user_id: int, days: int = 90, window: int = 7) -> Dict[str, Any]:
+        """
+        Rolling means, volatility, week-over-week deltas and effort-vs-outcome
+        slopes for the last `days` days.
+        """
+        series = self.load_daily_series(user_id, days)
+        total = series["total_minutes"]
+
+        rolling = total.rolling(window, min_periods=1)
+        rolling_mean = rolling.mean().to_numpy()
+        rolling_std = total.rolling(window, min_periods=2).std().to_numpy()
+
+        mean_total = float(total.mean())
+        volatility = float(total.std(ddof=0) / mean_total) if mean_total else 0.0
+
+        weekly = series[CATEGORIES + ["total_minutes"]].resample("W-MON", label="left", closed="left").sum()
+        weekly_delta = weekly["total_minutes"].diff().to_numpy()
+        weekly_pct = (weekly["total_minutes"].pct_change().replace([np.inf, -np.inf], np.nan) * 100).to_numpy()
+
+        day_index = np.arange(len(series), dtype=float)
+        category_slopes = {
+            cat: _slope(day_index, series[cat].to_numpy(dtype=float)) for cat in CATEGORIES
+        }
+
+        # Effort vs Outcome: trailing-window effort against each outcome reported that day
+        effort = rolling.sum()
+        outcomes = self.load_daily_outcomes(user_id, days)
+        effort_vs_outcome = {}
+        for outcome_type in outcomes.columns:
+            aligned = outcomes[outcome_type].reindex(series.index).to_numpy(dtype=float)
+            effort_arr = effort.to_numpy(dtype=float)
+            mask = ~np.isnan(aligned)
+            correlation = None
+            if mask.sum() >= 3 and np.std(aligned[mask]) > 0 and np.std(effort_arr[mask]) > 0:
+                correlation = round(float(np.corrcoef(effort_arr[mask], aligned[mask])[0, 1]), 3)
+            slope = _slope(effort_arr, aligned)
+            effort_vs_outcome[outcome_type] = {
+                "samples": int(mask.sum()),
+                "slope_per_hour": round(slope * 60, 3) if slope is not None else None,
+                "correlation": correlation
+            }
+
+        return {
+            "period_days": days,
+            "window": window,
+            "dates": [d.date().isoformat() for d in series.index],
+            "daily_minutes": _round_list(total.to_numpy(dtype=float)),
+            "rolling_mean": _round_list(rolling_mean),
+            "rolling_std": _round_list(rolling_std),
+            "avg_daily_minutes": round(mean_total, 2),
+            "volatility": round(volatility, 3),
+            "active_days": int((total > 0).sum()),
+            "avg_energy": _round_list(series["avg_energy"].to_numpy(dtype=float)),
+            "completion_ratio": _round_list(series["completion_ratio"].to_numpy(dtype=float)),
+            "weekly": [
+                {
+                    "week_start": week.date().isoformat(),
+                    "total_minutes": float(row["total_minutes"]),
+                    "distribution": {cat: float(row[cat]) for cat in CATEGORIES if row[cat]},
+                    "delta_minutes": None if np.isnan(weekly_delta[i]) else float(weekly_delta[i]),
+                    "delta_pct": None if np.isnan(weekly_pct[i]) else round(float(weekly_pct[i]), 1)
+                }
+                for i, (week, row) in enumerate(weekly.iterrows())
+            ],
+            "category_slopes": {
+                cat: (round(s, 3) if s is not None else None) for cat, s in category_slopes.items()
+            },
+            "effort_vs_outcome": effort_vs_outcome
+        }
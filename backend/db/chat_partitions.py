@@ -0,0 +1,200 @@
+"""
+Monthly partitions of chat_message and cold archival.
+
+chat_message is range-partitioned on "timestamp" into one partition per
+calendar month (chat_message_y2026m10) plus chat_message_default, which only
+catches rows outside every monthly range. Partitions are created a few months
+ahead. Once a month is older than the retention window its messages are
+gzip-compressed per user into chat_message_archive and the partition is
+detached and dropped, so the live table only holds the hot months.
+
+Run daily (it is idempotent):
+    python -m backend.db.chat_partitions --retention-months 12 --months-ahead 3
+"""
+import argparse
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PARENT = "chat_message"
+DEFAULT_PARTITION = "chat_message_default"
+RETENTION_MONTHS = int(os.getenv("CHAT_RETENTION_MONTHS", "12"))
+MONTHS_AHEAD = 3
+# Users per multi-row INSERT into the archive
+ARCHIVE_BATCH = 500
+
+_PARTITION_NAME = re.compile(r"^chat_message_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+
+def list_partitions(conn: Connection) -> List[date]:
+    """Months that currently have a partition, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT}).scalars()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_partition(conn: Connection, month: date) -> str:
+    """
+    Creates the partition for `month`. Rows of that month already sitting in the
+    default partition are moved into it, since PostgreSQL refuses to add a range
+    the default partition still holds rows for.
+    """
+    name = partition_name(month)
+    # Bounds are literals: DDL takes no bind parameters
+    bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    in_range = '"timestamp" >= :lower AND "timestamp" < :upper'
+    params = {"lower": month, "upper": add_months(month, 1)}
+
+    stray = conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), params).scalar()
+    if not stray:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} FOR VALUES {bounds}"))
+        return name
+
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), params)
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), params)
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    logger.info(f"🔄 Moved {stray} messages from {DEFAULT_PARTITION} into {name}")
+    return name
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = MONTHS_AHEAD, since: Optional[date] = None) -> List[str]:
+    """
+    Creates the default partition and monthly partitions from `since` (the
+    current month by default) through `months_ahead` months from now.
+    Returns the names of the partitions it created.
+    """
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+    existing = set(list_partitions(conn))
+    current = month_start(datetime.utcnow().date())
+    month = month_start(since) if since else current
+    created = []
+    while month <= add_months(current, months_ahead):
+        if month not in existing:
+            created.append(create_partition(conn, month))
+        month = add_months(month, 1)
+    return created
+
+
+def compress_messages(messages: List[Dict[str, Any]]) -> bytes:
+    return gzip.compress(json.dumps(messages, default=str, separators=(",", ":")).encode())
+
+
+def decompress_messages(payload: bytes) -> List[Dict[str, Any]]:
+    return json.loads(gzip.decompress(payload))
+
+
+def archive_partition(conn: Connection, month: date) -> Dict[str, int]:
+    """
+    Copies a month's messages into chat_message_archive, one compressed row per
+    user, then detaches and drops its partition. Run inside one transaction so
+    a failure leaves the partition in place; the detach comes last to keep the
+    lock on chat_message short.
+    """
+    name = partition_name(month)
+    rows = conn.execute(text(
+        f'SELECT message_id, user_id, role, content, "timestamp" FROM {name} '
+        f'ORDER BY user_id, "timestamp", message_id'
+    ), execution_options={"stream_results": True, "yield_per": 5000})
+    insert = text(
+        "INSERT INTO chat_message_archive "
+        "(user_id, month, message_count, first_message_at, last_message_at, messages, archived_at) "
+        "VALUES (:user_id, :month, :message_count, :first_message_at, :last_message_at, :messages, :archived_at)"
+    )
+    totals = {"users": 0, "messages": 0}
+    batch = []
+    for user_id, messages in itertools.groupby(rows, key=lambda r: r.user_id):
+        messages = list(messages)
+        batch.append({
+            "user_id": user_id,
+            "month": month,
+            "message_count": len(messages),
+            "first_message_at": messages[0].timestamp,
+            "last_message_at": messages[-1].timestamp,
+            "messages": compress_messages([
+                {"message_id": m.message_id, "role": m.role, "content": m.content, "timestamp": m.timestamp.isoformat()}
+                for m in messages
+            ]),
+            "archived_at": datetime.utcnow(),
+        })
+        totals["users"] += 1
+        totals["messages"] += len(messages)
+        if len(batch) >= ARCHIVE_BATCH:
+            conn.execute(insert, batch)
+            batch = []
+    if batch:
+        conn.execute(insert, batch)
+
+    conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    conn.execute(text(f"DROP TABLE {name}"))
+    return totals
+
+
+def run(engine, retention_months: int = RETENTION_MONTHS, months_ahead: int = MONTHS_AHEAD) -> Dict[str, Any]:
+    """
+    Creates upcoming partitions, then archives every month older than the
+    retention window, one transaction per month.
+    """
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, months_ahead)
+    for name in created:
+        logger.info(f"✅ Created partition {name}")
+
+    cutoff = add_months(month_start(datetime.utcnow().date()), -retention_months)
+    with engine.connect() as conn:
+        expired = [m for m in list_partitions(conn) if m < cutoff]
+
+    archived = {}
+    for month in expired:
+        with engine.begin() as conn:
+            totals = archive_partition(conn, month)
+        archived[partition_name(month)] = totals
+        logger.info(f"✅ Archived {partition_name(month)}: {totals['messages']} messages from {totals['users']} users")
+    return {"created": created, "archived": archived}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming chat_message partitions and archive expired ones.")
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    from backend.db.connection import engine
+
+    logging.basicConfig(level=logging.INFO)
+    result = run(engine, args.retention_months, args.months_ahead)
+    print(f"✅ {len(result['created'])} partitions created, {len(result['archived'])} archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from backend.db.pool import PgConnectionPool, TimedQueuePool, TimedAsyncQueuePool, warm_engine_pool
+from backend.db.replica import ReplicaRouter, request_user_id
 
 load_dotenv()
 
@@ -23,14 +27,128 @@ if not DATABASE_URL:
     encoded_password = urllib.parse.quote_plus(DB_PASSWORD)
     DATABASE_URL = f"postgresql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Optional read replica for read-only endpoints; unset, every read uses the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.startswith("postgres://"):
+    DATABASE_REPLICA_URL = DATABASE_REPLICA_URL.replace("postgres://", "postgresql://", 1)
+# Staleness bound: reads leave the replica while it lags more than this, and a
+# writer's own reads stay on the primary this long after the write
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "1"))
+
+# Pool settings shared by the sync and async SQLAlchemy engines and the psycopg2 pool.
+# Each worker opens up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine and
+# DB_POOL_SIZE in the psycopg2 pool, so size them so that
+# workers x (2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) + DB_POOL_SIZE) stays under the primary's
+# max_connections. With a replica, its two engines add workers x 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# connections on the replica.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Managed Postgres drops idle connections; recycle before that and ping on checkout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Connections opened at startup
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))
+# Timeout for connection attempts to prevent hangs
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
 # SQLAlchemy Setup
-# Add a 10 second timeout to connection attempts to prevent hangs
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"connect_timeout": 10}
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url_and_args(url: str):
+    """
+    asyncpg takes `ssl` and `timeout` connect arguments instead of libpq's
+    sslmode and connect_timeout, so those are moved out of the URL.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    connect_args = {"timeout": DB_CONNECT_TIMEOUT}
+    sslmode = parsed.query.get("sslmode")
+    if sslmode:
+        connect_args["ssl"] = sslmode
+    return parsed.difference_update_query(["sslmode", "connect_timeout"]), connect_args
+
+# Async (asyncpg) engine for handlers that should not block the event loop
+_async_url, _async_connect_args = _async_url_and_args(DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=_async_connect_args
+)
+# Objects stay usable after commit; lazy loads are not available on async sessions
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Replica engines with the same pool settings; without a replica the read
+# sessions fall through to the primary ones
+replica_engine = async_replica_engine = None
+ReplicaSessionLocal, AsyncReplicaSessionLocal = SessionLocal, AsyncSessionLocal
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        DATABASE_REPLICA_URL,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"connect_timeout": DB_CONNECT_TIMEOUT}
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    _replica_url, _replica_connect_args = _async_url_and_args(DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        _replica_url,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=_replica_connect_args
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+replica_router = ReplicaRouter(async_replica_engine, REPLICA_MAX_LAG_SECONDS, REPLICA_CHECK_SECONDS)
+
+def warm_pools():
+    """
+    Opens DB_POOL_WARMUP engine connections (primary and replica) ahead of the first requests.
+    """
+    warmed = warm_engine_pool(engine, min(DB_POOL_WARMUP, DB_POOL_SIZE))
+    if replica_engine is not None:
+        warmed += warm_engine_pool(replica_engine, min(DB_POOL_WARMUP, DB_POOL_SIZE))
+    return warmed
+
+def pool_metrics():
+    """
+    Live engine pool state (in use, overflow, checkout wait times) plus the psycopg2
+    pool, and the replica's pools and lag when one is configured.
+    """
+    metrics = {
+        "engine": engine.pool.metrics(),
+        "async_engine": async_engine.sync_engine.pool.metrics(),
+        "psycopg2": pg_pool.stats()
+    }
+    if replica_engine is not None:
+        metrics["replica_engine"] = replica_engine.pool.metrics()
+        metrics["async_replica_engine"] = async_replica_engine.sync_engine.pool.metrics()
+    metrics["replica"] = replica_router.stats()
+    return metrics
+
 def get_db_session():
     """
     Dependency to get a SQLAlchemy database session.
@@ -41,29 +159,73 @@ def get_db_session():
     finally:
         db.close()
 
+async def get_async_db_session():
+    """
+    Dependency to get an async SQLAlchemy session (asyncpg). Sync-only helpers
+    can run on it with `await db.run_sync(lambda session: ...)`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db_session(request: Request):
+    """
+    Dependency for read-only handlers: a replica session when replica_router
+    allows it for the requesting user, else a primary session. Never write through it.
+    """
+    session_factory = ReplicaSessionLocal if replica_router.use_replica(request_user_id(request)) else SessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db_session(request: Request):
+    """
+    Async counterpart of get_read_db_session.
+    """
+    session_factory = AsyncReplicaSessionLocal if replica_router.use_replica(request_user_id(request)) else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession):
+    """
+    Runs a request's writes as one transaction: repository calls made with
+    commit=False inside the block only flush, the block commits once on exit and
+    rolls everything back if it raises.
+    """
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+# psycopg2 pool for the raw-SQL repositories (libpq DSN from the same URL)
+pg_pool = PgConnectionPool(
+    make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False),
+    maxconn=DB_POOL_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    connect_timeout=DB_CONNECT_TIMEOUT,
+    recycle_seconds=DB_POOL_RECYCLE
+)
+
+@contextmanager
+def pooled_connection():
+    """
+    Checks out a pooled psycopg2 connection (RealDictCursor, search_path set)
+    for the duration of the block.
+    """
+    with pg_pool.connection() as conn:
+        yield conn
+
 def get_db_connection():
     """
-    Returns a PostgreSQL connection using environment variables (psycopg2). 
+    Returns a pooled PostgreSQL connection (psycopg2), or None if none could be
+    acquired. Hand it back with close_db_connection.
     """
     try:
-        # Priority: DATABASE_URL, then individual components
-        dsn = os.getenv("DATABASE_URL")
-        if dsn:
-            conn = psycopg2.connect(dsn, cursor_factory=RealDictCursor)
-        else:
-            conn = psycopg2.connect(
-                host=os.getenv("DB_HOST", "localhost"),
-                port=os.getenv("DB_PORT", "5432"),
-                database=os.getenv("DB_NAME", "neel_db"),
-                user=os.getenv("DB_USER", "postgres"),
-                password=os.getenv("DB_PASSWORD", "password"),
-                cursor_factory=RealDictCursor
-            )
-        # Set the search_path to public schema
-        cur = conn.cursor()
-        cur.execute("SET search_path TO public")
-        cur.close()
-        return conn
+        return pg_pool.getconn()
     except Exception as e:
         print(f"❌ DB Connection Failed: {str(e)}")
         return None
@@ -71,10 +233,10 @@ def get_db_connection():
 
 def close_db_connection(conn):
     """
-    Close database connection safely.
+    Return a connection to the pool.
     """
     if conn:
         try:
-            conn.close()
+            pg_pool.putconn(conn)
         except Exception as e:
-            print(f"❌ Error closing connection: {str(e)}")
\ No newline at end of file
+            print(f"❌ Error closing connection: {str(e)}")
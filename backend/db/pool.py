@@ -0,0 +1,270 @@
+"""
+Connection pooling.
+
+PgConnectionPool is a bounded, thread-safe psycopg2 pool for the raw-SQL
+repositories: physical connections are opened lazily up to `maxconn`, get
+their session setup (search_path) once, and are reused until they fail a
+health check. TimedQueuePool is the SQLAlchemy engine's QueuePool with
+checkout wait times recorded for the pool metrics (TimedAsyncQueuePool for
+the asyncpg engine).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the acquire timeout."""
+
+
+class PgConnectionPool:
+    """
+    LIFO pool of psycopg2 connections. A connection idle for longer than
+    `health_check_seconds` is pinged with SELECT 1 before it is handed out and
+    replaced if the server dropped it; connections older than `recycle_seconds`
+    are closed on return instead of being pooled again.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        maxconn: int = 5,
+        timeout: float = 30.0,
+        connect_timeout: int = 10,
+        health_check_seconds: float = 30.0,
+        recycle_seconds: Optional[float] = None,
+        search_path: str = "public"
+    ):
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.health_check_seconds = health_check_seconds
+        self.recycle_seconds = recycle_seconds
+        self.search_path = search_path
+        # (connection, opened_at, returned_at)
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        self._opened_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {"connects": 0, "acquires": 0, "timeouts": 0, "discarded": 0, "wait_seconds": 0.0}
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, cursor_factory=RealDictCursor, connect_timeout=self.connect_timeout)
+        with conn.cursor() as cur:
+            cur.execute("SELECT set_config('search_path', %s, false)", (self.search_path,))
+        conn.commit()
+        return conn
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._opened_at.pop(id(conn), None)
+        self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Returns a connection, waiting up to `timeout` seconds (the pool default
+        when None) for one to be returned once `maxconn` are checked out.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            while not self._idle and self._in_use >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"No database connection available after {timeout:.1f}s ({self.maxconn} in use)")
+                self._cond.wait(remaining)
+            idle = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        try:
+            if idle is not None:
+                conn, _, returned_at = idle
+                if not self._is_healthy(conn, returned_at):
+                    logger.info("🔄 Replacing dropped database connection")
+                    with self._cond:
+                        self._discard(conn)
+                    conn = None
+            else:
+                conn = None
+            if conn is None:
+                conn = self._connect()
+                with self._cond:
+                    self._opened_at[id(conn)] = time.monotonic()
+                    self._stats["connects"] += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats["acquires"] += 1
+            self._stats["wait_seconds"] += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn):
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+        Broken or expired connections are closed instead.
+        """
+        keep = not conn.closed
+        if keep and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                keep = False
+        with self._cond:
+            self._in_use -= 1
+            opened_at = self._opened_at.get(id(conn), time.monotonic())
+            if keep and self.recycle_seconds is not None and time.monotonic() - opened_at > self.recycle_seconds:
+                keep = False
+            if keep:
+                self._idle.append((conn, opened_at, time.monotonic()))
+            else:
+                self._discard(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Checks out a connection for the block; an exception rolls it back before
+        it is returned.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            acquires = self._stats["acquires"]
+            return {
+                "max_connections": self.maxconn,
+                "open": len(self._opened_at),
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "connects": self._stats["connects"],
+                "acquires": acquires,
+                "timeouts": self._stats["timeouts"],
+                "discarded": self._stats["discarded"],
+                "avg_wait_ms": round(self._stats["wait_seconds"] / acquires * 1000, 3) if acquires else 0.0
+            }
+
+
+class _CheckoutTimer:
+    """
+    Pool mixin that records how long each checkout waited (including opening a
+    new connection when the pool had none idle) and how many timed out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_samples: Deque[float] = deque(maxlen=1000)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._wait_samples.append(waited)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            samples = sorted(self._wait_samples)
+            checkouts, total, longest, timeouts = self._checkouts, self._wait_total, self._wait_max, self._timeouts
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            # QueuePool counts overflow from -pool_size; only positive values are extra connections
+            "overflow_in_use": max(self.overflow(), 0),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_avg_ms": round(total / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3) if samples else 0.0,
+            "wait_max_ms": round(longest * 1000, 3),
+        }
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    """QueuePool with checkout wait metrics, for the sync engine."""
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait metrics, for the asyncpg engine."""
+
+
+def warm_engine_pool(engine, connections: int) -> int:
+    """
+    Opens up to `connections` pooled connections at once and returns them to the
+    pool, so the first requests after startup skip the connect handshake.
+    Returns how many were opened.
+    """
+    held: List[Any] = []
+    try:
+        for _ in range(connections):
+            held.append(engine.connect())
+    except Exception as e:
+        logger.error(f"❌ POOL WARMUP STOPPED after {len(held)} connections: {str(e)}")
+    finally:
+        for conn in held:
+            conn.close()
+    return len(held)
@@ -0,0 +1,140 @@
+"""
+Read-replica routing.
+
+Read-only handlers take their session from get_read_db_session /
+get_async_read_db_session (backend.db.connection), which hand out a replica
+session when ReplicaRouter.use_replica allows it and a primary session
+otherwise. The replica is used only while its measured replay lag is within
+REPLICA_MAX_LAG_SECONDS; a background task re-measures it every
+REPLICA_CHECK_SECONDS and stops routing to a replica that is lagging or
+unreachable until it recovers.
+
+Reads right after a write stay on the primary: every successful write request
+marks its user (or, when the writer is unknown, everyone) for the staleness
+bound, and their reads go to the primary until the replica must have caught up.
+The marks are per process, which matches the single-worker deployment.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 on a caught-up standby and on a
+# server that is not a standby at all (a stand-in replica)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+# Write marks kept before expired ones are pruned
+MAX_TRACKED_WRITERS = 10000
+
+
+class ReplicaRouter:
+    def __init__(self, engine: Optional[AsyncEngine], max_lag_seconds: float, check_seconds: float):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # user_id -> monotonic time of the user's last write; None for writes with no known user
+        self._writes: Dict[Optional[int], float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    @property
+    def sticky_seconds(self) -> float:
+        """How long a writer's reads stay on the primary: the lag bound plus one check interval."""
+        return self.max_lag_seconds + self.check_seconds
+
+    def replica_available(self) -> bool:
+        """True while the last lag check succeeded recently and was within the bound."""
+        if not self.enabled or self.lag_seconds is None or self.checked_at is None:
+            return False
+        fresh = time.monotonic() - self.checked_at <= 2 * self.check_seconds
+        return fresh and self.lag_seconds <= self.max_lag_seconds
+
+    def mark_write(self, user_id: Optional[int]):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writes[user_id] = now
+            if len(self._writes) > MAX_TRACKED_WRITERS:
+                self._writes = {k: t for k, t in self._writes.items() if now - t < self.sticky_seconds}
+
+    def use_replica(self, user_id: Optional[int]) -> bool:
+        """
+        Whether a read for `user_id` may go to the replica: it must be healthy,
+        and neither this user nor an unknown writer wrote within the bound.
+        """
+        if not self.replica_available():
+            return False
+        now = time.monotonic()
+        with self._lock:
+            recent = [self._writes.get(user_id), self._writes.get(None)]
+        return all(t is None or now - t >= self.sticky_seconds for t in recent)
+
+    async def check(self) -> Optional[float]:
+        """Measures the replica's lag; on failure the replica is taken out of rotation."""
+        try:
+            async with self.engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar())
+        except Exception as e:
+            if self.last_error is None:
+                logger.error(f"❌ READ REPLICA UNAVAILABLE: {str(e)}")
+            self.lag_seconds, self.last_error = None, str(e)
+            return None
+        if self.last_error is not None:
+            logger.info("✅ READ REPLICA BACK IN ROTATION")
+        elif lag > self.max_lag_seconds >= (self.lag_seconds or 0):
+            logger.warning(f"🔄 READ REPLICA LAGGING ({lag:.1f}s), READS ON PRIMARY")
+        self.lag_seconds, self.checked_at, self.last_error = lag, time.monotonic(), None
+        return lag
+
+    async def run_schedule(self):
+        """
+        Background task measuring replica lag every check_seconds.
+        """
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            recent_writers = sum(1 for t in self._writes.values() if now - t < self.sticky_seconds)
+        return {
+            "enabled": self.enabled,
+            "available": self.replica_available(),
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_checked_seconds_ago": None if self.checked_at is None else round(now - self.checked_at, 1),
+            "last_error": self.last_error,
+            "recent_writers": recent_writers
+        }
+
+
+def request_user_id(request) -> Optional[int]:
+    """
+    The user a request reads or writes for: the bearer token's user (stored on
+    request.state by the write-tracking middleware), else a `user_id` path parameter.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is None:
+        user_id = request.path_params.get("user_id")
+    try:
+        return int(user_id) if user_id is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -1,7 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from backend.models import ActivityLog
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from backend.db.pagination import keyset_select, keyset_page
 
 class ActivityLogRepository:
     def __init__(self, db: Session):
@@ -19,9 +23,34 @@ class ActivityLogRepository:
         self.db.refresh(db_log)
         return db_log
 
+    def bulk_create_logs(self, user_id: int, entries: List[Dict[str, Any]], commit: bool = True) -> List[Row]:
+        """
+        Inserts all entries for a user with one multi-row INSERT ... RETURNING and
+        a single commit (none with commit=False, to join the caller's transaction).
+        Returns the inserted rows in the order of `entries`.
+        """
+        if not entries:
+            return []
+        table = ActivityLog.__table__
+        stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+        rows = self.db.execute(stmt, [{**entry, "user_id": user_id} for entry in entries]).all()
+        if commit:
+            self.db.commit()
+        return rows
+
     def get_user_logs(self, user_id: int, limit: int = 100) -> List[ActivityLog]:
         return self.db.query(ActivityLog).filter(ActivityLog.user_id == user_id).order_by(ActivityLog.created_at.desc()).limit(limit).all()
 
+    def get_user_logs_page(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[ActivityLog], Optional[str]]:
+        """
+        Newest-first page of a user's logs by (created_at, log_id) and the cursor for the next page.
+        """
+        stmt = keyset_select(
+            select(ActivityLog).filter(ActivityLog.user_id == user_id),
+            ActivityLog.created_at, ActivityLog.log_id, limit, cursor
+        )
+        return keyset_page(self.db.execute(stmt).scalars().all(), limit, "created_at", "log_id")
+
     def get_log_by_id(self, log_id: int) -> Optional[ActivityLog]:
         return self.db.query(ActivityLog).filter(ActivityLog.log_id == log_id).first()
 
@@ -41,3 +70,31 @@ class ActivityLogRepository:
             self.db.commit()
             return True
         return False
+
+class AsyncActivityLogRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_log(self, user_id: int, activity_id: int, date: datetime.date, commit: bool = True, **kwargs):
+        """With commit=False the row is only flushed and joins the caller's transaction."""
+        db_log = ActivityLog(
+            user_id=user_id,
+            activity_id=activity_id,
+            date=date,
+            **kwargs
+        )
+        self.db.add(db_log)
+        if not commit:
+            await self.db.flush()
+            return db_log
+        await self.db.commit()
+        await self.db.refresh(db_log)
+        return db_log
+
+    async def get_user_logs(self, user_id: int, limit: int = 100) -> List[ActivityLog]:
+        # The activity is loaded up front since async sessions cannot lazy-load it
+        result = await self.db.execute(
+            select(ActivityLog).options(selectinload(ActivityLog.activity))
+            .filter(ActivityLog.user_id == user_id).order_by(ActivityLog.created_at.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
@@ -4,7 +4,7 @@ from psycopg2.extras import RealDictCursor
 from typing import Optional, Dict, Any, List
 import json
 
-from backend.db.connection import get_db_connection, close_db_connection
+from backend.db.connection import pooled_connection
 
 
 class ActivityRepository:
@@ -30,25 +30,21 @@ class ActivityRepository:
             Activity dictionary or None if error
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            cur = conn.cursor()
+                metadata_json = json.dumps(metadata) if metadata else None
             
-            metadata_json = json.dumps(metadata) if metadata else None
-            
-            query = """
-                INSERT INTO activity_logs (user_id, activity_type, description, metadata)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id, user_id, activity_type, description, metadata, created_at;
-            """
+                query = """
+                    INSERT INTO activity_logs (user_id, activity_type, description, metadata)
+                    VALUES (%s, %s, %s, %s)
+                    RETURNING id, user_id, activity_type, description, metadata, created_at;
+                """
             
-            cur. execute(query, (user_id, activity_type, description, metadata_json))
-            activity = cur.fetchone()
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                cur. execute(query, (user_id, activity_type, description, metadata_json))
+                activity = cur.fetchone()
+                conn.commit()
+                cur.close()
             
             return dict(activity) if activity else None
             
@@ -79,34 +75,30 @@ class ActivityRepository:
             List of activity dictionaries
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
-            
-            cur = conn. cursor()
-            
-            if activity_type:
-                query = """
-                    SELECT id, user_id, activity_type, description, metadata, created_at
-                    FROM activity_logs
-                    WHERE user_id = %s AND activity_type = %s
-                    ORDER BY created_at DESC
-                    LIMIT %s OFFSET %s;
-                """
-                cur.execute(query, (user_id, activity_type, limit, offset))
-            else:
-                query = """
-                    SELECT id, user_id, activity_type, description, metadata, created_at
-                    FROM activity_logs
-                    WHERE user_id = %s
-                    ORDER BY created_at DESC
-                    LIMIT %s OFFSET %s;
-                """
-                cur.execute(query, (user_id, limit, offset))
-            
-            activities = cur.fetchall()
-            cur.close()
-            close_db_connection(conn)
+            with pooled_connection() as conn:
+                cur = conn. cursor()
+            
+                if activity_type:
+                    query = """
+                        SELECT id, user_id, activity_type, description, metadata, created_at
+                        FROM activity_logs
+                        WHERE user_id = %s AND activity_type = %s
+                        ORDER BY created_at DESC
+                        LIMIT %s OFFSET %s;
+                    """
+                    cur.execute(query, (user_id, activity_type, limit, offset))
+                else:
+                    query = """
+                        SELECT id, user_id, activity_type, description, metadata, created_at
+                        FROM activity_logs
+                        WHERE user_id = %s
+                        ORDER BY created_at DESC
+                        LIMIT %s OFFSET %s;
+                    """
+                    cur.execute(query, (user_id, limit, offset))
+            
+                activities = cur.fetchall()
+                cur.close()
             
             return [dict(a) for a in activities]
             
@@ -129,22 +121,18 @@ class ActivityRepository:
             Activity dictionary or None if not found
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = """
-                SELECT id, user_id, activity_type, description, metadata, created_at
-                FROM activity_logs
-                WHERE id = %s;
-            """
+                query = """
+                    SELECT id, user_id, activity_type, description, metadata, created_at
+                    FROM activity_logs
+                    WHERE id = %s;
+                """
             
-            cur. execute(query, (activity_id,))
-            activity = cur. fetchone()
-            cur.close()
-            close_db_connection(conn)
+                cur. execute(query, (activity_id,))
+                activity = cur. fetchone()
+                cur.close()
             
             return dict(activity) if activity else None
             
@@ -171,25 +159,21 @@ class ActivityRepository:
             Dictionary with activity counts by type
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
-            
-            query = """
-                SELECT activity_type, COUNT(*) as count
-                FROM activity_logs
-                WHERE user_id = %s 
-                AND created_at >= CURRENT_TIMESTAMP - INTERVAL '%s days'
-                GROUP BY activity_type
-                ORDER BY count DESC;
-            """
-            
-            cur. execute(query, (user_id, days))
-            results = cur.fetchall()
-            cur.close()
-            close_db_connection(conn)
+            with pooled_connection() as conn:
+                cur = conn.cursor()
+            
+                query = """
+                    SELECT activity_type, COUNT(*) as count
+                    FROM activity_logs
+                    WHERE user_id = %s 
+                    AND created_at >= CURRENT_TIMESTAMP - INTERVAL '%s days'
+                    GROUP BY activity_type
+                    ORDER BY count DESC;
+                """
+            
+                cur. execute(query, (user_id, days))
+                results = cur.fetchall()
+                cur.close()
             
             summary = {row['activity_type']: row['count'] for row in results}
             return summary
@@ -214,19 +198,15 @@ class ActivityRepository:
             True if deleted, False otherwise
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = "DELETE FROM activity_logs WHERE id = %s AND user_id = %s;"
-            cur. execute(query, (activity_id, user_id))
+                query = "DELETE FROM activity_logs WHERE id = %s AND user_id = %s;"
+                cur. execute(query, (activity_id, user_id))
             
-            deleted = cur.rowcount > 0
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                deleted = cur.rowcount > 0
+                conn.commit()
+                cur.close()
             
             return deleted
             
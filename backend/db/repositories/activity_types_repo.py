@@ -1,6 +1,8 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from backend.models import Activity, ActivityCategory
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 class ActivityTypesRepository:
     def __init__(self, db: Session):
@@ -18,3 +20,21 @@ class ActivityTypesRepository:
 
     def get_activity_type_by_name(self, name: str) -> Optional[Activity]:
         return self.db.query(Activity).filter(Activity.activity_name == name).first()
+
+    def get_activity_types_by_names(self, names: Iterable[str]) -> Dict[str, Activity]:
+        """
+        Resolves several activity names in one query; unknown names are missing from the result.
+        """
+        names = set(names)
+        if not names:
+            return {}
+        activities = self.db.query(Activity).filter(Activity.activity_name.in_(names)).all()
+        return {a.activity_name: a for a in activities}
+
+class AsyncActivityTypesRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_activity_type_by_name(self, name: str) -> Optional[Activity]:
+        result = await self.db.execute(select(Activity).filter(Activity.activity_name == name))
+        return result.scalars().first()
@@ -0,0 +1,44 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.models import BehaviorFlag
+from datetime import date, datetime
+from typing import List, Dict, Any
+
+class BehaviorFlagRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def replace_flags(self, user_ids: List[int], since: date, flags: List[Dict[str, Any]]) -> int:
+        """
+        Swaps the users' flags ending on or after `since` for a freshly detected set
+        in one transaction.
+        """
+        self.db.query(BehaviorFlag).filter(
+            BehaviorFlag.user_id.in_(user_ids),
+            BehaviorFlag.end_date >= since
+        ).delete(synchronize_session=False)
+        if flags:
+            detected_at = datetime.utcnow()
+            self.db.execute(BehaviorFlag.__table__.insert(), [{**f, "detected_at": detected_at} for f in flags])
+        self.db.commit()
+        return len(flags)
+
+    def get_recent_flags(self, user_id: int, since: date, limit: int = 20) -> List[BehaviorFlag]:
+        return self.db.query(BehaviorFlag).filter(
+            BehaviorFlag.user_id == user_id,
+            BehaviorFlag.end_date >= since
+        ).order_by(BehaviorFlag.end_date.desc(), BehaviorFlag.severity.desc()).limit(limit).all()
+
+class AsyncBehaviorFlagRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_recent_flags(self, user_id: int, since: date, limit: int = 20) -> List[BehaviorFlag]:
+        result = await self.db.execute(
+            select(BehaviorFlag).filter(
+                BehaviorFlag.user_id == user_id,
+                BehaviorFlag.end_date >= since
+            ).order_by(BehaviorFlag.end_date.desc(), BehaviorFlag.severity.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
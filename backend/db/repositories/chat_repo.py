@@ -1,6 +1,52 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.models import ChatMessage
-from typing import List
+from backend.models import ChatMessage, ChatMessageArchive
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from backend.db.chat_partitions import decompress_messages
+from backend.db.pagination import decode_cursor, keyset_select, keyset_page
+
+# chat_message is partitioned by month. Reads look at this window first so the
+# planner only touches the newest partitions, and fall back to older ones only
+# when the window holds fewer rows than requested.
+HOT_WINDOW = timedelta(days=31)
+
+def _window_start(cursor: Optional[str] = None) -> datetime:
+    upper = decode_cursor(cursor)[0] if cursor else datetime.utcnow()
+    return upper - HOT_WINDOW
+
+# History pages continue into chat_message_archive once the live partitions run
+# out, one archived month at a time, with the same (timestamp, id) cursors.
+def _archive_bound(rows: List[ChatMessage], cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if rows:
+        return rows[-1].timestamp, rows[-1].message_id
+    return decode_cursor(cursor) if cursor else None
+
+def _next_archive(user_id: int, bound: Optional[Tuple[datetime, int]], before_month: Optional[date] = None):
+    """The newest archived month of the user that can hold messages before `bound`."""
+    stmt = select(ChatMessageArchive).filter(ChatMessageArchive.user_id == user_id)
+    if bound:
+        stmt = stmt.filter(ChatMessageArchive.first_message_at <= bound[0])
+    if before_month:
+        stmt = stmt.filter(ChatMessageArchive.month < before_month)
+    return stmt.order_by(ChatMessageArchive.month.desc()).limit(1)
+
+def _unpack_archive(archive: ChatMessageArchive, bound: Optional[Tuple[datetime, int]]) -> List[ChatMessage]:
+    """An archived month's messages before `bound` as detached ChatMessage objects, newest first."""
+    messages = [
+        ChatMessage(
+            message_id=m["message_id"],
+            user_id=archive.user_id,
+            role=m["role"],
+            content=m["content"],
+            timestamp=datetime.fromisoformat(m["timestamp"])
+        )
+        for m in decompress_messages(archive.messages)
+    ]
+    if bound:
+        messages = [m for m in messages if (m.timestamp, m.message_id) < bound]
+    return sorted(messages, key=lambda m: (m.timestamp, m.message_id), reverse=True)
 
 class ChatRepository:
     def __init__(self, db: Session):
@@ -18,12 +64,118 @@ class ChatRepository:
         return message
 
     def get_history(self, user_id: int, limit: int = 50) -> List[ChatMessage]:
-        return self.db.query(ChatMessage).filter(
-            ChatMessage.user_id == user_id
-        ).order_by(ChatMessage.timestamp.asc()).limit(limit).all()
+        """Returns the latest `limit` messages, oldest first."""
+        return self.get_history_page(user_id, limit)[0]
+
+    def get_history_page(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[ChatMessage], Optional[str]]:
+        """
+        The `limit` messages before `cursor` (the latest ones without it) in
+        chronological order, and the cursor for the next, older page. Pages
+        continue into archived months after the live ones.
+        """
+        since = _window_start(cursor)
+        user_messages = select(ChatMessage).filter(ChatMessage.user_id == user_id)
+        rows = list(self.db.execute(keyset_select(
+            user_messages.filter(ChatMessage.timestamp >= since),
+            ChatMessage.timestamp, ChatMessage.message_id, limit, cursor
+        )).scalars().all())
+        if len(rows) <= limit:
+            rows += self.db.execute(keyset_select(
+                user_messages.filter(ChatMessage.timestamp < since),
+                ChatMessage.timestamp, ChatMessage.message_id, limit - len(rows), cursor
+            )).scalars().all()
+        month = None
+        while len(rows) <= limit:
+            bound = _archive_bound(rows, cursor)
+            archive = self.db.execute(_next_archive(user_id, bound, month)).scalar()
+            if archive is None:
+                break
+            rows += _unpack_archive(archive, bound)[:limit + 1 - len(rows)]
+            month = archive.month
+        page, next_cursor = keyset_page(rows, limit, "timestamp", "message_id")
+        return page[::-1], next_cursor
 
     def get_recent_context(self, user_id: int, limit: int = 5) -> List[ChatMessage]:
         """Returns the most recent messages for AI context."""
-        return self.db.query(ChatMessage).filter(
-            ChatMessage.user_id == user_id
+        since = _window_start()
+        user_messages = self.db.query(ChatMessage).filter(ChatMessage.user_id == user_id)
+        recent = user_messages.filter(
+            ChatMessage.timestamp >= since
         ).order_by(ChatMessage.timestamp.desc()).limit(limit).all()
+        if len(recent) < limit:
+            recent += user_messages.filter(
+                ChatMessage.timestamp < since
+            ).order_by(ChatMessage.timestamp.desc()).limit(limit - len(recent)).all()
+        return recent
+
+class AsyncChatRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save_message(self, user_id: int, role: str, content: str, commit: bool = True) -> ChatMessage:
+        """With commit=False the row is only flushed and joins the caller's transaction."""
+        message = ChatMessage(
+            user_id=user_id,
+            role=role,
+            content=content
+        )
+        self.db.add(message)
+        if not commit:
+            await self.db.flush()
+            return message
+        await self.db.commit()
+        await self.db.refresh(message)
+        return message
+
+    async def get_history(self, user_id: int, limit: int = 50) -> List[ChatMessage]:
+        """Returns the latest `limit` messages, oldest first."""
+        return (await self.get_history_page(user_id, limit))[0]
+
+    async def get_history_page(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[ChatMessage], Optional[str]]:
+        """
+        The `limit` messages before `cursor` (the latest ones without it) in
+        chronological order, and the cursor for the next, older page. Pages
+        continue into archived months after the live ones.
+        """
+        since = _window_start(cursor)
+        user_messages = select(ChatMessage).filter(ChatMessage.user_id == user_id)
+        result = await self.db.execute(keyset_select(
+            user_messages.filter(ChatMessage.timestamp >= since),
+            ChatMessage.timestamp, ChatMessage.message_id, limit, cursor
+        ))
+        rows = list(result.scalars().all())
+        if len(rows) <= limit:
+            result = await self.db.execute(keyset_select(
+                user_messages.filter(ChatMessage.timestamp < since),
+                ChatMessage.timestamp, ChatMessage.message_id, limit - len(rows), cursor
+            ))
+            rows += result.scalars().all()
+        month = None
+        while len(rows) <= limit:
+            bound = _archive_bound(rows, cursor)
+            archive = (await self.db.execute(_next_archive(user_id, bound, month))).scalar()
+            if archive is None:
+                break
+            rows += _unpack_archive(archive, bound)[:limit + 1 - len(rows)]
+            month = archive.month
+        page, next_cursor = keyset_page(rows, limit, "timestamp", "message_id")
+        return page[::-1], next_cursor
+
+    async def get_recent_context(self, user_id: int, limit: int = 5) -> List[ChatMessage]:
+        """Returns the most recent messages for AI context."""
+        since = _window_start()
+        user_messages = select(ChatMessage).filter(ChatMessage.user_id == user_id)
+        result = await self.db.execute(
+            user_messages.filter(
+                ChatMessage.timestamp >= since
+            ).order_by(ChatMessage.timestamp.desc()).limit(limit)
+        )
+        recent = list(result.scalars().all())
+        if len(recent) < limit:
+            result = await self.db.execute(
+                user_messages.filter(
+                    ChatMessage.timestamp < since
+                ).order_by(ChatMessage.timestamp.desc()).limit(limit - len(recent))
+            )
+            recent += result.scalars().all()
+        return recent
@@ -0,0 +1,49 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from backend.models import HabitRiskScore
+from datetime import date, datetime
+from typing import Optional, Dict, Any
+
+class HabitRiskRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_score(self, user_id: int, day: date) -> Optional[HabitRiskScore]:
+        return self.db.get(HabitRiskScore, (user_id, day))
+
+    def upsert_score(self, user_id: int, day: date, risk: Optional[float], inputs: Dict[str, Any]) -> HabitRiskScore:
+        values = {
+            "user_id": user_id,
+            "day": day,
+            "risk": risk,
+            "inputs": inputs,
+            "stale": False,
+            "computed_at": datetime.utcnow()
+        }
+        stmt = insert(HabitRiskScore).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HabitRiskScore.user_id, HabitRiskScore.day],
+            set_={k: v for k, v in values.items() if k not in ("user_id", "day")}
+        )
+        # RETURNING with populate_existing overwrites an already loaded row; a plain
+        # get() would answer from the identity map on sessions that do not expire on commit
+        row = self.db.execute(
+            stmt.returning(HabitRiskScore),
+            execution_options={"populate_existing": True}
+        ).scalar_one()
+        self.db.commit()
+        return row
+
+    def mark_stale(self, user_id: int, since: date, commit: bool = True) -> int:
+        """
+        Flags the user's scores from `since` onwards for recomputation on next read.
+        With commit=False the update joins the caller's transaction.
+        """
+        updated = self.db.query(HabitRiskScore).filter(
+            HabitRiskScore.user_id == user_id,
+            HabitRiskScore.day >= since,
+            HabitRiskScore.stale == False
+        ).update({HabitRiskScore.stale: True}, synchronize_session=False)
+        if commit:
+            self.db.commit()
+        return updated
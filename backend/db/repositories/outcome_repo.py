@@ -1,7 +1,35 @@
+import re
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from backend.models import Outcome, OutcomeType
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime
+from typing import List, Optional, Dict, Any, Tuple
+from backend.db.pagination import keyset_select, keyset_page
+
+_FRACTION = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)\s*$")
+_PERCENT = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*%")
+_LEADING_NUMBER = re.compile(r"^\s*(-?\d+(?:\.\d+)?)")
+
+def parse_outcome_value(outcome_type: OutcomeType, value: Optional[str]) -> Optional[float]:
+    """
+    Extracts a numeric value from a free-text outcome ("8", "8/10", "85%", "7 - decent").
+    Fractions and percentages are scaled to the type's range: 100 for exam
+    scores, 10 for ratings ("85%" is 8.5 for a rating).
+    Must stay in sync with the backfill in migration 0afa4029981e.
+    """
+    if value is None:
+        return None
+    value = str(value)
+    scale = 100 if outcome_type == OutcomeType.exam_score else 10
+    fraction = _FRACTION.match(value)
+    if fraction and float(fraction.group(2)) > 0:
+        return float(fraction.group(1)) / float(fraction.group(2)) * scale
+    percent = _PERCENT.match(value)
+    if percent:
+        return float(percent.group(1)) / 100 * scale
+    leading = _LEADING_NUMBER.match(value)
+    return float(leading.group(1)) if leading else None
 
 class OutcomeRepository:
     def __init__(self, db: Session):
@@ -12,6 +40,7 @@ class OutcomeRepository:
             user_id=user_id,
             date=date,
             outcome_type=outcome_type,
+            outcome_numeric=parse_outcome_value(outcome_type, kwargs.get("outcome_value")),
             **kwargs
         )
         self.db.add(db_outcome)
@@ -22,5 +51,116 @@ class OutcomeRepository:
     def get_user_outcomes(self, user_id: int, limit: int = 100) -> List[Outcome]:
         return self.db.query(Outcome).filter(Outcome.user_id == user_id).order_by(Outcome.date.desc()).limit(limit).all()
 
+    def get_user_outcomes_page(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[Outcome], Optional[str]]:
+        """
+        Newest-first page of a user's outcomes by (date, outcome_id) and the cursor for the next page.
+        """
+        stmt = keyset_select(
+            select(Outcome).filter(Outcome.user_id == user_id),
+            Outcome.date, Outcome.outcome_id, limit, cursor
+        )
+        return keyset_page(self.db.execute(stmt).scalars().all(), limit, "date", "outcome_id")
+
     def get_outcome_by_id(self, outcome_id: int) -> Optional[Outcome]:
         return self.db.query(Outcome).filter(Outcome.outcome_id == outcome_id).first()
+
+    def get_type_averages(self, user_id: int, since: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-type count, average, min, max and latest value of numeric outcomes since `since`.
+        """
+        rows = self.db.query(
+            Outcome.outcome_type,
+            func.count(Outcome.outcome_numeric).label("count"),
+            func.avg(Outcome.outcome_numeric).label("avg"),
+            func.min(Outcome.outcome_numeric).label("min"),
+            func.max(Outcome.outcome_numeric).label("max"),
+        ).filter(
+            Outcome.user_id == user_id,
+            Outcome.date >= since,
+            Outcome.outcome_numeric.isnot(None)
+        ).group_by(Outcome.outcome_type).all()
+
+        return {
+            r.outcome_type.value: {
+                "count": r.count,
+                "avg": round(float(r.avg), 2),
+                "min": float(r.min),
+                "max": float(r.max)
+            }
+            for r in rows
+        }
+
+    def get_daily_trend(self, user_id: int, outcome_type: OutcomeType, since: datetime) -> List[Dict[str, Any]]:
+        """
+        Daily average of one outcome type, served by the (user_id, outcome_type, date) index.
+        """
+        day = func.date_trunc("day", Outcome.date)
+        rows = self.db.query(
+            day.label("day"),
+            func.avg(Outcome.outcome_numeric).label("avg")
+        ).filter(
+            Outcome.user_id == user_id,
+            Outcome.outcome_type == outcome_type,
+            Outcome.date >= since,
+            Outcome.outcome_numeric.isnot(None)
+        ).group_by(day).order_by(day).all()
+        return [{"date": r.day.date().isoformat(), "value": round(float(r.avg), 2)} for r in rows]
+
+    def get_trend_slopes(self, user_id: int, since: datetime) -> Dict[str, Optional[float]]:
+        """
+        Per-type linear trend (change per day) via regr_slope over the epoch-day.
+        """
+        epoch_days = func.extract("epoch", Outcome.date) / 86400.0
+        rows = self.db.query(
+            Outcome.outcome_type,
+            func.regr_slope(Outcome.outcome_numeric, epoch_days).label("slope")
+        ).filter(
+            Outcome.user_id == user_id,
+            Outcome.date >= since,
+            Outcome.outcome_numeric.isnot(None)
+        ).group_by(Outcome.outcome_type).all()
+        return {r.outcome_type.value: (round(float(r.slope), 4) if r.slope is not None else None) for r in rows}
+
+    def get_effort_correlations(self, user_id: int, since: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Correlation between daily logged minutes and each outcome type on the same day.
+        """
+        rows = self.db.execute(text("""
+            WITH effort AS (
+                SELECT date_trunc('day', date) AS day, SUM(COALESCE(duration_minutes, 0)) AS minutes
+                FROM activity_log
+                WHERE user_id = :user_id AND date >= :since
+                GROUP BY 1
+            ), scores AS (
+                SELECT outcome_type, date_trunc('day', date) AS day, AVG(outcome_numeric) AS value
+                FROM outcome
+                WHERE user_id = :user_id AND date >= :since AND outcome_numeric IS NOT NULL
+                GROUP BY 1, 2
+            )
+            SELECT s.outcome_type::text AS outcome_type,
+                   COUNT(*) AS samples,
+                   corr(COALESCE(e.minutes, 0), s.value) AS correlation,
+                   regr_slope(s.value, COALESCE(e.minutes, 0)) AS slope_per_minute
+            FROM scores s
+            LEFT JOIN effort e ON e.day = s.day
+            GROUP BY s.outcome_type
+        """), {"user_id": user_id, "since": since}).all()
+
+        return {
+            r.outcome_type: {
+                "samples": r.samples,
+                "correlation": round(float(r.correlation), 3) if r.correlation is not None else None,
+                "slope_per_hour": round(float(r.slope_per_minute) * 60, 3) if r.slope_per_minute is not None else None
+            }
+            for r in rows
+        }
+
+class AsyncOutcomeRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_outcomes(self, user_id: int, limit: int = 100) -> List[Outcome]:
+        result = await self.db.execute(
+            select(Outcome).filter(Outcome.user_id == user_id).order_by(Outcome.date.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
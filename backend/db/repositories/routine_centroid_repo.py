@@ -0,0 +1,37 @@
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from backend.models import RoutineCentroid
+from datetime import datetime
+from typing import List
+
+class RoutineCentroidRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_centroids(self, trained_from: str) -> List[RoutineCentroid]:
+        """
+        The saved centroids that were moved from the trained centroids with
+        fingerprint `trained_from`, by cluster; empty after a retrain.
+        """
+        return self.db.query(RoutineCentroid).filter(
+            RoutineCentroid.trained_from == trained_from
+        ).order_by(RoutineCentroid.cluster).all()
+
+    def save_centroids(self, centroids: List[List[float]], weights: List[float], version: int, trained_from: str):
+        """
+        Replaces the saved centroids with one row per cluster in a single commit.
+        """
+        now = datetime.utcnow()
+        self.db.execute(delete(RoutineCentroid))
+        self.db.add_all([
+            RoutineCentroid(
+                cluster=cluster,
+                centroid=centroid,
+                weight=weight,
+                version=version,
+                trained_from=trained_from,
+                updated_at=now
+            )
+            for cluster, (centroid, weight) in enumerate(zip(centroids, weights))
+        ])
+        self.db.commit()
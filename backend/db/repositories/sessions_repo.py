@@ -4,7 +4,7 @@ from psycopg2.extras import RealDictCursor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 
-from backend.db.connection import get_db_connection, close_db_connection
+from backend.db.connection import pooled_connection
 from backend.utils.password import generate_token
 
 
@@ -27,26 +27,22 @@ class SessionRepository:
             Session dictionary or None if error
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            cur = conn.cursor()
+                token = generate_token()
+                expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
             
-            token = generate_token()
-            expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+                query = """
+                    INSERT INTO sessions (user_id, session_token, expires_at)
+                    VALUES (%s, %s, %s)
+                    RETURNING id, user_id, session_token, expires_at, created_at;
+                """
             
-            query = """
-                INSERT INTO sessions (user_id, session_token, expires_at)
-                VALUES (%s, %s, %s)
-                RETURNING id, user_id, session_token, expires_at, created_at;
-            """
-            
-            cur.execute(query, (user_id, token, expires_at))
-            session = cur.fetchone()
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (user_id, token, expires_at))
+                session = cur.fetchone()
+                conn.commit()
+                cur.close()
             
             return dict(session) if session else None
             
@@ -69,22 +65,18 @@ class SessionRepository:
             Session dictionary or None if not found or expired
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = """
-                SELECT id, user_id, session_token, expires_at, created_at
-                FROM sessions
-                WHERE session_token = %s AND expires_at > CURRENT_TIMESTAMP;
-            """
+                query = """
+                    SELECT id, user_id, session_token, expires_at, created_at
+                    FROM sessions
+                    WHERE session_token = %s AND expires_at > CURRENT_TIMESTAMP;
+                """
             
-            cur.execute(query, (token,))
-            session = cur.fetchone()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (token,))
+                session = cur.fetchone()
+                cur.close()
             
             return dict(session) if session else None
             
@@ -107,23 +99,19 @@ class SessionRepository:
             List of session dictionaries
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = """
-                SELECT id, user_id, session_token, expires_at, created_at
-                FROM sessions
-                WHERE user_id = %s AND expires_at > CURRENT_TIMESTAMP
-                ORDER BY created_at DESC;
-            """
+                query = """
+                    SELECT id, user_id, session_token, expires_at, created_at
+                    FROM sessions
+                    WHERE user_id = %s AND expires_at > CURRENT_TIMESTAMP
+                    ORDER BY created_at DESC;
+                """
             
-            cur.execute(query, (user_id,))
-            sessions = cur.fetchall()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (user_id,))
+                sessions = cur.fetchall()
+                cur.close()
             
             return [dict(s) for s in sessions]
             
@@ -146,19 +134,15 @@ class SessionRepository:
             True if deleted, False otherwise
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            cur = conn.cursor()
+                query = "DELETE FROM sessions WHERE session_token = %s;"
+                cur.execute(query, (token,))
             
-            query = "DELETE FROM sessions WHERE session_token = %s;"
-            cur.execute(query, (token,))
-            
-            deleted = cur.rowcount > 0
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                deleted = cur.rowcount > 0
+                conn.commit()
+                cur.close()
             
             return deleted
             
@@ -178,19 +162,15 @@ class SessionRepository:
             Number of deleted sessions
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = "DELETE FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP;"
-            cur.execute(query)
+                query = "DELETE FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP;"
+                cur.execute(query)
             
-            deleted_count = cur.rowcount
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                deleted_count = cur.rowcount
+                conn.commit()
+                cur.close()
             
             return deleted_count
             
@@ -1,7 +1,9 @@
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from backend.models import AnalyticsSummary
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 class AnalyticsSummaryRepository:
     def __init__(self, db: Session):
@@ -24,3 +26,83 @@ class AnalyticsSummaryRepository:
         return self.db.query(AnalyticsSummary).filter(
             AnalyticsSummary.user_id == user_id
         ).order_by(AnalyticsSummary.generated_at.desc()).limit(limit).all()
+
+    def get_users_over_limit(self, period_type: str, keep: int, after_user_id: int, limit: int) -> List[int]:
+        """
+        Users (ascending, after `after_user_id`) with more than `keep` summaries of `period_type`.
+        """
+        rows = self.db.query(AnalyticsSummary.user_id).filter(
+            AnalyticsSummary.period_type == period_type,
+            AnalyticsSummary.user_id > after_user_id
+        ).group_by(AnalyticsSummary.user_id).having(
+            func.count() > keep
+        ).order_by(AnalyticsSummary.user_id).limit(limit).all()
+        return [r.user_id for r in rows]
+
+    def get_keep_boundary(self, user_id: int, period_type: str, keep: int) -> Optional[Tuple[datetime, int]]:
+        """
+        (generated_at, summary_id) of the oldest of the user's `keep` latest summaries of `period_type`.
+        """
+        row = self.db.query(AnalyticsSummary.generated_at, AnalyticsSummary.summary_id).filter(
+            AnalyticsSummary.user_id == user_id,
+            AnalyticsSummary.period_type == period_type
+        ).order_by(
+            AnalyticsSummary.generated_at.desc(), AnalyticsSummary.summary_id.desc()
+        ).offset(keep - 1).first()
+        return (row.generated_at, row.summary_id) if row else None
+
+    def get_summaries_before(self, user_id: int, period_type: str, boundary: Tuple[datetime, int], limit: int) -> List[AnalyticsSummary]:
+        """
+        Oldest-first summaries of `period_type` generated before `boundary`.
+        """
+        return self.db.query(AnalyticsSummary).filter(
+            AnalyticsSummary.user_id == user_id,
+            AnalyticsSummary.period_type == period_type,
+            tuple_(AnalyticsSummary.generated_at, AnalyticsSummary.summary_id) < tuple_(*boundary)
+        ).order_by(AnalyticsSummary.generated_at, AnalyticsSummary.summary_id).limit(limit).all()
+
+    def get_summary_for_period(self, user_id: int, period_type: str, period_start: datetime) -> Optional[AnalyticsSummary]:
+        return self.db.query(AnalyticsSummary).filter(
+            AnalyticsSummary.user_id == user_id,
+            AnalyticsSummary.period_type == period_type,
+            AnalyticsSummary.period_start == period_start
+        ).first()
+
+    def replace_with_digests(self, digests: List[AnalyticsSummary], summary_ids: List[int]) -> None:
+        """
+        Saves the digests and deletes the summaries they replace in one transaction.
+        """
+        self.db.add_all(digests)
+        self.db.query(AnalyticsSummary).filter(
+            AnalyticsSummary.summary_id.in_(summary_ids)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+class AsyncAnalyticsSummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_summary(self, user_id: int, period_type: str, period_start: datetime, period_end: datetime, commit: bool = True, **kwargs):
+        """With commit=False the row is only flushed and joins the caller's transaction."""
+        db_summary = AnalyticsSummary(
+            user_id=user_id,
+            period_type=period_type,
+            period_start=period_start,
+            period_end=period_end,
+            **kwargs
+        )
+        self.db.add(db_summary)
+        if not commit:
+            await self.db.flush()
+            return db_summary
+        await self.db.commit()
+        await self.db.refresh(db_summary)
+        return db_summary
+
+    async def get_latest_summaries(self, user_id: int, limit: int = 5) -> List[AnalyticsSummary]:
+        result = await self.db.execute(
+            select(AnalyticsSummary).filter(
+                AnalyticsSummary.user_id == user_id
+            ).order_by(AnalyticsSummary.generated_at.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from backend.models import UserProfile
 from typing import Optional
@@ -21,3 +23,28 @@ class UserProfileRepository:
 
     def get_profile(self, user_id: int) -> Optional[UserProfile]:
         return self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+
+class AsyncUserProfileRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_or_update_profile(self, user_id: int, commit: bool = True, **kwargs) -> UserProfile:
+        """With commit=False the profile is only flushed and joins the caller's transaction."""
+        db_profile = await self.get_profile(user_id)
+        if db_profile:
+            for key, value in kwargs.items():
+                setattr(db_profile, key, value)
+        else:
+            db_profile = UserProfile(user_id=user_id, **kwargs)
+            self.db.add(db_profile)
+
+        if not commit:
+            await self.db.flush()
+            return db_profile
+        await self.db.commit()
+        await self.db.refresh(db_profile)
+        return db_profile
+
+    async def get_profile(self, user_id: int) -> Optional[UserProfile]:
+        result = await self.db.execute(select(UserProfile).filter(UserProfile.user_id == user_id))
+        return result.scalars().first()
@@ -0,0 +1,41 @@
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from backend.models import UserScore
+from typing import List, Optional, Dict, Any
+
+class UserScoreRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_score(self, user_id: int) -> Optional[UserScore]:
+        return self.db.query(UserScore).filter(UserScore.user_id == user_id).first()
+
+    def bulk_upsert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Writes one precomputed score row per user with batched multi-row
+        INSERT ... ON CONFLICT statements.
+        """
+        if not rows:
+            return 0
+        stmt = insert(UserScore)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserScore.user_id],
+            set_={c: stmt.excluded[c] for c in rows[0] if c != "user_id"}
+        )
+        # executemany lets SQLAlchemy batch the rows into multi-row VALUES with a cached statement
+        self.db.execute(stmt, rows)
+        self.db.commit()
+        return len(rows)
+
+    def delete_scores(self, user_ids: List[int], commit: bool = True) -> int:
+        """
+        Removes the score rows of `user_ids`, e.g. users a batch run found no
+        activity for, so their old scores are not served.
+        """
+        if not user_ids:
+            return 0
+        result = self.db.execute(delete(UserScore).where(UserScore.user_id.in_(user_ids)))
+        if commit:
+            self.db.commit()
+        return result.rowcount
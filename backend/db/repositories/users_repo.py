@@ -3,7 +3,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from typing import Optional, Dict, Any
 
-from backend.db.connection import get_db_connection, close_db_connection
+from backend.db.connection import pooled_connection
 from backend.utils.password import hash_password, verify_password
 
 
@@ -28,25 +28,21 @@ class UserRepository:
             User dictionary with id or None if error
         """
         try: 
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            cur = conn.cursor()
+                password_hash = hash_password(password)
             
-            password_hash = hash_password(password)
+                query = """
+                    INSERT INTO users (email, name, password_hash)
+                    VALUES (%s, %s, %s)
+                    RETURNING id, email, name, created_at;
+                """
             
-            query = """
-                INSERT INTO users (email, name, password_hash)
-                VALUES (%s, %s, %s)
-                RETURNING id, email, name, created_at;
-            """
-            
-            cur.execute(query, (email, name, password_hash))
-            user = cur.fetchone()
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (email, name, password_hash))
+                user = cur.fetchone()
+                conn.commit()
+                cur.close()
             
             return dict(user) if user else None
             
@@ -72,22 +68,18 @@ class UserRepository:
             User dictionary or None if not found
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = """
-                SELECT id, email, name, password_hash, created_at, updated_at
-                FROM users
-                WHERE email = %s;
-            """
+                query = """
+                    SELECT id, email, name, password_hash, created_at, updated_at
+                    FROM users
+                    WHERE email = %s;
+                """
             
-            cur.execute(query, (email,))
-            user = cur.fetchone()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (email,))
+                user = cur.fetchone()
+                cur.close()
             
             return dict(user) if user else None
             
@@ -110,22 +102,18 @@ class UserRepository:
             User dictionary or None if not found
         """
         try:
-            conn = get_db_connection()
-            if not conn:
-                raise Exception("Failed to get database connection")
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            cur = conn.cursor()
+                query = """
+                    SELECT id, email, name, created_at, updated_at
+                    FROM users
+                    WHERE id = %s;
+                """
             
-            query = """
-                SELECT id, email, name, created_at, updated_at
-                FROM users
-                WHERE id = %s;
-            """
-            
-            cur.execute(query, (user_id,))
-            user = cur.fetchone()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, (user_id,))
+                user = cur.fetchone()
+                cur.close()
             
             return dict(user) if user else None
             
@@ -177,34 +165,31 @@ class UserRepository:
             Updated user dictionary or None if error
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
-            
             # Build dynamic query
             allowed_fields = ['name', 'email']
             updates = {k: v for k, v in kwargs.items() if k in allowed_fields}
             
+            # Checked before taking a connection so the lookup does not hold two
             if not updates:
                 return UserRepository.get_user_by_id(user_id)
             
-            set_clause = ", ".join([f"{k} = %s" for k in updates. keys()])
-            values = list(updates.values()) + [user_id]
+            with pooled_connection() as conn:
+                cur = conn.cursor()
+            
+                set_clause = ", ".join([f"{k} = %s" for k in updates. keys()])
+                values = list(updates.values()) + [user_id]
             
-            query = f"""
-                UPDATE users
-                SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-                RETURNING id, email, name, created_at, updated_at;
-            """
+                query = f"""
+                    UPDATE users
+                    SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    RETURNING id, email, name, created_at, updated_at;
+                """
             
-            cur.execute(query, values)
-            user = cur.fetchone()
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                cur.execute(query, values)
+                user = cur.fetchone()
+                conn.commit()
+                cur.close()
             
             return dict(user) if user else None
             
@@ -227,19 +212,15 @@ class UserRepository:
             True if deleted, False otherwise
         """
         try: 
-            conn = get_db_connection()
-            if not conn: 
-                raise Exception("Failed to get database connection")
-            
-            cur = conn.cursor()
+            with pooled_connection() as conn:
+                cur = conn.cursor()
             
-            query = "DELETE FROM users WHERE id = %s;"
-            cur. execute(query, (user_id,))
+                query = "DELETE FROM users WHERE id = %s;"
+                cur. execute(query, (user_id,))
             
-            deleted = cur.rowcount > 0
-            conn.commit()
-            cur.close()
-            close_db_connection(conn)
+                deleted = cur.rowcount > 0
+                conn.commit()
+                cur.close()
             
             return deleted
             
@@ -39,7 +39,7 @@ CREATE TABLE IF NOT EXISTS activity_log (
     postponed BOOLEAN DEFAULT FALSE,
     energy_level INTEGER,
     notes TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- 5. OUTCOME (RESULTS)
@@ -49,6 +49,7 @@ CREATE TABLE IF NOT EXISTS outcome (
     date DATE NOT NULL,
     outcome_type VARCHAR(50) NOT NULL, -- exam_score, productivity_rating, etc.
     outcome_value TEXT,
+    outcome_numeric DOUBLE PRECISION, -- parsed from outcome_value at write time
     related_activity_id INTEGER REFERENCES activity(activity_id)
 );
 
@@ -56,17 +57,95 @@ CREATE TABLE IF NOT EXISTS outcome (
 CREATE TABLE IF NOT EXISTS analytics_summary (
     summary_id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL REFERENCES "user"(user_id) ON DELETE CASCADE,
-    period_type VARCHAR(20) NOT NULL, -- daily, weekly, monthly
+    period_type VARCHAR(20) NOT NULL, -- daily, weekly, monthly, query_response, query_digest
     period_start TIMESTAMP NOT NULL,
     period_end TIMESTAMP NOT NULL,
     focus_distribution JSONB,
     activity_balance JSONB,
     goal_alignment TEXT,
     key_insight TEXT,
+    source_count INTEGER,
     generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 7. USER_SCORE (NIGHTLY BATCH MODEL SCORES)
+CREATE TABLE IF NOT EXISTS user_score (
+    user_id INTEGER PRIMARY KEY REFERENCES "user"(user_id) ON DELETE CASCADE,
+    period_days INTEGER NOT NULL,
+    productivity_score FLOAT,
+    study_performance FLOAT,
+    habit_risk FLOAT,
+    routine_cluster INTEGER,
+    routine_label VARCHAR(50),
+    features JSONB,
+    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 8. HABIT_RISK_SCORE (ONE CACHED SCORE PER USER PER LOCAL DAY)
+CREATE TABLE IF NOT EXISTS habit_risk_score (
+    user_id INTEGER NOT NULL REFERENCES "user"(user_id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    risk FLOAT,
+    inputs JSONB,
+    stale BOOLEAN NOT NULL DEFAULT FALSE,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day)
+);
+
+-- 9. BEHAVIOR_FLAG (BURNOUT / RECOVERY / ANOMALY / SHIFT PERIODS)
+CREATE TABLE IF NOT EXISTS behavior_flag (
+    flag_id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES "user"(user_id) ON DELETE CASCADE,
+    kind VARCHAR(30) NOT NULL,
+    metric VARCHAR(30),
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    severity FLOAT,
+    details JSONB,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 10. CHAT_MESSAGE (MONTHLY RANGE PARTITIONS; backend/db/chat_partitions.py adds months and archives old ones)
+CREATE TABLE IF NOT EXISTS chat_message (
+    message_id SERIAL,
+    user_id INTEGER NOT NULL REFERENCES "user"(user_id) ON DELETE CASCADE,
+    role VARCHAR(10) NOT NULL,
+    content TEXT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (message_id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+CREATE TABLE IF NOT EXISTS chat_message_default PARTITION OF chat_message DEFAULT;
+
+-- 11. CHAT_MESSAGE_ARCHIVE (ONE GZIP-COMPRESSED JSON ROW PER USER PER ARCHIVED MONTH)
+CREATE TABLE IF NOT EXISTS chat_message_archive (
+    archive_id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES "user"(user_id) ON DELETE CASCADE,
+    month DATE NOT NULL,
+    message_count INTEGER NOT NULL,
+    first_message_at TIMESTAMP NOT NULL,
+    last_message_at TIMESTAMP NOT NULL,
+    messages BYTEA NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE chat_message_archive ALTER COLUMN messages SET STORAGE EXTERNAL;
+
+-- 12. ROUTINE_CENTROID (ONLINE-UPDATED ROUTINE CLUSTER CENTROIDS, ONE ROW PER CLUSTER)
+CREATE TABLE IF NOT EXISTS routine_centroid (
+    cluster INTEGER PRIMARY KEY,
+    centroid JSONB NOT NULL,
+    weight FLOAT NOT NULL,
+    version INTEGER NOT NULL,
+    trained_from VARCHAR(40) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance
-CREATE INDEX IF NOT EXISTS idx_activity_log_user_date ON activity_log(user_id, date);
-CREATE INDEX IF NOT EXISTS idx_outcome_user_date ON outcome(user_id, date);
-CREATE INDEX IF NOT EXISTS idx_analytics_summary_user_period ON analytics_summary(user_id, period_type);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS ix_activity_log_user_date ON activity_log(user_id, date);
+CREATE INDEX IF NOT EXISTS ix_activity_log_user_created ON activity_log(user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_outcome_user_date ON outcome(user_id, date);
+CREATE INDEX IF NOT EXISTS ix_chat_message_user_timestamp ON chat_message(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS ix_analytics_summary_user_generated ON analytics_summary(user_id, generated_at);
+CREATE INDEX IF NOT EXISTS ix_outcome_user_type_date ON outcome(user_id, outcome_type, date);
+CREATE INDEX IF NOT EXISTS idx_analytics_summary_user_period ON analytics_summary(user_id, period_type);
+CREATE INDEX IF NOT EXISTS ix_behavior_flag_user_end ON behavior_flag(user_id, end_date);
+CREATE INDEX IF NOT EXISTS ix_chat_message_archive_user_month ON chat_message_archive(user_id, month);
\ No newline at end of file
@@ -1,13 +1,19 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session, engine
+from backend.db.connection import get_db_session, engine, async_engine, replica_engine, async_replica_engine, replica_router, pg_pool, warm_pools, pool_metrics
+from backend.db.replica import request_user_id
 from backend.db import Base
+from backend.db.pagination import NEXT_CURSOR_HEADER
 from backend.models import User
 import uvicorn
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import activities, activity_types, profiles, outcomes, intelligence, auth, dashboard
+from backend.routers import activities, activity_types, profiles, outcomes, intelligence, auth, dashboard, ml
+from backend.ml.registry import model_registry
+from backend.ml.routines import routine_assigner
+from backend.utils.auth import decode_access_token, get_current_user
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +28,28 @@ async def lifespan(app: FastAPI):
         logger.info("✅ DATABASE SYNC COMPLETE")
     except Exception as e:
         logger.error(f"❌ DATABASE ERROR: {str(e)}")
+    logger.info(f"✅ DATABASE POOL WARMED ({warm_pools()} connections)")
+    try:
+        model_registry.load()
+        if routine_assigner.load_centroids():
+            logger.info(f"✅ ROUTINE CENTROIDS RESTORED (version {routine_assigner.centroid_version})")
+    except Exception as e:
+        logger.error(f"❌ ML MODEL LOAD ERROR: {str(e)}")
+    centroid_task = asyncio.create_task(routine_assigner.run_schedule())
+    replica_task = None
+    if replica_router.enabled:
+        await replica_router.check()
+        replica_task = asyncio.create_task(replica_router.run_schedule())
+        logger.info(f"✅ READ REPLICA CONFIGURED (lag {replica_router.lag_seconds}s)")
     yield
+    centroid_task.cancel()
+    if replica_task:
+        replica_task.cancel()
+    pg_pool.closeall()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+        await async_replica_engine.dispose()
 
 app = FastAPI(
     title="NEEL",
@@ -37,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Logging middleware
@@ -47,6 +75,20 @@ async def log_requests(request: Request, call_next):
     logger.info(f"🟢 RESPONSE: {response.status_code}")
     return response
 
+# Read-after-write routing: a successful write keeps the writer's reads on the primary
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    payload = decode_access_token(token) if scheme.lower() == "bearer" and token else None
+    request.state.user_id = payload.get("sub") if payload else None
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        # Writes that name no user (e.g. POST /api/outcomes/) mark every reader
+        replica_router.mark_write(request_user_id(request))
+    return response
+
 @app.get("/")
 async def root():
     return {"status": "online", "version": "1.0.7", "app": "NEEL"}
@@ -59,6 +101,11 @@ async def root_head():
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics/db")
+async def db_metrics(current_user: User = Depends(get_current_user)):
+    """Connection pool state for this worker: in-use and overflow connections, checkout wait times, replica lag."""
+    return pool_metrics()
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
@@ -67,6 +114,7 @@ app.include_router(activity_types.router, prefix="/api/activity-types", tags=["a
 app.include_router(profiles.router, prefix="/api/profiles", tags=["profiles"])
 app.include_router(outcomes.router, prefix="/api/outcomes", tags=["outcomes"])
 app.include_router(intelligence.router, prefix="/api/intelligence", tags=["intelligence"])
+app.include_router(ml.router, prefix="/api/ml", tags=["ml"])
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
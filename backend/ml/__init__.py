@@ -0,0 +1 @@
+"""Machine learning serving package."""
@@ -0,0 +1,119 @@
+"""
+Nightly batch scoring.
+
+Streams user ids in keyset-ordered chunks, builds each chunk's feature matrix
+with one aggregated query, scores it with every model in a single vectorized
+call per model and bulk-upserts the results into user_score. Chunks are spread
+across a process pool.
+
+    python -m backend.ml.batch --days 7 --chunk-size 1000 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+
+from backend.db.connection import SessionLocal, engine
+from backend.db.repositories.user_score_repo import UserScoreRepository
+from backend.ml.features import load_daily_rollups, window_features
+from backend.ml.registry import model_registry, FEATURE_ORDER
+from backend.ml.routines import routine_assigner
+
+MODEL_INPUTS = [f for fields in FEATURE_ORDER.values() for f in fields]
+
+
+def iter_user_chunks(chunk_size: int) -> Iterator[List[int]]:
+    """
+    Yields user ids in ascending chunks using keyset pagination, so memory stays
+    bounded regardless of the number of users.
+    """
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            ids = [r[0] for r in db.execute(
+                text('SELECT user_id FROM "user" WHERE user_id > :last_id ORDER BY user_id LIMIT :limit'),
+                {"last_id": last_id, "limit": chunk_size}
+            )]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+    finally:
+        db.close()
+
+
+def _init_worker():
+    # Connections inherited from the parent must not be reused across processes
+    engine.dispose(close=False)
+    model_registry.load()
+    # Score with the centroids the API has moved online, not the trained ones
+    routine_assigner.load_centroids()
+
+
+def score_chunk(user_ids: List[int], days: int) -> int:
+    """
+    Scores one chunk of users and writes their rows. Users of the chunk with no
+    activity in the window lose their previous row. Returns the number of users scored.
+    """
+    db = SessionLocal()
+    try:
+        repo = UserScoreRepository(db)
+        since = datetime.utcnow() - timedelta(days=days)
+        features = window_features(load_daily_rollups(db, since, user_ids=user_ids), days)
+        scored_ids = set(features.index.astype(int))
+        repo.delete_scores([u for u in user_ids if u not in scored_ids], commit=False)
+        if features.empty:
+            db.commit()
+            return 0
+
+        scores = model_registry.score_frame(features)
+        rows = scores.assign(
+            user_id=scores.index.astype(int),
+            period_days=days,
+            scored_at=datetime.utcnow()
+        ).to_dict(orient="records")
+        for row, inputs in zip(rows, features[MODEL_INPUTS].round(4).to_dict(orient="records")):
+            row["features"] = inputs
+        return repo.bulk_upsert(rows)
+    finally:
+        db.close()
+
+
+def run(days: int = 7, chunk_size: int = 1000, workers: Optional[int] = None) -> int:
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    scored = 0
+    chunks = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        for user_ids in iter_user_chunks(chunk_size):
+            # Keep at most two chunks per worker in flight to bound memory
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                scored += sum(f.result() for f in done)
+            pending.add(pool.submit(score_chunk, user_ids, days))
+            chunks += 1
+        scored += sum(f.result() for f in wait(pending).done)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Scored {scored} users in {chunks} chunks with {workers} workers ({elapsed:.1f}s)")
+    return scored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-score all users with the NEEL ML models.")
+    parser.add_argument("--days", type=int, default=7, help="Trailing window of activity to score (default: 7)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Users per chunk (default: 1000)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    run(days=args.days, chunk_size=args.chunk_size, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Pickle-free model artifacts.
+
+The shipped models are plain linear models and KMeans centroids, so they are
+stored as small JSON files (weights, intercepts, centroids, feature order) and
+evaluated with NumPy. Loading them needs neither scikit-learn nor unpickling.
+
+Export the pickles once after (re)training:
+    python -m backend.ml.compact
+"""
+import json
+import os
+import sys
+from typing import Dict, Any, List
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+class CompactLinearModel:
+    """Linear regression: y = X @ coef + intercept."""
+    kind = "linear"
+
+    def __init__(self, feature_names: List[str], coef: List[float], intercept: float):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class CompactLogisticModel:
+    """Binary logistic regression: p = sigmoid(X @ coef + intercept)."""
+    kind = "logistic"
+
+    def __init__(self, feature_names: List[str], coef: List[float], intercept: float, classes: List[int]):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.classes_ = np.asarray(classes)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # sigmoid written as exp(-log(1 + e^-z)) to stay finite for large |z|
+        positive = np.exp(-np.logaddexp(0.0, -self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+class CompactKMeans:
+    """Nearest-centroid assignment over fixed KMeans centroids."""
+    kind = "kmeans"
+
+    def __init__(self, feature_names: List[str], centroids: List[List[float]]):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.cluster_centers_ = np.asarray(centroids, dtype=np.float64)
+        self._center_norms = (self.cluster_centers_ ** 2).sum(axis=1)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Squared distance from each row to each centroid."""
+        X = np.asarray(X, dtype=np.float64)
+        return (X ** 2).sum(axis=1)[:, None] - 2 * X @ self.cluster_centers_.T + self._center_norms
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.argmin(self.transform(X), axis=1)
+
+
+def to_artifact(model) -> Dict[str, Any]:
+    """
+    Converts a fitted scikit-learn LinearRegression, binary LogisticRegression
+    or KMeans into a JSON-serializable artifact.
+    """
+    kind = type(model).__name__
+    artifact = {
+        "format_version": FORMAT_VERSION,
+        "features": [str(f) for f in model.feature_names_in_],
+    }
+    if kind == "LinearRegression":
+        artifact.update(kind="linear", coef=np.ravel(model.coef_).tolist(), intercept=float(np.ravel(model.intercept_)[0]))
+    elif kind == "LogisticRegression":
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary logistic models can be exported")
+        artifact.update(kind="logistic", coef=np.ravel(model.coef_).tolist(), intercept=float(model.intercept_[0]),
+                        classes=[int(c) for c in model.classes_])
+    elif kind == "KMeans":
+        artifact.update(kind="kmeans", centroids=model.cluster_centers_.tolist())
+    else:
+        raise ValueError(f"Unsupported model type: {kind}")
+    return artifact
+
+
+def from_artifact(artifact: Dict[str, Any]):
+    if artifact.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format: {artifact.get('format_version')}")
+    kind = artifact["kind"]
+    if kind == "linear":
+        return CompactLinearModel(artifact["features"], artifact["coef"], artifact["intercept"])
+    if kind == "logistic":
+        return CompactLogisticModel(artifact["features"], artifact["coef"], artifact["intercept"], artifact["classes"])
+    if kind == "kmeans":
+        return CompactKMeans(artifact["features"], artifact["centroids"])
+    raise ValueError(f"Unknown artifact kind: {kind}")
+
+
+def save_artifact(model, path: str):
+    with open(path, "w") as f:
+        json.dump(to_artifact(model), f, indent=2)
+
+
+def load_artifact(path: str):
+    with open(path) as f:
+        return from_artifact(json.load(f))
+
+
+def verify_artifact(model, path: str):
+    """
+    Checks that the artifact at `path` predicts like `model` on random inputs.
+    A mismatching artifact is deleted and ValueError raised.
+    """
+    compact = load_artifact(path)
+    probe = np.random.default_rng(0).uniform(0, 500, size=(64, len(compact.feature_names_in_)))
+    if hasattr(model, "predict_proba"):
+        matches = np.allclose(model.predict_proba(probe), compact.predict_proba(probe))
+    else:
+        matches = np.allclose(model.predict(probe), compact.predict(probe))
+    if not matches:
+        os.remove(path)
+        raise ValueError(f"Artifact {path} does not reproduce the predictions of {type(model).__name__}")
+
+
+def export_all(models_dir: str) -> List[str]:
+    """
+    Converts every models/*.pkl in `models_dir` into a sibling .json artifact
+    and checks that both give the same predictions.
+    """
+    import joblib
+
+    written = []
+    for filename in sorted(os.listdir(models_dir)):
+        if not filename.endswith(".pkl"):
+            continue
+        model = joblib.load(os.path.join(models_dir, filename))
+        path = os.path.join(models_dir, filename[:-4] + ".json")
+        save_artifact(model, path)
+        verify_artifact(model, path)
+        written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    from backend.ml.registry import MODELS_DIR
+
+    for path in export_all(sys.argv[1] if len(sys.argv) > 1 else MODELS_DIR):
+        print(f"✅ Exported {path} ({os.path.getsize(path)} bytes)")
@@ -0,0 +1,284 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from backend.models import ActivityLog, Activity, ActivityCategory
+
+CATEGORIES = [c.value for c in ActivityCategory]
+COUNT_COLUMNS = ["logs", "completed", "planned", "planned_completed"]
+DAILY_COLUMNS = CATEGORIES + COUNT_COLUMNS
+
+# Sleep and commute are not logged in NEEL yet, so the time-based models get neutral defaults
+DEFAULT_SLEEP_MINUTES = 420.0
+DEFAULT_COMMUTE_MINUTES = 0.0
+# study_features.csv stores weekly study time min-max scaled onto 0-60; 40h/week maps to the top
+STUDY_MINUTES_CAP = 2400.0
+
+# Same columns (minus the productivity_score target) as data/processed/time_features.csv
+TIME_FEATURE_COLUMNS = [
+    "work_minutes", "leisure_minutes", "exercise_minutes", "sleep_minutes", "commute_minutes",
+    "work_ratio", "leisure_ratio", "health_ratio", "routine_variability",
+]
+
+FEATURE_HISTORY_DAYS = 84
+CACHE_TTL_SECONDS = 900
+
+
+class ProductivityFeatures(BaseModel):
+    work_ratio: float
+    leisure_ratio: float
+    health_ratio: float
+    routine_variability: float
+
+
+class StudyFeatures(BaseModel):
+    study_minutes_per_week: float
+    attendance_percentage: float
+    assignments_completed: float
+
+
+class HabitFeatures(BaseModel):
+    distraction_load: float
+    recovery_score: float
+    time_management_score: float
+
+
+class RoutineFeatures(BaseModel):
+    work_minutes: float
+    leisure_minutes: float
+    exercise_minutes: float
+    sleep_minutes: float
+
+
+class UserFeatures(BaseModel):
+    productivity: ProductivityFeatures
+    study: StudyFeatures
+    habit: HabitFeatures
+    routine: RoutineFeatures
+    days_logged: int
+    total_minutes: float
+
+    @classmethod
+    def from_row(cls, row: pd.Series) -> "UserFeatures":
+        def group(model):
+            return model(**{f: float(row[f]) for f in model.model_fields})
+        return cls(
+            productivity=group(ProductivityFeatures),
+            study=group(StudyFeatures),
+            habit=group(HabitFeatures),
+            routine=group(RoutineFeatures),
+            days_logged=int(row["active_days"]),
+            total_minutes=float(row["total_minutes"])
+        )
+
+
+def load_daily_rollups(db: Session, since: datetime, user_ids: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    One aggregated query returning a row per (user_id, day) with minutes per
+    category and log/completion counts. Days without logs are absent.
+    """
+    day = func.date_trunc("day", ActivityLog.date)
+    query = db.query(
+        ActivityLog.user_id,
+        day.label("day"),
+        Activity.activity_category,
+        func.coalesce(func.sum(ActivityLog.duration_minutes), 0).label("minutes"),
+        func.count(ActivityLog.log_id).label("logs"),
+        func.sum(case((ActivityLog.completed == True, 1), else_=0)).label("completed"),
+        func.sum(case((ActivityLog.planned == True, 1), else_=0)).label("planned"),
+        func.sum(case(((ActivityLog.planned == True) & (ActivityLog.completed == True), 1), else_=0)).label("planned_completed"),
+    ).join(Activity).filter(ActivityLog.date >= since)
+    if user_ids is not None:
+        query = query.filter(ActivityLog.user_id.in_(user_ids))
+    rows = query.group_by(ActivityLog.user_id, day, Activity.activity_category).all()
+
+    return rollups_from_rows(pd.DataFrame(
+        [(r.user_id, r.day, r.activity_category.value, r.minutes, r.logs, r.completed, r.planned, r.planned_completed) for r in rows],
+        columns=["user_id", "day", "category", "minutes"] + COUNT_COLUMNS
+    ))
+
+
+def rollups_from_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pivots per (user_id, day, category) aggregate rows into the daily rollup frame.
+    """
+    if raw.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS, index=pd.MultiIndex.from_tuples([], names=["user_id", "day"]), dtype=float)
+    raw = raw.assign(day=pd.to_datetime(raw["day"]).dt.normalize())
+    minutes = raw.pivot_table(index=["user_id", "day"], columns="category", values="minutes", aggfunc="sum", fill_value=0)
+    counts = raw.groupby(["user_id", "day"])[COUNT_COLUMNS].sum()
+    return minutes.reindex(columns=CATEGORIES, fill_value=0).join(counts).astype(float)
+
+
+def aggregate_period(daily: pd.DataFrame, keys) -> pd.DataFrame:
+    """
+    Sums daily rollups over the given grouping keys and adds active/health day counts.
+    """
+    totals = daily[CATEGORIES].sum(axis=1)
+    frame = daily.assign(active_day=(daily["logs"] > 0).astype(float), health_day=(daily["Health"] > 0).astype(float))
+    grouped = frame.groupby(keys)
+    agg = grouped[DAILY_COLUMNS].sum()
+    agg["active_days"] = grouped["active_day"].sum()
+    agg["health_days"] = grouped["health_day"].sum()
+    agg["total_minutes"] = totals.groupby(keys).sum()
+    return agg
+
+
+def compute_features(agg: pd.DataFrame, period_days: float) -> pd.DataFrame:
+    """
+    Vectorized mapping of period aggregates onto the training schemas in data/processed.
+    Daily quantities are averaged over days with at least one log.
+    """
+    active_days = agg["active_days"].clip(lower=1).to_numpy()
+    work = (agg["Work"] + agg["Academic"]).to_numpy() / active_days
+    leisure = (agg["Leisure"] + agg["Personal"]).to_numpy() / active_days
+    exercise = agg["Health"].to_numpy() / active_days
+    sleep = np.full(len(agg), DEFAULT_SLEEP_MINUTES)
+    active = work + leisure + exercise
+
+    logs = agg["logs"].to_numpy()
+    planned = agg["planned"].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        completion = np.where(logs > 0, agg["completed"].to_numpy() / logs, 0.0)
+        attendance = np.where(planned > 0, agg["planned_completed"].to_numpy() / planned, completion)
+        work_ratio = np.where(active > 0, work / active, 0.0)
+        leisure_ratio = np.where(active > 0, leisure / active, 0.0)
+    weekly_study = agg["Academic"].to_numpy() * 7.0 / period_days
+
+    return pd.DataFrame({
+        "work_minutes": work,
+        "leisure_minutes": leisure,
+        "exercise_minutes": exercise,
+        "sleep_minutes": sleep,
+        "commute_minutes": DEFAULT_COMMUTE_MINUTES,
+        "work_ratio": work_ratio,
+        "leisure_ratio": leisure_ratio,
+        "health_ratio": (sleep + exercise) / (sleep + active),
+        "routine_variability": np.stack([work, sleep, leisure], axis=1).std(axis=1, ddof=1),
+        "study_minutes_per_week": np.minimum(weekly_study / STUDY_MINUTES_CAP, 1.0) * 60,
+        "attendance_percentage": attendance,
+        "assignments_completed": completion,
+        "distraction_load": leisure / 60.0,
+        "recovery_score": sleep / 60.0 * agg["health_days"].to_numpy() * 7.0 / period_days,
+        "time_management_score": np.maximum(1.0, completion * 10),
+        "active_days": agg["active_days"].to_numpy(),
+        "total_minutes": agg["total_minutes"].to_numpy(),
+    }, index=agg.index)
+
+
+def weekly_time_features(daily: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per user per week (Monday start) features in the time_features.csv schema.
+    """
+    if daily.empty:
+        return pd.DataFrame(columns=TIME_FEATURE_COLUMNS + ["active_days"])
+    days = daily.index.get_level_values("day")
+    week = (days - pd.to_timedelta(days.weekday, unit="D")).rename("week_start")
+    agg = aggregate_period(daily, [daily.index.get_level_values("user_id"), week])
+    return compute_features(agg, period_days=7)[TIME_FEATURE_COLUMNS + ["active_days"]]
+
+
+def window_features(daily: pd.DataFrame, days: int = 7, now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    One feature row per user over the trailing `days` calendar days (today included).
+    """
+    now = now or datetime.utcnow()
+    start = pd.Timestamp(now).normalize() - pd.Timedelta(days=days - 1)
+    recent = daily[daily.index.get_level_values("day") >= start]
+    if recent.empty:
+        return pd.DataFrame()
+    agg = aggregate_period(recent, recent.index.get_level_values("user_id"))
+    return compute_features(agg, period_days=days)
+
+
+class FeatureStore:
+    """
+    Per-worker cache of each user's daily rollups over the last FEATURE_HISTORY_DAYS.
+    A miss costs one aggregated query; new logs are added to the cached rollup in place,
+    edits/deletes invalidate it and a TTL rolls the history window forward.
+    """
+
+    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._daily: Dict[int, pd.DataFrame] = {}
+        self._loaded_at: Dict[int, float] = {}
+        # Bumped whenever a user's cached rollup is (re)loaded or changed, so consumers
+        # can skip recomputing derived values while it stays the same
+        self._versions: Dict[int, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get_daily(self, db: Session, user_id: int) -> pd.DataFrame:
+        with self._lock:
+            daily = self._daily.get(user_id)
+            if daily is not None and time.monotonic() - self._loaded_at[user_id] <= self.ttl_seconds:
+                return daily.copy()
+        since = datetime.utcnow() - timedelta(days=FEATURE_HISTORY_DAYS)
+        daily = load_daily_rollups(db, since, user_ids=[user_id])
+        with self._lock:
+            self._daily[user_id] = daily
+            self._loaded_at[user_id] = time.monotonic()
+            self._versions[user_id] = next(self._counter)
+        return daily.copy()
+
+    def version(self, user_id: int) -> Optional[int]:
+        """
+        Version of the user's cached rollup, or None when nothing fresh is cached.
+        """
+        with self._lock:
+            loaded_at = self._loaded_at.get(user_id)
+            if loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds:
+                return None
+            return self._versions.get(user_id)
+
+    def record_log(self, log: ActivityLog, category: str):
+        """
+        Adds a newly created log to its user's cached rollup, if one is cached.
+        """
+        with self._lock:
+            daily = self._daily.get(log.user_id)
+            if daily is None:
+                return
+            key = (log.user_id, pd.Timestamp(log.date).normalize())
+            if key not in daily.index:
+                daily.loc[key, :] = 0.0
+            daily.loc[key, category] += float(log.duration_minutes or 0)
+            daily.loc[key, "logs"] += 1
+            daily.loc[key, "completed"] += 1 if log.completed else 0
+            daily.loc[key, "planned"] += 1 if log.planned else 0
+            daily.loc[key, "planned_completed"] += 1 if (log.planned and log.completed) else 0
+            self._daily[log.user_id] = daily.sort_index()
+            self._versions[log.user_id] = next(self._counter)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._daily.pop(user_id, None)
+            self._loaded_at.pop(user_id, None)
+            self._versions.pop(user_id, None)
+
+    def weekly_features(self, db: Session, user_id: int) -> pd.DataFrame:
+        return weekly_time_features(self.get_daily(db, user_id))
+
+
+feature_store = FeatureStore()
+
+
+def build_user_features(db: Session, user_id: int, days: int = 7) -> Optional[UserFeatures]:
+    """
+    Builds model inputs from the user's last `days` days of activity logs.
+    Returns None when nothing was logged in the window.
+    """
+    daily = feature_store.get_daily(db, user_id) if days <= FEATURE_HISTORY_DAYS else \
+        load_daily_rollups(db, datetime.utcnow() - timedelta(days=days), user_ids=[user_id])
+    features = window_features(daily, days)
+    if features.empty:
+        return None
+    return UserFeatures.from_row(features.iloc[0])
@@ -0,0 +1,87 @@
+"""
+Daily habit-risk score.
+
+One score per user per local day is stored in habit_risk_score together with
+the inputs it was computed from. Reads are a single primary-key lookup; the
+row is only recomputed on the first read of a new day or after new logs or
+outcomes marked it stale.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy.orm import Session
+
+from backend.db.repositories.habit_risk_repo import HabitRiskRepository
+from backend.db.repositories.outcome_repo import OutcomeRepository
+from backend.ml.features import build_user_features
+from backend.ml.registry import model_registry
+from backend.models import User
+
+HABIT_RISK_WINDOW_DAYS = 7
+
+
+def local_today(timezone: Optional[str]) -> date:
+    try:
+        return datetime.now(ZoneInfo(timezone or "UTC")).date()
+    except (ZoneInfoNotFoundError, ValueError):
+        return datetime.utcnow().date()
+
+
+def compute_habit_risk(db: Session, user_id: int) -> Dict[str, Any]:
+    """
+    Scores the last HABIT_RISK_WINDOW_DAYS of logs with the habit-risk model.
+    The training data's time_management_score is a 1-10 self-rating, so the user's
+    average productivity_rating outcome is used for it when they reported one;
+    otherwise the completion-based estimate from the logs is kept.
+    """
+    features = build_user_features(db, user_id, days=HABIT_RISK_WINDOW_DAYS)
+    if features is None:
+        return {"risk": None, "inputs": {"days_logged": 0}}
+    since = datetime.utcnow() - timedelta(days=HABIT_RISK_WINDOW_DAYS)
+    outcome_averages = OutcomeRepository(db).get_type_averages(user_id, since)
+
+    habit = features.habit.model_copy()
+    time_management_source = "completion"
+    rating = outcome_averages.get("productivity_rating")
+    if rating:
+        habit.time_management_score = min(max(rating["avg"], 1.0), 10.0)
+        time_management_source = "productivity_rating"
+
+    inputs = {k: round(v, 4) for k, v in habit.model_dump().items()}
+    inputs.update({
+        "time_management_source": time_management_source,
+        "mood_rating_avg": outcome_averages.get("mood_rating", {}).get("avg"),
+        "days_logged": features.days_logged,
+        "window_days": HABIT_RISK_WINDOW_DAYS
+    })
+    return {"risk": round(model_registry.predict_habit_risk(habit), 4), "inputs": inputs}
+
+
+def get_daily_habit_risk(db: Session, user: User) -> Optional[Dict[str, Any]]:
+    """
+    Returns today's stored score, recomputing it first when missing or stale.
+    Without loaded models a stale row is served as is, and None when there is none.
+    """
+    repo = HabitRiskRepository(db)
+    day = local_today(user.timezone)
+    row = repo.get_score(user.user_id, day)
+    if (row is None or row.stale) and model_registry.is_loaded:
+        result = compute_habit_risk(db, user.user_id)
+        row = repo.upsert_score(user.user_id, day, result["risk"], result["inputs"])
+    if row is None:
+        return None
+    return {
+        "day": row.day.isoformat(),
+        "risk": row.risk,
+        "inputs": row.inputs,
+        "computed_at": row.computed_at.isoformat()
+    }
+
+
+def mark_habit_risk_stale(db: Session, user_id: int, data_date: date, commit: bool = True):
+    """
+    Called after logs or outcomes change. Stored days are local while data dates
+    may be UTC, so scores from the day before `data_date` onwards are flagged.
+    """
+    HabitRiskRepository(db).mark_stale(user_id, data_date - timedelta(days=1), commit=commit)
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.ml.compact import CompactKMeans, load_artifact
+from backend.ml.features import ProductivityFeatures, StudyFeatures, HabitFeatures, RoutineFeatures
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.getenv(
+    "NEEL_MODELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models")
+)
+
+MODEL_FILES = {
+    "productivity": "productivity_model",
+    "study_performance": "study_performance_model",
+    "habit_risk": "habit_risk_model",
+    "routine_cluster": "routine_cluster_model",
+}
+
+FEATURE_ORDER = {
+    "productivity": list(ProductivityFeatures.model_fields),
+    "study_performance": list(StudyFeatures.model_fields),
+    "habit_risk": list(HabitFeatures.model_fields),
+    "routine_cluster": list(RoutineFeatures.model_fields),
+}
+
+
+class ModelRegistry:
+    """
+    Holds the trained models from models/ for the lifetime of a worker process.
+    Models are loaded once at startup; every prediction is timed per model.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR):
+        self.models_dir = models_dir
+        self.models: Dict[str, Any] = {}
+        self.load_ms: Dict[str, float] = {}
+        self.cluster_labels: Dict[int, str] = {}
+        self.trained_routine_centroids: Optional[np.ndarray] = None
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return len(self.models) == len(MODEL_FILES)
+
+    def load(self):
+        """
+        Loads every model, preferring the pickle-free .json artifacts
+        (see backend.ml.compact) and falling back to the scikit-learn pickles.
+        """
+        for name, basename in MODEL_FILES.items():
+            started = time.perf_counter()
+            model = self._load_file(basename)
+            self.load_ms[name] = (time.perf_counter() - started) * 1000
+
+            expected = list(getattr(model, "feature_names_in_", FEATURE_ORDER[name]))
+            if expected != FEATURE_ORDER[name]:
+                raise ValueError(f"{basename} expects features {expected}, serving code provides {FEATURE_ORDER[name]}")
+            self.models[name] = model
+
+        self.trained_routine_centroids = np.array(self.models["routine_cluster"].cluster_centers_, dtype=np.float64)
+        self.cluster_labels = self._label_clusters(self.trained_routine_centroids)
+        logger.info(f"✅ ML MODELS LOADED: {', '.join(f'{n} ({ms:.1f}ms)' for n, ms in self.load_ms.items())}")
+
+    @property
+    def routine_fingerprint(self) -> str:
+        """Identifies the trained routine centroids, so centroids moved from an older model are not reused."""
+        return hashlib.sha1(self.trained_routine_centroids.tobytes()).hexdigest()
+
+    def set_routine_centroids(self, centroids: np.ndarray):
+        """
+        Serves routine clusters from `centroids` (moved online by
+        backend.ml.routines) instead of the trained ones. Labels keep the
+        trained archetype names.
+        """
+        self.models["routine_cluster"] = CompactKMeans(FEATURE_ORDER["routine_cluster"], centroids)
+
+    def _load_file(self, basename: str):
+        artifact_path = os.path.join(self.models_dir, basename + ".json")
+        if os.path.exists(artifact_path):
+            return load_artifact(artifact_path)
+
+        logger.warning(f"⚠️  No compact artifact for {basename}, loading pickle (run python -m backend.ml.compact)")
+        import joblib
+        return joblib.load(os.path.join(self.models_dir, basename + ".pkl"))
+
+    def _label_clusters(self, centers: np.ndarray) -> Dict[int, str]:
+        """
+        Names routine archetypes from centroid shape (work, leisure, exercise, sleep minutes).
+        """
+        work, leisure = centers[:, 0], centers[:, 1]
+        labels = {i: "balanced" for i in range(len(centers))}
+        labels[int(np.argmax(work))] = "work-heavy"
+        leisure_idx = int(np.argmax(leisure))
+        if labels[leisure_idx] == "balanced":
+            labels[leisure_idx] = "leisure-heavy"
+        return labels
+
+    @contextmanager
+    def _timed(self, name: str, rows: int = 1):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._lock:
+                m = self._metrics.setdefault(name, {"calls": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+                m["calls"] += 1
+                m["rows"] += rows
+                m["total_ms"] += elapsed
+                m["max_ms"] = max(m["max_ms"], elapsed)
+                m["last_ms"] = elapsed
+
+    def _model(self, name: str):
+        model = self.models.get(name)
+        if model is None:
+            raise RuntimeError(f"Model '{name}' is not loaded")
+        return model
+
+    def _matrix(self, name: str, rows: List[Any]) -> np.ndarray:
+        order = FEATURE_ORDER[name]
+        return np.array([[getattr(r, f) for f in order] for r in rows], dtype=np.float64)
+
+    def predict_productivity(self, features: ProductivityFeatures) -> float:
+        """Predicted productivity score (training range roughly 55-95)."""
+        return float(self.predict_batch("productivity", self._matrix("productivity", [features]))[0])
+
+    def predict_study_performance(self, features: StudyFeatures) -> float:
+        """Predicted exam score for the given study effort."""
+        return float(self.predict_batch("study_performance", self._matrix("study_performance", [features]))[0])
+
+    def predict_habit_risk(self, features: HabitFeatures) -> float:
+        """Probability (0-1) that the habit pattern is risky."""
+        return float(self.predict_batch("habit_risk", self._matrix("habit_risk", [features]))[0])
+
+    def assign_routine_cluster(self, features: RoutineFeatures) -> int:
+        """Index of the nearest routine archetype."""
+        return int(self.predict_batch("routine_cluster", self._matrix("routine_cluster", [features]))[0])
+
+    def predict_batch(self, name: str, X: np.ndarray) -> np.ndarray:
+        """
+        Scores a feature matrix whose columns follow FEATURE_ORDER[name].
+        Classifiers return the positive-class probability, clustering the cluster index.
+        """
+        model = self._model(name)
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_ORDER[name]))
+        with self._timed(name, rows=len(X)), warnings.catch_warnings():
+            # The models were fitted on DataFrames; serving passes plain arrays whose
+            # column order is validated against feature_names_in_ at load time instead.
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            if name == "habit_risk":
+                return model.predict_proba(X)[:, 1]
+            return model.predict(X)
+
+    def score_frame(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scores every row of a feature frame (see backend.ml.features.compute_features)
+        with one vectorized call per model.
+        """
+        clusters = self.predict_batch("routine_cluster", features[FEATURE_ORDER["routine_cluster"]].to_numpy())
+        return pd.DataFrame({
+            "productivity_score": self.predict_batch("productivity", features[FEATURE_ORDER["productivity"]].to_numpy()),
+            "study_performance": self.predict_batch("study_performance", features[FEATURE_ORDER["study_performance"]].to_numpy()),
+            "habit_risk": self.predict_batch("habit_risk", features[FEATURE_ORDER["habit_risk"]].to_numpy()),
+            "routine_cluster": clusters.astype(int),
+            "routine_label": [self.cluster_labels.get(int(c)) for c in clusters],
+        }, index=features.index)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            per_model = {
+                name: {
+                    **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in m.items()},
+                    "avg_ms": round(m["total_ms"] / m["calls"], 3) if m["calls"] else 0.0
+                }
+                for name, m in self._metrics.items()
+            }
+        return {
+            "loaded": sorted(self.models),
+            "load_ms": {n: round(ms, 2) for n, ms in self.load_ms.items()},
+            "predictions": per_model
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,220 @@
+"""
+Online routine-cluster assignment.
+
+Each user's trailing-week routine vector (work, leisure, exercise, sleep minutes
+per active day) is kept with its nearest routine centroid. The assignment is only
+recomputed when the user's cached rollup in the FeatureStore changes, so a new log
+costs one nearest-centroid lookup. Each user's latest vector since the last update
+is folded into the centroids with a mini-batch k-means step on a schedule.
+
+Moved centroids are saved to routine_centroid and handed to the model registry,
+so batch scoring and live scores assign the same clusters as this assigner, and
+are restored at startup until the model is retrained.
+"""
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from backend.db.connection import SessionLocal
+from backend.db.repositories.routine_centroid_repo import RoutineCentroidRepository
+from backend.ml.features import feature_store, window_features
+from backend.ml.registry import model_registry, FEATURE_ORDER
+
+logger = logging.getLogger(__name__)
+
+ROUTINE_WINDOW_DAYS = 7
+CENTROID_UPDATE_SECONDS = int(os.getenv("NEEL_ROUTINE_UPDATE_SECONDS", "3600"))
+# How many observations the trained centroids count as; higher values make live updates more conservative
+CENTROID_PRIOR_WEIGHT = 100.0
+MAX_PENDING_VECTORS = 10_000
+
+
+class _RoutineEntry:
+    def __init__(self, vector: np.ndarray, cluster: int, rollup_version: Optional[int], centroid_version: int):
+        self.vector = vector
+        self.cluster = cluster
+        self.rollup_version = rollup_version
+        self.centroid_version = centroid_version
+        self.day = datetime.utcnow().date()
+        self.assigned_at = datetime.utcnow()
+
+
+class RoutineAssigner:
+    """
+    Per-worker routine assignments on top of the trained routine_cluster centroids.
+    """
+
+    def __init__(self, prior_weight: float = CENTROID_PRIOR_WEIGHT):
+        self.prior_weight = prior_weight
+        self.centroids: Optional[np.ndarray] = None
+        self.counts: Optional[np.ndarray] = None
+        self.centroid_version = 0
+        self.centroids_updated_at: Optional[datetime] = None
+        self._entries: Dict[int, _RoutineEntry] = {}
+        # user_id -> latest changed vector, so every user weighs once per update
+        self._pending: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_centroids(self):
+        if self.centroids is None:
+            centers = model_registry.trained_routine_centroids
+            self.centroids = np.array(centers, dtype=np.float64)
+            self.counts = np.full(len(centers), self.prior_weight)
+
+    def load_centroids(self) -> bool:
+        """
+        Restores the centroids saved by the last update, unless the routine
+        model was retrained since, and serves them from the model registry.
+        Returns whether saved centroids were found.
+        """
+        db = SessionLocal()
+        try:
+            rows = RoutineCentroidRepository(db).get_centroids(model_registry.routine_fingerprint)
+        finally:
+            db.close()
+        if len(rows) != len(model_registry.trained_routine_centroids):
+            return False
+        with self._lock:
+            self.centroids = np.array([r.centroid for r in rows], dtype=np.float64)
+            self.counts = np.array([r.weight for r in rows], dtype=np.float64)
+            self.centroid_version = rows[0].version
+            self.centroids_updated_at = rows[0].updated_at
+            model_registry.set_routine_centroids(self.centroids.copy())
+        return True
+
+    def _nearest(self, vector: np.ndarray) -> int:
+        return int(np.argmin(((self.centroids - vector) ** 2).sum(axis=1)))
+
+    def _is_current(self, entry: Optional[_RoutineEntry], rollup_version: Optional[int]) -> bool:
+        return (
+            entry is not None
+            and rollup_version is not None
+            and entry.rollup_version == rollup_version
+            and entry.centroid_version == self.centroid_version
+            and entry.day == datetime.utcnow().date()
+        )
+
+    def refresh(self, db: Session, user_id: int) -> Optional[_RoutineEntry]:
+        """
+        Returns the user's current assignment, recomputing it only if their rollup,
+        the centroids or the day changed since it was made.
+        """
+        with self._lock:
+            self._ensure_centroids()
+            entry = self._entries.get(user_id)
+            if self._is_current(entry, feature_store.version(user_id)):
+                return entry
+
+        daily = feature_store.get_daily(db, user_id)
+        rollup_version = feature_store.version(user_id)
+        features = window_features(daily, ROUTINE_WINDOW_DAYS)
+        if features.empty:
+            with self._lock:
+                self._entries.pop(user_id, None)
+            return None
+        vector = features[FEATURE_ORDER["routine_cluster"]].to_numpy(dtype=np.float64)[0]
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            unchanged = entry is not None and np.array_equal(entry.vector, vector)
+            if unchanged and entry.centroid_version == self.centroid_version:
+                entry.rollup_version = rollup_version
+                entry.day = datetime.utcnow().date()
+                return entry
+            entry = _RoutineEntry(vector, self._nearest(vector), rollup_version, self.centroid_version)
+            self._entries[user_id] = entry
+            if not unchanged and (user_id in self._pending or len(self._pending) < MAX_PENDING_VECTORS):
+                self._pending[user_id] = vector
+        return entry
+
+    def record_log(self, db: Session, user_id: int):
+        """
+        Reassigns a user after a new log, but only when their rollup is already cached;
+        otherwise the assignment is computed on the next read.
+        """
+        if model_registry.is_loaded and feature_store.version(user_id) is not None:
+            self.refresh(db, user_id)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def get(self, db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self.refresh(db, user_id)
+        if entry is None:
+            return None
+        return {
+            "routine_cluster": entry.cluster,
+            "routine_label": model_registry.cluster_labels.get(entry.cluster),
+            "vector": dict(zip(FEATURE_ORDER["routine_cluster"], np.round(entry.vector, 2).tolist())),
+            "assigned_at": entry.assigned_at.isoformat(),
+            "centroid_version": entry.centroid_version
+        }
+
+    def update_centroids(self) -> int:
+        """
+        One mini-batch k-means step over the users' latest vectors since the last
+        update: each centroid moves towards the mean of its new points, weighted by
+        how many points it has absorbed so far. The result is served from the model
+        registry and saved. Returns the number of vectors applied.
+        """
+        with self._lock:
+            if not self._pending or self.centroids is None:
+                return 0
+            batch = np.vstack(list(self._pending.values()))
+            self._pending = {}
+
+            distances = (batch ** 2).sum(axis=1)[:, None] - 2 * batch @ self.centroids.T + (self.centroids ** 2).sum(axis=1)
+            labels = np.argmin(distances, axis=1)
+            k = len(self.centroids)
+            batch_counts = np.bincount(labels, minlength=k).astype(np.float64)
+            batch_sums = np.zeros_like(self.centroids)
+            np.add.at(batch_sums, labels, batch)
+
+            moved = batch_counts > 0
+            totals = self.counts + batch_counts
+            self.centroids[moved] = (self.centroids[moved] * self.counts[moved, None] + batch_sums[moved]) / totals[moved, None]
+            self.counts = totals
+            self.centroid_version += 1
+            self.centroids_updated_at = datetime.utcnow()
+            centroids, counts, version = self.centroids.copy(), self.counts.tolist(), self.centroid_version
+            model_registry.set_routine_centroids(centroids)
+
+        db = SessionLocal()
+        try:
+            RoutineCentroidRepository(db).save_centroids(centroids.tolist(), counts, version, model_registry.routine_fingerprint)
+        finally:
+            db.close()
+        logger.info(f"✅ ROUTINE CENTROIDS UPDATED from {len(batch)} vectors (version {self.centroid_version})")
+        return len(batch)
+
+    async def run_schedule(self, interval_seconds: int = CENTROID_UPDATE_SECONDS):
+        """
+        Background task applying centroid updates every `interval_seconds`.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.update_centroids)
+            except Exception as e:
+                logger.error(f"❌ ROUTINE CENTROID UPDATE ERROR: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "assigned_users": len(self._entries),
+                "pending_vectors": len(self._pending),
+                "centroid_version": self.centroid_version,
+                "centroids_updated_at": self.centroids_updated_at.isoformat() if self.centroids_updated_at else None,
+                "centroids": None if self.centroids is None else np.round(self.centroids, 2).tolist(),
+                "counts": None if self.counts is None else self.counts.tolist()
+            }
+
+
+routine_assigner = RoutineAssigner()
@@ -0,0 +1,13 @@
+"""
+Training pipeline for the models served from models/.
+
+Reproduces notebooks 03-05 as a repeatable job: raw datasets in data/raw are
+normalized into the feature tables in data/processed, and the four models are
+fitted on those tables and exported as both .pkl and .json artifacts.
+
+    python -m backend.ml.train
+    python -m backend.ml.train --stages fit --models-dir /tmp/models
+"""
+from backend.ml.train.pipeline import run_pipeline
+
+__all__ = ["run_pipeline"]
@@ -0,0 +1,38 @@
+import argparse
+import json
+import logging
+
+from backend.ml.registry import MODELS_DIR, MODEL_FILES
+from backend.ml.train.data import DATA_DIR, CHUNK_ROWS
+from backend.ml.train.pipeline import STAGES, run_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the feature tables and retrain the NEEL models.")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma separated subset of {STAGES}")
+    parser.add_argument("--models", default=",".join(MODEL_FILES), help="comma separated model names to fit")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--no-export", action="store_true", help="fit and report without writing artifacts")
+    parser.add_argument("--no-cache", action="store_true", help="parse the processed CSVs instead of the data/cache columns")
+    parser.add_argument("--report", help="also write the stage report as JSON to this path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stages = [s for s in args.stages.split(",") if s]
+    models = [m for m in args.models.split(",") if m]
+    unknown = [s for s in stages if s not in STAGES] + [m for m in models if m not in MODEL_FILES]
+    if unknown:
+        parser.error(f"unknown stage/model: {', '.join(unknown)}")
+
+    result = run_pipeline(stages, models, args.data_dir, args.models_dir, args.chunk_rows, export=not args.no_export,
+                          use_cache=not args.no_cache)
+    print(result["report"])
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(result["stages"], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
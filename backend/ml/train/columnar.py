@@ -0,0 +1,254 @@
+"""
+Memory-mapped columnar cache for the CSV/Excel datasets in data/.
+
+Each dataset is converted once into data/cache/<name>/: one typed .npy file per
+column plus a manifest.json with the column dtypes, categories for text columns
+and the SHA-256 of the source file. Readers memory-map the .npy files, so opening
+a dataset costs a few file opens instead of re-parsing text; the cache is rebuilt
+when the source checksum no longer matches.
+
+    python -m backend.ml.train.columnar            # convert everything in data/
+    python -m backend.ml.train.columnar data/processed/habit_features.csv
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+CHUNK_ROWS = 50_000
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_workbook(source: str) -> bool:
+    return source.endswith((".xlsx", ".xls"))
+
+
+def cache_name(source: str, sheet: Optional[str] = None) -> str:
+    """
+    Cache directory name: the file stem, plus the sheet name for a non-default workbook sheet.
+    """
+    stem = os.path.splitext(os.path.basename(source))[0].replace(" ", "_")
+    return f"{stem}__{sheet.replace(' ', '_')}" if sheet else stem
+
+
+def _chunk_source(source: str, sheet: Optional[str], chunk_rows: int) -> Callable[[], Iterator[pd.DataFrame]]:
+    if _is_workbook(source):
+        # openpyxl cannot stream into pandas, so a sheet is read whole (once per pass)
+        return lambda: iter([pd.read_excel(source, sheet_name=sheet if sheet else 0)])
+    return lambda: pd.read_csv(source, chunksize=chunk_rows)
+
+
+def _column_plan(chunks: Iterator[pd.DataFrame], float_dtype: str) -> Dict[str, Any]:
+    """
+    First pass: row count and the narrowest dtype that holds every chunk of each column.
+    """
+    rows = 0
+    kinds: Dict[str, str] = {}
+    ranges: Dict[str, List[int]] = {}
+    for chunk in chunks:
+        rows += len(chunk)
+        for col in chunk.columns:
+            series = chunk[col]
+            if pd.api.types.is_bool_dtype(series):
+                kind = "b"
+            elif pd.api.types.is_integer_dtype(series):
+                kind = "i"
+                lo, hi = ranges.get(col, [0, 0])
+                ranges[col] = [min(lo, int(series.min())), max(hi, int(series.max()))] if len(series) else [lo, hi]
+            elif pd.api.types.is_float_dtype(series):
+                kind = "f"
+            else:
+                kind = "c"
+            previous = kinds.get(col, kind)
+            if previous != kind:
+                kind = "f" if {previous, kind} <= {"i", "f", "b"} else "c"
+            kinds[col] = kind
+
+    columns = []
+    for i, (col, kind) in enumerate(kinds.items()):
+        if kind == "i":
+            lo, hi = ranges[col]
+            dtype = next(t for t in ("int8", "int16", "int32", "int64")
+                         if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max)
+        elif kind == "f":
+            dtype = float_dtype
+        elif kind == "b":
+            dtype = "bool"
+        else:
+            dtype = "int32"  # category codes
+        columns.append({"name": col, "file": f"{i:03d}.npy", "dtype": dtype, "categorical": kind == "c"})
+    return {"rows": rows, "columns": columns}
+
+
+def convert(
+    source: str,
+    cache_dir: str = CACHE_DIR,
+    sheet: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    float_dtype: str = "float32"
+) -> str:
+    """
+    Writes the columnar cache for one CSV or workbook sheet (the first one by default)
+    and returns its directory. CSVs are processed in chunks of `chunk_rows`, so memory
+    stays bounded by the chunk size plus the (memory-mapped) output columns.
+    Text columns become int32 category codes.
+    """
+    out_dir = os.path.join(cache_dir, cache_name(source, sheet))
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    chunks = _chunk_source(source, sheet, chunk_rows)
+    plan = _column_plan(chunks(), float_dtype)
+    arrays = {
+        c["name"]: np.lib.format.open_memmap(os.path.join(tmp_dir, c["file"]), mode="w+", dtype=c["dtype"], shape=(plan["rows"],))
+        for c in plan["columns"]
+    }
+    categories: Dict[str, Dict[str, int]] = {c["name"]: {} for c in plan["columns"] if c["categorical"]}
+
+    offset = 0
+    for chunk in chunks():
+        end = offset + len(chunk)
+        for col, array in arrays.items():
+            series = chunk[col]
+            if col in categories:
+                lookup = categories[col]
+                values = series.astype("string")
+                for value in values.dropna().unique():
+                    lookup.setdefault(value, len(lookup))
+                array[offset:end] = values.map(lookup).fillna(-1).to_numpy(dtype=np.int32)
+            else:
+                array[offset:end] = series.to_numpy(dtype=array.dtype)
+        offset = end
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    for c in plan["columns"]:
+        if c["categorical"]:
+            c["categories"] = list(categories[c["name"]])
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "source": os.path.abspath(source),
+        "sheet": sheet,
+        "sha256": file_checksum(source),
+        "source_size": os.path.getsize(source),
+        "source_mtime_ns": os.stat(source).st_mtime_ns,
+        "rows": plan["rows"],
+        "columns": plan["columns"],
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+
+def is_fresh(manifest: Dict[str, Any], source: str) -> bool:
+    """
+    Size and mtime unchanged means fresh without hashing; otherwise the checksum decides
+    (so a touched but identical file does not trigger a rebuild).
+    """
+    if manifest.get("format_version") != FORMAT_VERSION or not os.path.exists(source):
+        return False
+    stat = os.stat(source)
+    if stat.st_size == manifest["source_size"] and stat.st_mtime_ns == manifest["source_mtime_ns"]:
+        return True
+    return stat.st_size == manifest["source_size"] and file_checksum(source) == manifest["sha256"]
+
+
+def _read_manifest(out_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def open_columns(
+    source: str,
+    columns: Optional[List[str]] = None,
+    cache_dir: str = CACHE_DIR,
+    sheet: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Returns read-only memory-mapped arrays for the requested columns, converting
+    the source first if it has no cache or changed since. Text columns come back
+    as pandas Categoricals built on the mapped codes.
+    """
+    out_dir = os.path.join(cache_dir, cache_name(source, sheet))
+
+    manifest = _read_manifest(out_dir)
+    if manifest is None or not is_fresh(manifest, source):
+        convert(source, cache_dir, sheet)
+        manifest = _read_manifest(out_dir)
+
+    specs = {c["name"]: c for c in manifest["columns"]}
+    missing = [c for c in (columns or []) if c not in specs]
+    if missing:
+        raise KeyError(f"{os.path.basename(source)} has no columns {missing}")
+
+    result = {}
+    for name in (columns or list(specs)):
+        spec = specs[name]
+        array = np.load(os.path.join(out_dir, spec["file"]), mmap_mode="r")
+        if spec["categorical"]:
+            array = pd.Categorical.from_codes(np.asarray(array), categories=spec["categories"])
+        result[name] = array
+    return result
+
+
+def load_frame(source: str, columns: Optional[List[str]] = None, cache_dir: str = CACHE_DIR, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    DataFrame over the cached columns (numeric columns are copied out of the maps).
+    """
+    return pd.DataFrame(open_columns(source, columns, cache_dir, sheet))
+
+
+def default_sources(data_dir: str = DATA_DIR) -> List[str]:
+    processed = os.path.join(data_dir, "processed")
+    raw = os.path.join(data_dir, "raw")
+    return sorted(
+        [os.path.join(processed, f) for f in os.listdir(processed) if f.endswith(".csv")] +
+        [os.path.join(raw, f) for f in os.listdir(raw) if _is_workbook(f)]
+    )
+
+
+def main(sources: List[str]):
+    for source in sources or default_sources():
+        # Every sheet after the first gets its own cache next to the default one
+        sheets = [None] + pd.ExcelFile(source).sheet_names[1:] if _is_workbook(source) else [None]
+        for sheet in sheets:
+            started = time.perf_counter()
+            out_dir = convert(source, sheet=sheet)
+            convert_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            columns = open_columns(source, sheet=sheet)
+            open_ms = (time.perf_counter() - started) * 1000
+            rows = len(next(iter(columns.values()))) if columns else 0
+            print(f"✅ {os.path.relpath(out_dir)}: {rows} rows x {len(columns)} cols "
+                  f"(convert {convert_ms:.0f}ms, open {open_ms:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,153 @@
+"""
+Feature tables (notebooks 03 and 04).
+
+Raw datasets are normalized to minutes and turned into the feature tables in
+data/processed chunk by chunk, so only CHUNK_ROWS raw rows are held at a time.
+Training reads the processed tables back with explicit compact dtypes, from the
+memory-mapped columnar cache (see backend.ml.train.columnar) unless disabled.
+"""
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.ml.features import TIME_FEATURE_COLUMNS
+from backend.ml.train.columnar import DATA_DIR, CHUNK_ROWS, open_columns
+
+
+def derive_time_features(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    out["work_minutes"] = df["Daily Work Hours"] * 60
+    out["leisure_minutes"] = df["Daily Leisure Hours"] * 60
+    out["exercise_minutes"] = df["Daily Exercise Minutes"]
+    out["sleep_minutes"] = df["Daily Sleep Hours"] * 60
+    out["commute_minutes"] = df["Commute Time (hours)"] * 60
+
+    active = out["work_minutes"] + out["leisure_minutes"] + out["exercise_minutes"]
+    out["work_ratio"] = out["work_minutes"] / active
+    out["leisure_ratio"] = out["leisure_minutes"] / active
+    out["health_ratio"] = (out["sleep_minutes"] + out["exercise_minutes"]) / (out["sleep_minutes"] + active)
+    out["routine_variability"] = out[["work_minutes", "sleep_minutes", "leisure_minutes"]].std(axis=1)
+    out["productivity_score"] = df["Productivity Score"]
+    return out
+
+
+def derive_study_features(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    out["study_minutes_per_week"] = df["study_hours_per_week"] * 60
+    out["sleep_minutes_per_day"] = df["sleep_hours_per_day"] * 60
+    out["attendance_percentage"] = df["attendance_percentage"]
+    out["assignments_completed"] = df["assignments_completed"]
+    out["study_effort_score"] = out["study_minutes_per_week"] * out["attendance_percentage"] * out["assignments_completed"]
+    out["exam_score"] = df["final_grade"]
+    return out
+
+
+def derive_habit_features(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    out["distraction_load"] = df["social_media_hours"] + df["netflix_hours"]
+    out["recovery_score"] = df["sleep_hours"] * df["exercise_frequency"]
+    for col in ["stress_level", "motivation_level", "time_management_score", "exam_score"]:
+        out[col] = df[col]
+    return out
+
+
+# Raw source, the raw columns it needs and the dtypes used for training. Raw
+# columns keep pandas' inferred dtypes so the processed tables match the notebooks.
+FEATURE_TABLES: Dict[str, Dict[str, Any]] = {
+    "time_features": {
+        "raw": "Time Management and Productivity Insights.csv",
+        "raw_columns": ["Daily Work Hours", "Daily Leisure Hours", "Daily Exercise Minutes",
+                        "Daily Sleep Hours", "Commute Time (hours)", "Productivity Score"],
+        "derive": derive_time_features,
+        "dtypes": {**{c: "float32" for c in TIME_FEATURE_COLUMNS}, "productivity_score": "float32"},
+    },
+    "study_features": {
+        "raw": "student_study_habits.csv",
+        "raw_columns": ["study_hours_per_week", "sleep_hours_per_day", "attendance_percentage",
+                        "assignments_completed", "final_grade"],
+        "derive": derive_study_features,
+        "dtypes": {c: "float32" for c in ["study_minutes_per_week", "sleep_minutes_per_day", "attendance_percentage",
+                                          "assignments_completed", "study_effort_score", "exam_score"]},
+    },
+    "habit_features": {
+        "raw": "enhanced_student_habits_performance_dataset.csv",
+        "raw_columns": ["social_media_hours", "netflix_hours", "sleep_hours", "exercise_frequency",
+                        "stress_level", "motivation_level", "time_management_score", "exam_score"],
+        "derive": derive_habit_features,
+        "dtypes": {c: "float32" for c in ["distraction_load", "recovery_score", "stress_level", "motivation_level",
+                                          "time_management_score", "exam_score"]},
+    },
+}
+
+
+def processed_path(data_dir: str, table: str) -> str:
+    return os.path.join(data_dir, "processed", f"{table}.csv")
+
+
+def build_feature_table(table: str, data_dir: str = DATA_DIR, chunk_rows: int = CHUNK_ROWS) -> Optional[int]:
+    """
+    Streams a raw dataset through its derive function into data/processed/<table>.csv.
+    The file is written to a temporary path and swapped in once complete.
+    Returns the number of rows written, or None when the raw dataset is not available
+    (the existing processed table is then kept as is).
+    """
+    spec = FEATURE_TABLES[table]
+    raw_path = os.path.join(data_dir, "raw", spec["raw"])
+    if not os.path.exists(raw_path):
+        return None
+
+    out_path = processed_path(data_dir, table)
+    tmp_path = out_path + ".tmp"
+    rows = 0
+    reader = pd.read_csv(
+        raw_path,
+        usecols=spec["raw_columns"],
+        chunksize=chunk_rows
+    )
+    try:
+        for i, chunk in enumerate(reader):
+            features = spec["derive"](chunk)
+            features.to_csv(tmp_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+            rows += len(features)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+def load_feature_table(
+    table: str,
+    columns: List[str],
+    data_dir: str = DATA_DIR,
+    chunk_rows: int = CHUNK_ROWS,
+    use_cache: bool = True
+) -> pd.DataFrame:
+    """
+    Reads only `columns` of a processed table with float32 dtypes. By default the
+    columns are memory-mapped from data/cache (built or refreshed on first use);
+    with use_cache=False the CSV is parsed in chunks.
+    """
+    dtypes = FEATURE_TABLES[table]["dtypes"]
+    if use_cache:
+        mapped = open_columns(processed_path(data_dir, table), columns, cache_dir=os.path.join(data_dir, "cache"))
+        return pd.DataFrame({c: mapped[c].astype(dtypes[c], copy=False) for c in columns})
+
+    reader = pd.read_csv(
+        processed_path(data_dir, table),
+        usecols=columns,
+        dtype={c: dtypes[c] for c in columns},
+        chunksize=chunk_rows
+    )
+    frame = pd.concat(reader, ignore_index=True)
+    return frame[columns]
+
+
+def habit_risk_label(habits: pd.DataFrame) -> pd.Series:
+    """
+    Notebook 05 labels a student at risk when stress exceeds motivation.
+    """
+    label = np.where(habits["stress_level"] > habits["motivation_level"], 1, 0).astype(np.int8)
+    return pd.Series(pd.Categorical(label, categories=[0, 1]), index=habits.index, name="risk_label")
@@ -0,0 +1,90 @@
+"""
+Model fitting (notebook 05).
+
+Each model is fitted on its processed feature table with the notebook's
+80/20 split (random_state=42) and exported as .pkl and .json artifacts under
+the names the serving registry loads.
+"""
+import os
+from typing import Dict, Any, Optional
+
+import joblib
+from sklearn.cluster import KMeans
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.metrics import mean_squared_error, accuracy_score
+from sklearn.model_selection import train_test_split
+
+from backend.ml.compact import save_artifact, verify_artifact
+from backend.ml.registry import MODEL_FILES, FEATURE_ORDER
+from backend.ml.train.data import DATA_DIR, load_feature_table, habit_risk_label
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+MODEL_SPECS: Dict[str, Dict[str, Any]] = {
+    "productivity": {"table": "time_features", "target": "productivity_score"},
+    "study_performance": {"table": "study_features", "target": "exam_score"},
+    "habit_risk": {"table": "habit_features", "target": "risk_label",
+                   "label_columns": ["stress_level", "motivation_level"]},
+    "routine_cluster": {"table": "time_features", "target": None},
+}
+
+
+def load_training_data(name: str, data_dir: str = DATA_DIR, use_cache: bool = True):
+    """
+    Returns (X, y) for a model; y is None for the clustering model.
+    """
+    spec = MODEL_SPECS[name]
+    features = FEATURE_ORDER[name]
+    if name == "habit_risk":
+        frame = load_feature_table(spec["table"], features + spec["label_columns"], data_dir, use_cache=use_cache)
+        return frame[features], habit_risk_label(frame)
+    columns = features + ([spec["target"]] if spec["target"] else [])
+    frame = load_feature_table(spec["table"], columns, data_dir, use_cache=use_cache)
+    return frame[features], (frame[spec["target"]] if spec["target"] else None)
+
+
+def fit_model(name: str, X, y):
+    """
+    Fits one model and returns (model, metrics).
+    """
+    if name == "routine_cluster":
+        # Centroids inherit the training dtype and sklearn's predict rejects float64 input
+        # against float32 centroids, so the (small) cluster matrix is upcast for fitting
+        model = KMeans(n_clusters=3, random_state=RANDOM_STATE, n_init="auto").fit(X.astype("float64"))
+        return model, {"rows": len(X), "inertia": round(float(model.inertia_), 3)}
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    if name == "habit_risk":
+        model = LogisticRegression().fit(X_train, y_train)
+        metrics = {"accuracy": round(float(accuracy_score(y_test, model.predict(X_test))), 4)}
+    else:
+        model = LinearRegression().fit(X_train, y_train)
+        metrics = {"mse": round(float(mean_squared_error(y_test, model.predict(X_test))), 4)}
+    return model, {"rows": len(X), **metrics}
+
+
+def export_model(name: str, model, models_dir: str) -> Dict[str, str]:
+    """
+    Writes <name>.pkl and the pickle-free <name>.json, checking that both predict the same.
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    base = os.path.join(models_dir, MODEL_FILES[name])
+    joblib.dump(model, base + ".pkl")
+    save_artifact(model, base + ".json")
+    verify_artifact(model, base + ".json")
+    return {"pkl": base + ".pkl", "json": base + ".json"}
+
+
+def train_model(
+    name: str,
+    models_dir: str,
+    data_dir: str = DATA_DIR,
+    export: bool = True,
+    use_cache: bool = True
+) -> Optional[Dict[str, Any]]:
+    X, y = load_training_data(name, data_dir, use_cache)
+    model, metrics = fit_model(name, X, y)
+    if export:
+        export_model(name, model, models_dir)
+    return metrics
@@ -0,0 +1,44 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+from backend.ml.registry import MODELS_DIR, MODEL_FILES
+from backend.ml.train.data import DATA_DIR, CHUNK_ROWS, FEATURE_TABLES, build_feature_table
+from backend.ml.train.fit import train_model
+from backend.ml.train.profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["features", "fit"]
+
+
+def run_pipeline(
+    stages: Optional[List[str]] = None,
+    models: Optional[List[str]] = None,
+    data_dir: str = DATA_DIR,
+    models_dir: str = MODELS_DIR,
+    chunk_rows: int = CHUNK_ROWS,
+    export: bool = True,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Runs the requested stages in order and returns per-stage timing, peak memory
+    and model metrics.
+    """
+    stages = stages or STAGES
+    models = models or list(MODEL_FILES)
+    profiler = StageProfiler()
+
+    if "features" in stages:
+        for table in FEATURE_TABLES:
+            with profiler.stage(f"features:{table}") as info:
+                rows = build_feature_table(table, data_dir, chunk_rows)
+                info["rows"] = rows if rows is not None else "raw missing, kept processed"
+                if rows is None:
+                    logger.warning(f"⚠️ Raw dataset for {table} not found; using existing processed table")
+
+    if "fit" in stages:
+        for name in models:
+            with profiler.stage(f"fit:{name}") as info:
+                info.update(train_model(name, models_dir, data_dir, export=export, use_cache=use_cache))
+
+    return {"stages": profiler.stages, "report": profiler.report()}
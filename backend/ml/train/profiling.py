@@ -0,0 +1,37 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+
+class StageProfiler:
+    """
+    Records wall time and peak Python heap usage (tracemalloc) for each pipeline stage.
+    """
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        info: Dict[str, Any] = {"stage": name}
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            info["seconds"] = round(time.perf_counter() - start, 3)
+            info["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 2)
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(info)
+
+    def report(self) -> str:
+        lines = [f"{'stage':<28}{'seconds':>10}{'peak MB':>10}  details"]
+        for info in self.stages:
+            details = ", ".join(f"{k}={v}" for k, v in info.items() if k not in ("stage", "seconds", "peak_mb"))
+            lines.append(f"{info['stage']:<28}{info['seconds']:>10.3f}{info['peak_mb']:>10.2f}  {details}")
+        return "\n".join(lines)
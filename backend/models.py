@@ -1,11 +1,12 @@
 import enum
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum, Float, JSON
+    Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Text, Enum, Float, JSON, Index, LargeBinary, event
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from backend.db import Base
+from backend.db.chat_partitions import ensure_partitions
 
 class ActivityCategory(enum.Enum):
     Academic = "Academic"
@@ -60,11 +61,18 @@ class ActivityLog(Base):
     postponed = Column(Boolean, default=False)
     energy_level = Column(Integer, nullable=True)
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Keyset pagination orders by (created_at, log_id), so it must be set
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User")
     activity = relationship("Activity")
 
+    # Per-user reads filter by user and order/range by time
+    __table_args__ = (
+        Index("ix_activity_log_user_date", "user_id", "date"),
+        Index("ix_activity_log_user_created", "user_id", "created_at"),
+    )
+
 class Outcome(Base):
     __tablename__ = "outcome"
     outcome_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -72,8 +80,15 @@ class Outcome(Base):
     date = Column(DateTime, nullable=False)
     outcome_type = Column(Enum(OutcomeType), nullable=False)
     outcome_value = Column(Text, nullable=True)
+    # Parsed from outcome_value at write time so scores/ratings can be aggregated in SQL
+    outcome_numeric = Column(Float, nullable=True)
     related_activity_id = Column(Integer, ForeignKey("activity.activity_id"), nullable=True)
 
+    __table_args__ = (
+        Index("ix_outcome_user_type_date", "user_id", "outcome_type", "date"),
+        Index("ix_outcome_user_date", "user_id", "date"),
+    )
+
 class AnalyticsSummary(Base):
     __tablename__ = "analytics_summary"
     summary_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -85,12 +100,89 @@ class AnalyticsSummary(Base):
     activity_balance = Column(JSON, nullable=True)
     goal_alignment = Column(Text, nullable=True)
     key_insight = Column(Text, nullable=True)
+    source_count = Column(Integer, nullable=True)  # summaries rolled into a digest row
     generated_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_analytics_summary_user_generated", "user_id", "generated_at"),
+    )
+
 class ChatMessage(Base):
     __tablename__ = "chat_message"
     message_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("user.user_id"), nullable=False)
     role = Column(String(10), nullable=False) # 'user' or 'ai'
     content = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # Partition key (monthly ranges); PostgreSQL requires it in the primary key of a partitioned table
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_chat_message_user_timestamp", "user_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+# create_all only creates the partitioned parent; rows need the default and monthly partitions
+event.listen(ChatMessage.__table__, "after_create", lambda target, connection, **kw: ensure_partitions(connection))
+
+class ChatMessageArchive(Base):
+    """One user's messages from an archived chat_message month, as gzip-compressed JSON."""
+    __tablename__ = "chat_message_archive"
+    archive_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("user.user_id"), nullable=False)
+    month = Column(Date, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    first_message_at = Column(DateTime, nullable=False)
+    last_message_at = Column(DateTime, nullable=False)
+    messages = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_chat_message_archive_user_month", "user_id", "month"),
+    )
+
+class UserScore(Base):
+    __tablename__ = "user_score"
+    user_id = Column(Integer, ForeignKey("user.user_id"), primary_key=True)
+    period_days = Column(Integer, nullable=False)
+    productivity_score = Column(Float, nullable=True)
+    study_performance = Column(Float, nullable=True)
+    habit_risk = Column(Float, nullable=True)
+    routine_cluster = Column(Integer, nullable=True)
+    routine_label = Column(String(50), nullable=True)
+    features = Column(JSON, nullable=True)
+    scored_at = Column(DateTime, default=datetime.utcnow)
+
+class HabitRiskScore(Base):
+    __tablename__ = "habit_risk_score"
+    user_id = Column(Integer, ForeignKey("user.user_id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # the user's local day
+    risk = Column(Float, nullable=True)  # None when nothing was logged in the window
+    inputs = Column(JSON, nullable=True)
+    # Set when new logs/outcomes arrive; the next read recomputes the row
+    stale = Column(Boolean, default=False, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class RoutineCentroid(Base):
+    __tablename__ = "routine_centroid"
+    cluster = Column(Integer, primary_key=True)
+    centroid = Column(JSON, nullable=False)  # routine vector in FEATURE_ORDER["routine_cluster"] order
+    weight = Column(Float, nullable=False)  # observations absorbed, including the trained prior
+    version = Column(Integer, nullable=False)
+    trained_from = Column(String(40), nullable=False)  # fingerprint of the trained centroids it moved from
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class BehaviorFlag(Base):
+    __tablename__ = "behavior_flag"
+    flag_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("user.user_id"), nullable=False)
+    kind = Column(String(30), nullable=False)  # burnout, recovery, anomaly, shift
+    metric = Column(String(30), nullable=True)  # minutes, energy, completion
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    severity = Column(Float, nullable=True)  # peak |z| (or |t| for shifts) in the period
+    details = Column(JSON, nullable=True)
+    detected_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_behavior_flag_user_end", "user_id", "end_date"),
+    )
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
 from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session
+from backend.db.connection import get_db_session, get_read_db_session
+from backend.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor
 from backend.db.repositories.activity_log_repo import ActivityLogRepository
 from backend.db.repositories.activity_types_repo import ActivityTypesRepository
+from backend.analytics.heatmap import heatmap_cache
+from backend.ml.features import feature_store
+from backend.ml.routines import routine_assigner
+from backend.ml.habit_risk import mark_habit_risk_stale
+from backend.analytics.anomalies import detect_for_user
 from backend.utils.auth import get_current_user
 from backend.models import User
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+# Upper bound for one bulk sync request
+MAX_BULK_LOGS = 1000
 
 router = APIRouter()
 
@@ -29,9 +38,14 @@ class ActivityLogUpdate(BaseModel):
     notes: Optional[str] = None
     energy_level: Optional[int] = None
 
+class ActivityLogBulkCreate(BaseModel):
+    # Entries are validated one by one so a bad entry does not reject the whole sync
+    entries: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BULK_LOGS)
+
 @router.post("/log")
 async def log_activity(
     log_data: ActivityLogCreate, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -58,17 +72,90 @@ async def log_activity(
         energy_level=log_data.energy_level,
         notes=log_data.notes
     )
+    heatmap_cache.record_log(log)
+    feature_store.record_log(log, activity_type.activity_category.value)
+    routine_assigner.record_log(db, current_user.user_id)
+    mark_habit_risk_stale(db, current_user.user_id, log.date.date())
+    background_tasks.add_task(detect_for_user, current_user.user_id)
     return log
 
+@router.post("/log/bulk")
+async def log_activities_bulk(
+    bulk_data: ActivityLogBulkCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Logs a batch of entries (e.g. an offline day synced from mobile) in one
+    transaction. Valid entries are inserted together; every entry gets a result
+    in request order with either the created log or the reason it was rejected.
+    """
+    results: List[Dict[str, Any]] = [{"index": i} for i in range(len(bulk_data.entries))]
+    parsed: Dict[int, ActivityLogCreate] = {}
+    for i, entry in enumerate(bulk_data.entries):
+        try:
+            parsed[i] = ActivityLogCreate.model_validate(entry)
+        except ValidationError as e:
+            results[i].update(status="error", detail=e.errors(include_url=False, include_context=False))
+
+    activity_types = ActivityTypesRepository(db).get_activity_types_by_names(p.activity_name for p in parsed.values())
+    to_insert = []
+    for i, log_data in parsed.items():
+        activity_type = activity_types.get(log_data.activity_name)
+        if not activity_type:
+            results[i].update(status="error", detail=f"Activity type '{log_data.activity_name}' not found.")
+            continue
+        entry = log_data.model_dump(exclude={"activity_name"})
+        entry["activity_id"] = activity_type.activity_id
+        to_insert.append((i, activity_type, entry))
+
+    # The logs and the habit-risk stale flag commit together
+    logs = ActivityLogRepository(db).bulk_create_logs(current_user.user_id, [entry for _, _, entry in to_insert], commit=False)
+    if logs:
+        mark_habit_risk_stale(db, current_user.user_id, min(log.date for log in logs).date(), commit=False)
+        db.commit()
+
+    for (i, activity_type, _), log in zip(to_insert, logs):
+        results[i].update(status="created", log=dict(log._mapping))
+        heatmap_cache.record_log(log)
+        feature_store.record_log(log, activity_type.activity_category.value)
+
+    if logs:
+        routine_assigner.record_log(db, current_user.user_id)
+        background_tasks.add_task(detect_for_user, current_user.user_id)
+    return {
+        "created": len(logs),
+        "failed": len(results) - len(logs),
+        "results": results
+    }
+
 @router.get("/logs/{user_id}")
-async def get_logs(user_id: int, db: Session = Depends(get_db_session)):
+async def get_logs(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Newest-first page of the user's logs. Pass the X-Next-Cursor response header
+    back as `cursor` for the next page; it is absent on the last page.
+    """
     log_repo = ActivityLogRepository(db)
-    return log_repo.get_user_logs(user_id)
+    try:
+        logs, next_cursor = log_repo.get_user_logs_page(user_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return logs
 
 @router.put("/log/{log_id}")
 async def update_activity_log(
     log_id: int,
     update_data: ActivityLogUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -97,11 +184,17 @@ async def update_activity_log(
         update_dict["energy_level"] = update_data.energy_level
         
     updated_log = log_repo.update_log(log_id, **update_dict)
+    heatmap_cache.invalidate(current_user.user_id)
+    feature_store.invalidate(current_user.user_id)
+    routine_assigner.invalidate(current_user.user_id)
+    mark_habit_risk_stale(db, current_user.user_id, updated_log.date.date())
+    background_tasks.add_task(detect_for_user, current_user.user_id)
     return updated_log
 
 @router.delete("/log/{log_id}")
 async def delete_activity_log(
     log_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -115,5 +208,11 @@ async def delete_activity_log(
     if (datetime.utcnow() - log.created_at).total_seconds() > 86400:
         raise HTTPException(status_code=403, detail="Logs can only be deleted within 24 hours.")
         
+    log_date = log.date.date()
     log_repo.delete_log(log_id)
+    heatmap_cache.invalidate(current_user.user_id)
+    feature_store.invalidate(current_user.user_id)
+    routine_assigner.invalidate(current_user.user_id)
+    mark_habit_risk_stale(db, current_user.user_id, log_date)
+    background_tasks.add_task(detect_for_user, current_user.user_id)
     return {"status": "success"}
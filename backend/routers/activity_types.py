@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session
+from backend.db.connection import get_db_session, get_read_db_session
 from backend.db.repositories.activity_types_repo import ActivityTypesRepository
 from backend.models import ActivityCategory
 from pydantic import BaseModel
-from typing import List
 
 router = APIRouter()
 
@@ -20,6 +19,6 @@ async def create_activity_type(activity_data: ActivityTypeCreate, db: Session =
     return repo.create_activity_type(activity_data.name, activity_data.category)
 
 @router.get("/")
-async def get_activity_types(db: Session = Depends(get_db_session)):
+async def get_activity_types(db: Session = Depends(get_read_db_session)):
     repo = ActivityTypesRepository(db)
     return repo.get_all_activity_types()
@@ -1,26 +1,41 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from datetime import datetime
-from backend.db.connection import get_db_session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import List
+from backend.db.connection import get_async_db_session, get_async_read_db_session
 from backend.analytics.engine import AnalyticsEngine
-from backend.db.repositories.activity_log_repo import ActivityLogRepository
-from backend.db.repositories.outcome_repo import OutcomeRepository
-from backend.db.repositories.user_profile_repo import UserProfileRepository
-from backend.utils.auth import get_current_user
+from backend.analytics.trends import TrendAnalyzer
+from backend.analytics.alignment import score_alignment
+from backend.analytics.heatmap import heatmap_cache
+from backend.ml.habit_risk import get_daily_habit_risk
+from backend.analytics.anomalies import summarize_flags
+from backend.db.repositories.behavior_flag_repo import AsyncBehaviorFlagRepository
+from backend.db.repositories.activity_log_repo import AsyncActivityLogRepository
+from backend.db.repositories.outcome_repo import AsyncOutcomeRepository
+from backend.db.repositories.user_profile_repo import AsyncUserProfileRepository
+from backend.utils.auth import get_current_user_async, get_current_user_read
 from backend.models import User
 
 router = APIRouter()
 
+# Handlers run on the async (asyncpg) session. Simple reads use the Async*
+# repositories; the pandas/ML helpers still take a sync Session and run through
+# db.run_sync. That awaits their queries, but the pandas/NumPy work between the
+# queries still runs on the event loop.
+# The analytics endpoints after "/" use the read session (the replica when one
+# is available); "/" itself stays on the primary because it refreshes the daily
+# habit-risk cache.
+
 @router.get("/")
-async def get_dashboard(db: Session = Depends(get_db_session), current_user: User = Depends(get_current_user)):
+async def get_dashboard(db: AsyncSession = Depends(get_async_db_session), current_user: User = Depends(get_current_user_async)):
     """
     Returns a unified set of data for the frontend dashboard.
     """
     user_id = current_user.user_id
     
     # 1. Activities (Logs) - Fetch actual activity types
-    log_repo = ActivityLogRepository(db)
-    all_logs = log_repo.get_user_logs(user_id, limit=10)
+    log_repo = AsyncActivityLogRepository(db)
+    all_logs = await log_repo.get_user_logs(user_id, limit=10)
     
     # Format activities for frontend
     activities = []
@@ -36,17 +51,26 @@ async def get_dashboard(db: Session = Depends(get_db_session), current_user: Use
         })
     
     # 2. User Profile
-    profile_repo = UserProfileRepository(db)
-    profile = profile_repo.get_profile(user_id)
+    profile_repo = AsyncUserProfileRepository(db)
+    profile = await profile_repo.get_profile(user_id)
     
     # 3. Recent Outcomes (Goals)
-    outcome_repo = OutcomeRepository(db)
-    outcomes = outcome_repo.get_user_outcomes(user_id, limit=5)
+    outcome_repo = AsyncOutcomeRepository(db)
+    outcomes = await outcome_repo.get_user_outcomes(user_id, limit=5)
     
     # 4. Analytics (Streak & Onboarding)
-    engine = AnalyticsEngine(db)
-    onboarding = engine.get_onboarding_status(user_id)
-    summary = engine.get_summary_for_period(user_id, days=7)
+    def analytics(session):
+        engine = AnalyticsEngine(session)
+        summary = engine.get_summary_for_period(user_id, days=7)
+        return summary, engine.get_onboarding_status(user_id, summary=summary)
+    summary, onboarding = await db.run_sync(analytics)
+    habit_risk = await db.run_sync(lambda session: get_daily_habit_risk(session, current_user))
+    
+    alignment = score_alignment(
+        profile.focus_areas if profile else None,
+        profile.priority_order if profile else None,
+        summary["activity_distribution"]
+    )
     
     # Calculate Goals Count: Primary Goal (1) + Outcomes
     goals_count = (1 if profile and profile.primary_goal else 0) + len(outcomes)
@@ -65,7 +89,61 @@ async def get_dashboard(db: Session = Depends(get_db_session), current_user: Use
         "onboarding": onboarding,
         "streak": summary["streak_count"],
         "activity_distribution": summary["activity_distribution"],
+        "goal_alignment": alignment,
+        "habit_risk": habit_risk,
         "goals_count": goals_count,
         "last_sync": datetime.utcnow().isoformat(),
         "user_name": current_user.name
     }
+
+@router.get("/trends")
+async def get_trends(
+    days: int = Query(90, ge=7, le=365),
+    window: int = Query(7, ge=2, le=30),
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    Returns multi-week productivity trends (rolling means, volatility,
+    week-over-week deltas and effort-vs-outcome slopes).
+    """
+    return await db.run_sync(lambda session: TrendAnalyzer(session).get_trends(current_user.user_id, days=days, window=window))
+
+@router.get("/summaries")
+async def get_summaries(
+    windows: List[int] = Query([7, 30, 90]),
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    Returns period summaries for several windows (e.g. 7, 30 and 90 days) in one call.
+    """
+    if len(windows) > 6 or any(w < 1 or w > 365 for w in windows):
+        raise HTTPException(status_code=400, detail="Provide up to 6 windows between 1 and 365 days.")
+    summaries = await db.run_sync(lambda session: AnalyticsEngine(session).get_summaries(current_user.user_id, windows=windows))
+    return {str(days): summary for days, summary in summaries.items()}
+
+@router.get("/heatmap")
+async def get_heatmap(
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    Returns a weekday x hour heatmap of logged minutes and average energy,
+    plus the peak focus and energy slots.
+    """
+    return await db.run_sync(lambda session: heatmap_cache.get(session, current_user.user_id))
+
+@router.get("/flags")
+async def get_behavior_flags(
+    days: int = Query(30, ge=1, le=60),
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    Burnout, recovery, anomaly and level-shift periods detected in the current
+    user's daily minutes, energy and completion over the last `days` days.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days)
+    flags = await AsyncBehaviorFlagRepository(db).get_recent_flags(current_user.user_id, since, limit=100)
+    return {"period_days": days, "flags": summarize_flags(flags)}
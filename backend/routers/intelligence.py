@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.db.connection import get_async_db_session, get_async_read_db_session, unit_of_work
+from backend.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor
 from backend.analytics.engine import AnalyticsEngine
-from backend.db.repositories.user_profile_repo import UserProfileRepository
-from backend.db.repositories.activity_log_repo import ActivityLogRepository
-from backend.db.repositories.activity_types_repo import ActivityTypesRepository
+from backend.analytics.alignment import score_alignment
+from backend.ml.registry import model_registry
+from backend.ml.routines import routine_assigner
+from backend.ml.habit_risk import mark_habit_risk_stale
+from backend.ml.features import feature_store
+from backend.analytics.anomalies import detect_for_user, summarize_flags
+from backend.db.repositories.behavior_flag_repo import AsyncBehaviorFlagRepository
+from backend.db.repositories.user_profile_repo import AsyncUserProfileRepository
+from backend.db.repositories.activity_log_repo import AsyncActivityLogRepository
+from backend.db.repositories.activity_types_repo import AsyncActivityTypesRepository
 from backend.agents.supervisor import SupervisorAgent
 import re
 
@@ -13,74 +23,120 @@ router = APIRouter()
 from backend.agents.reasoning import ReasoningAgent
 from backend.agents.reflection import ReflectionAgent
 
-from backend.db.repositories.summary_repo import AnalyticsSummaryRepository
-from backend.db.repositories.chat_repo import ChatRepository
+from backend.db.repositories.summary_repo import AsyncAnalyticsSummaryRepository
+from backend.db.repositories.chat_repo import AsyncChatRepository
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from backend.utils.auth import get_current_user
-from backend.models import User
+from typing import Optional
+from backend.utils.auth import get_current_user_async, get_current_user_read
+from backend.models import User, UserProfile
 
 class QueryRequest(BaseModel):
     query: str
 
+# Handlers run on the async (asyncpg) session. The sync analytics/ML helpers go
+# through db.run_sync, which awaits their queries but still runs their pandas/NumPy
+# work on the event loop; the blocking LLM agent calls go through the threadpool,
+# so a worker keeps serving other requests while they wait.
+
+async def _gather_signals(db: AsyncSession, user_id: int, stats: dict, profile_db) -> dict:
+    """
+    Adds goal alignment, routine archetype and recent behavior flags to `stats`
+    and returns the alignment.
+    """
+    alignment = score_alignment(profile_db.focus_areas, profile_db.priority_order, stats["activity_distribution"])
+    stats["goal_alignment_score"] = alignment["score"]
+    stats["neglected_categories"] = alignment["neglected_categories"]
+    routine = await db.run_sync(lambda session: routine_assigner.get(session, user_id)) if model_registry.is_loaded else None
+    stats["routine_label"] = routine["routine_label"] if routine else None
+    stats["behavior_flags"] = summarize_flags(
+        await AsyncBehaviorFlagRepository(db).get_recent_flags(user_id, datetime.utcnow().date() - timedelta(days=14), limit=5)
+    )
+    return alignment
+
+DEFAULT_PROFILE = {"primary_goal": "Improve productivity", "focus_areas": ["Work", "Learning"]}
+
+async def _save_exchange_start(db: AsyncSession, chat_repo: AsyncChatRepository, profile_repo: AsyncUserProfileRepository,
+                               user_id: int, query: str, create_profile: bool):
+    """
+    First writes of a chat request's unit of work: the default profile if the
+    user had none when the request started, and the user's message.
+    """
+    if create_profile:
+        # A concurrent request may have created the profile meanwhile; keep theirs.
+        # The savepoint covers one that commits between the check and the insert
+        try:
+            async with db.begin_nested():
+                if await profile_repo.get_profile(user_id) is None:
+                    await profile_repo.create_or_update_profile(user_id=user_id, commit=False, **DEFAULT_PROFILE)
+        except IntegrityError:
+            pass
+    await chat_repo.save_message(user_id, "user", query, commit=False)
+
 @router.post("/analyze")
 async def analyze_with_query(
     request: QueryRequest, 
-    db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     POST version of analyze that takes a query from the user.
     """
     user_id = current_user.user_id
     query = request.query
-    
-    # 1. Gather Data & History
-    engine = AnalyticsEngine(db)
-    stats = engine.get_summary_for_period(user_id)
-    
-    summary_repo = AnalyticsSummaryRepository(db)
-    past_summaries = summary_repo.get_latest_summaries(user_id, limit=3)
+    auto_logged = False
+
+    # 1. Gather Data & History (reads only)
+    stats = await db.run_sync(lambda session: AnalyticsEngine(session).get_summary_for_period(user_id))
+
+    summary_repo = AsyncAnalyticsSummaryRepository(db)
+    past_summaries = await summary_repo.get_latest_summaries(user_id, limit=3)
     history = [{"date": s.generated_at.date().isoformat(), "insight": s.key_insight} for s in past_summaries]
 
-    # Save User message to DB and get context
-    chat_repo = ChatRepository(db)
-    chat_repo.save_message(user_id, "user", query)
-    recent_chat = chat_repo.get_recent_context(user_id, limit=6)
+    # Context is the previous messages plus this query, which is saved with the reply
+    chat_repo = AsyncChatRepository(db)
+    recent_chat = await chat_repo.get_recent_context(user_id, limit=5)
     chat_context = [{"role": m.role, "content": m.content} for m in reversed(recent_chat)]
+    chat_context.append({"role": "user", "content": query})
+
+    profile_repo = AsyncUserProfileRepository(db)
+    profile_db = await profile_repo.get_profile(user_id)
+    create_profile = profile_db is None
+    if create_profile:
+        # Default profile to avoid errors; it is stored with the reply
+        profile_db = UserProfile(user_id=user_id, **DEFAULT_PROFILE)
 
-    profile_repo = UserProfileRepository(db)
-    profile_db = profile_repo.get_profile(user_id)
-    if not profile_db:
-        # Create a default profile if it doesn't exist to avoid error
-        profile_db = profile_repo.create_or_update_profile(
-            user_id=user_id,
-            primary_goal="Improve productivity",
-            focus_areas=["Work", "Learning"]
-        )
-    
     profile = {
         "primary_goal": profile_db.primary_goal,
         "focus_areas": profile_db.focus_areas,
         "user_query": query # Pass the query to agents
     }
 
+    alignment = await _gather_signals(db, user_id, stats, profile_db)
+
+    # End the read transaction so no connection or lock is held while the agents run
+    await db.commit()
+
     # 2. Supervisor Gate
     supervisor = SupervisorAgent()
-    check = supervisor.evaluate_data(profile, stats)
-    
+    check = await run_in_threadpool(supervisor.evaluate_data, profile, stats)
+
     if not check.allow_reasoning:
         reasoner = ReasoningAgent()
-        onboarding_msg = reasoner.generate_onboarding_guidance(
+        onboarding_msg = await run_in_threadpool(
+            reasoner.generate_onboarding_guidance,
             check_reason=check.reason, 
             query=query,
             analytics=stats,
             history=history,
             chat_context=chat_context
         )
-        # Save AI message to DB
-        chat_repo.save_message(user_id, "ai", onboarding_msg)
-        
+        async with unit_of_work(db):
+            await _save_exchange_start(db, chat_repo, profile_repo, user_id, query, create_profile)
+            # Save AI message to DB
+            await chat_repo.save_message(user_id, "ai", onboarding_msg, commit=False)
+
         return {
             "status": "DATA_INSUFFICIENT",
             "message": onboarding_msg,
@@ -89,81 +145,102 @@ async def analyze_with_query(
 
     # 3. Reasoning Phase (With History, Chat Context and Query)
     reasoner = ReasoningAgent()
-    draft = reasoner.generate_guidance(profile, stats, historical_summaries=history, chat_context=chat_context)
+    draft = await run_in_threadpool(reasoner.generate_guidance, profile, stats, historical_summaries=history, chat_context=chat_context)
 
     # 4. Reflection Phase (Audit)
     reflector = ReflectionAgent()
-    audit = reflector.review_response(draft, profile)
+    audit = await run_in_threadpool(reflector.review_response, draft, profile)
 
     # 5. Final Output Logic
     if audit.decision == "REJECT":
+        async with unit_of_work(db):
+            await _save_exchange_start(db, chat_repo, profile_repo, user_id, query, create_profile)
         return {"status": "INTERNAL_ERROR", "message": "The AI response failed safety checks."}
-    
+
     final_response = audit.suggested_revision if audit.decision == "SOFTEN" else draft
 
-    # 6. Auto-Logging Detection (The "Magic" Link)
-    try:
-        auto_log_match = re.search(r"\[AUTO_LOG: (.*?), (\d+), (.*?)\]", final_response)
-        if auto_log_match:
-            act_name = auto_log_match.group(1).strip()
-            act_duration = int(auto_log_match.group(2).strip())
-            act_notes = auto_log_match.group(3).strip()
+    # All writes of the request (messages, profile, auto-log, summary) commit together
+    async with unit_of_work(db):
+        await _save_exchange_start(db, chat_repo, profile_repo, user_id, query, create_profile)
+
+        # 6. Auto-Logging Detection (The "Magic" Link)
+        try:
+            auto_log_match = re.search(r"\[AUTO_LOG: (.*?), (\d+), (.*?)\]", final_response)
+            if auto_log_match:
+                act_name = auto_log_match.group(1).strip()
+                act_duration = int(auto_log_match.group(2).strip())
+                act_notes = auto_log_match.group(3).strip()
             
-            # Clean the visible response from the technical tag
-            final_response = final_response.replace(auto_log_match.group(0), "").strip()
+                # Clean the visible response from the technical tag
+                final_response = final_response.replace(auto_log_match.group(0), "").strip()
             
-            # Save Log automatically
-            types_repo = ActivityTypesRepository(db)
-            log_repo = ActivityLogRepository(db)
-            act_type = types_repo.get_activity_type_by_name(act_name)
+                # Save Log automatically
+                types_repo = AsyncActivityTypesRepository(db)
+                log_repo = AsyncActivityLogRepository(db)
+                act_type = await types_repo.get_activity_type_by_name(act_name)
             
-            # If not found exactly, try fuzzy matching or default to 'Personal'
-            if not act_type:
-                act_type = types_repo.get_activity_type_by_name("Personal")
-
-            if act_type:
-                log_repo.create_log(
-                    user_id=user_id,
-                    activity_id=act_type.activity_id,
-                    date=datetime.utcnow(),
-                    duration_minutes=act_duration,
-                    notes=f"(Chat-Sync) {act_notes}",
-                    completed=True
-                )
-    except Exception as e:
-        print(f"Auto-log parsing failed: {e}")
-
-    # 7. Profile Update Detection
-    try:
-        profile_match = re.search(r"\[UPDATE_PROFILE: (.*?), (.*?)\]", final_response)
-        if profile_match:
-            new_goal = profile_match.group(1).strip()
-            new_focus = profile_match.group(2).strip()
+                # If not found exactly, try fuzzy matching or default to 'Personal'
+                if not act_type:
+                    act_type = await types_repo.get_activity_type_by_name("Personal")
+
+                if act_type:
+                    # A savepoint, so a failed auto-log does not undo the rest of the request
+                    async with db.begin_nested():
+                        await log_repo.create_log(
+                            user_id=user_id,
+                            activity_id=act_type.activity_id,
+                            date=datetime.utcnow(),
+                            commit=False,
+                            duration_minutes=act_duration,
+                            notes=f"(Chat-Sync) {act_notes}",
+                            completed=True
+                        )
+                        await db.run_sync(lambda session: mark_habit_risk_stale(session, user_id, datetime.utcnow().date(), commit=False))
+                    auto_logged = True
+        except Exception as e:
+            print(f"Auto-log parsing failed: {e}")
+
+        # 7. Profile Update Detection
+        try:
+            profile_match = re.search(r"\[UPDATE_PROFILE: (.*?), (.*?)\]", final_response)
+            if profile_match:
+                new_goal = profile_match.group(1).strip()
+                new_focus = profile_match.group(2).strip()
             
-            # Clean the visible response
-            final_response = final_response.replace(profile_match.group(0), "").strip()
+                # Clean the visible response
+                final_response = final_response.replace(profile_match.group(0), "").strip()
             
-            update_data = {}
-            if new_goal: update_data["primary_goal"] = new_goal
-            if new_focus: update_data["focus_areas"] = [f.strip() for f in new_focus.split(",")]
+                update_data = {}
+                if new_goal: update_data["primary_goal"] = new_goal
+                if new_focus: update_data["focus_areas"] = [f.strip() for f in new_focus.split(",")]
             
-            if update_data:
-                profile_repo.create_or_update_profile(user_id=user_id, **update_data)
-    except Exception as e:
-        print(f"Profile update parsing failed: {e}")
-
-    # Save to history
-    summary_repo.create_summary(
-        user_id=user_id,
-        period_type="query_response",
-        period_start=datetime.utcnow(),
-        period_end=datetime.utcnow(),
-        focus_distribution=stats.get("activity_distribution"),
-        key_insight=final_response
-    )
+                if update_data:
+                    async with db.begin_nested():
+                        await profile_repo.create_or_update_profile(user_id=user_id, commit=False, **update_data)
+        except Exception as e:
+            print(f"Profile update parsing failed: {e}")
+
+        # Save to history
+        await summary_repo.create_summary(
+            user_id=user_id,
+            period_type="query_response",
+            period_start=datetime.utcnow(),
+            period_end=datetime.utcnow(),
+            focus_distribution=stats.get("activity_distribution"),
+            activity_balance=alignment["balance"],
+            goal_alignment=str(alignment["score"]) if alignment["score"] is not None else None,
+            key_insight=final_response,
+            commit=False
+        )
+
+        # Save AI response to DB
+        await chat_repo.save_message(user_id, "ai", final_response, commit=False)
 
-    # Save AI response to DB
-    chat_repo.save_message(user_id, "ai", final_response)
+    # The cached rollup is dropped only after the auto-log is committed, so a
+    # concurrent read cannot cache it again without the new log
+    if auto_logged:
+        feature_store.invalidate(user_id)
+        background_tasks.add_task(detect_for_user, user_id)
 
     return {
         "status": "SUCCESS",
@@ -173,22 +250,21 @@ async def analyze_with_query(
     }
 
 @router.get("/analyze/{user_id}")
-async def analyze_user_data(user_id: int, db: Session = Depends(get_db_session)):
+async def analyze_user_data(user_id: int, db: AsyncSession = Depends(get_async_db_session)):
     """
     Full Multi-Agent Pipeline: 
     Supervisor (Gate) -> Reasoning (Brain) -> Reflection (Auditor)
     Now with Historical Memory.
     """
     # 1. Gather Data & History
-    engine = AnalyticsEngine(db)
-    stats = engine.get_summary_for_period(user_id)
+    stats = await db.run_sync(lambda session: AnalyticsEngine(session).get_summary_for_period(user_id))
     
-    summary_repo = AnalyticsSummaryRepository(db)
-    past_summaries = summary_repo.get_latest_summaries(user_id, limit=3)
+    summary_repo = AsyncAnalyticsSummaryRepository(db)
+    past_summaries = await summary_repo.get_latest_summaries(user_id, limit=3)
     history = [{"date": s.generated_at.date().isoformat(), "insight": s.key_insight} for s in past_summaries]
 
-    profile_repo = UserProfileRepository(db)
-    profile_db = profile_repo.get_profile(user_id)
+    profile_repo = AsyncUserProfileRepository(db)
+    profile_db = await profile_repo.get_profile(user_id)
     if not profile_db:
         raise HTTPException(status_code=400, detail="User profile missing.")
     
@@ -197,9 +273,14 @@ async def analyze_user_data(user_id: int, db: Session = Depends(get_db_session))
         "focus_areas": profile_db.focus_areas
     }
 
+    alignment = await _gather_signals(db, user_id, stats, profile_db)
+
+    # End the read transaction so no connection or lock is held while the agents run
+    await db.commit()
+
     # 2. Supervisor Gate
     supervisor = SupervisorAgent()
-    check = supervisor.evaluate_data(profile, stats)
+    check = await run_in_threadpool(supervisor.evaluate_data, profile, stats)
     
     if not check.allow_reasoning:
         return {
@@ -210,11 +291,11 @@ async def analyze_user_data(user_id: int, db: Session = Depends(get_db_session))
 
     # 3. Reasoning Phase (With History)
     reasoner = ReasoningAgent()
-    draft = reasoner.generate_guidance(profile, stats, historical_summaries=history)
+    draft = await run_in_threadpool(reasoner.generate_guidance, profile, stats, historical_summaries=history)
 
     # 4. Reflection Phase (Audit)
     reflector = ReflectionAgent()
-    audit = reflector.review_response(draft, profile)
+    audit = await run_in_threadpool(reflector.review_response, draft, profile)
 
     # 5. Final Output Logic & Saving Memory
     if audit.decision == "REJECT":
@@ -223,14 +304,18 @@ async def analyze_user_data(user_id: int, db: Session = Depends(get_db_session))
     final_response = audit.suggested_revision if audit.decision == "SOFTEN" else draft
 
     # Auto-save this insight as a new summary (Memory for next time)
-    summary_repo.create_summary(
-        user_id=user_id,
-        period_type="weekly",
-        period_start=datetime.utcnow() - timedelta(days=7),
-        period_end=datetime.utcnow(),
-        focus_distribution=stats.get("activity_distribution"),
-        key_insight=final_response
-    )
+    async with unit_of_work(db):
+        await summary_repo.create_summary(
+            user_id=user_id,
+            period_type="weekly",
+            period_start=datetime.utcnow() - timedelta(days=7),
+            period_end=datetime.utcnow(),
+            focus_distribution=stats.get("activity_distribution"),
+            activity_balance=alignment["balance"],
+            goal_alignment=str(alignment["score"]) if alignment["score"] is not None else None,
+            key_insight=final_response,
+            commit=False
+        )
 
     return {
         "status": "SUCCESS",
@@ -241,12 +326,24 @@ async def analyze_user_data(user_id: int, db: Session = Depends(get_db_session))
 
 @router.get("/history")
 async def get_chat_history(
-    db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User = Depends(get_current_user_read)
 ):
-    """Returns the chat history for the current user."""
-    chat_repo = ChatRepository(db)
-    messages = chat_repo.get_history(current_user.user_id)
+    """
+    Returns the latest chat messages for the current user, oldest first. The
+    X-Next-Cursor response header, passed back as `cursor`, pages to older
+    messages, including archived months.
+    """
+    chat_repo = AsyncChatRepository(db)
+    try:
+        messages, next_cursor = await chat_repo.get_history_page(current_user.user_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
             "id": str(m.message_id),
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from backend.db.connection import get_db_session
+from backend.ml.features import build_user_features, feature_store
+from backend.ml.registry import model_registry
+from backend.ml.routines import routine_assigner
+from backend.db.repositories.user_score_repo import UserScoreRepository
+from backend.utils.auth import get_current_user
+from backend.models import User
+
+router = APIRouter()
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    # Batch score columns are NULL when a model had no input for the user
+    return None if value is None else round(value, digits)
+
+@router.get("/score")
+async def score_current_user(
+    live: bool = False,
+    days: int = Query(7, ge=1, le=90),
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns the current user's model scores. Scores precomputed by the nightly
+    batch (python -m backend.ml.batch) are served as-is; `live=true`, or a user
+    the batch has not scored over `days`, computes them from recent activity logs.
+    These are behavioral signals for the reasoning layer, not final judgements.
+    """
+    if not live:
+        stored = UserScoreRepository(db).get_score(current_user.user_id)
+        if stored and stored.period_days == days:
+            return {
+                "source": "batch",
+                "scored_at": stored.scored_at.isoformat(),
+                "period_days": stored.period_days,
+                "features": stored.features,
+                "scores": {
+                    "productivity_score": _round(stored.productivity_score, 2),
+                    "study_performance": _round(stored.study_performance, 2),
+                    "habit_risk": _round(stored.habit_risk, 4),
+                    "routine_cluster": stored.routine_cluster,
+                    "routine_label": stored.routine_label
+                }
+            }
+
+    if not model_registry.is_loaded:
+        raise HTTPException(status_code=503, detail="ML models are not loaded.")
+
+    features = build_user_features(db, current_user.user_id, days=days)
+    if features is None:
+        raise HTTPException(status_code=400, detail="No activity logged in this period.")
+
+    cluster = model_registry.assign_routine_cluster(features.routine)
+    return {
+        "source": "live",
+        "period_days": days,
+        "features": features.model_dump(),
+        "scores": {
+            "productivity_score": round(model_registry.predict_productivity(features.productivity), 2),
+            "study_performance": round(model_registry.predict_study_performance(features.study), 2),
+            "habit_risk": round(model_registry.predict_habit_risk(features.habit), 4),
+            "routine_cluster": cluster,
+            "routine_label": model_registry.cluster_labels.get(cluster)
+        }
+    }
+
+@router.get("/routine")
+async def get_routine(
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The current user's routine archetype over the last 7 days. Kept up to date
+    as logs arrive and only recomputed when their activity rollup changes.
+    """
+    if not model_registry.is_loaded:
+        raise HTTPException(status_code=503, detail="ML models are not loaded.")
+    routine = routine_assigner.get(db, current_user.user_id)
+    if routine is None:
+        raise HTTPException(status_code=400, detail="No activity logged in this period.")
+    return routine
+
+@router.get("/features/weekly")
+async def get_weekly_features(
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Weekly features for the current user in the time_features.csv schema.
+    """
+    weekly = feature_store.weekly_features(db, current_user.user_id)
+    return [
+        {"week_start": week.date().isoformat(), **{k: round(float(v), 4) for k, v in row.items()}}
+        for (_, week), row in weekly.iterrows()
+    ]
+
+@router.get("/metrics")
+async def get_ml_metrics(current_user: User = Depends(get_current_user)):
+    """Model load times, per-model prediction latency and routine centroid state for this worker."""
+    return {**model_registry.metrics(), "routines": routine_assigner.stats()}
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session
+from backend.db.connection import get_db_session, get_read_db_session
+from backend.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor
 from backend.db.repositories.outcome_repo import OutcomeRepository
+from backend.ml.habit_risk import mark_habit_risk_stale
 from backend.models import OutcomeType
 from pydantic import BaseModel
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 router = APIRouter()
 
@@ -19,15 +21,56 @@ class OutcomeCreate(BaseModel):
 @router.post("/")
 async def create_outcome(outcome_data: OutcomeCreate, db: Session = Depends(get_db_session)):
     repo = OutcomeRepository(db)
-    return repo.create_outcome(
+    outcome = repo.create_outcome(
         user_id=outcome_data.user_id,
         date=outcome_data.date,
         outcome_type=outcome_data.outcome_type,
         outcome_value=outcome_data.outcome_value,
         related_activity_id=outcome_data.related_activity_id
     )
+    mark_habit_risk_stale(db, outcome_data.user_id, outcome_data.date)
+    return outcome
 
 @router.get("/{user_id}")
-async def get_outcomes(user_id: int, db: Session = Depends(get_db_session)):
+async def get_outcomes(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Newest-first page of the user's outcomes. Pass the X-Next-Cursor response
+    header back as `cursor` for the next page; it is absent on the last page.
+    """
     repo = OutcomeRepository(db)
-    return repo.get_user_outcomes(user_id)
+    try:
+        outcomes, next_cursor = repo.get_user_outcomes_page(user_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return outcomes
+
+@router.get("/{user_id}/stats")
+async def get_outcome_stats(
+    user_id: int,
+    days: int = Query(90, ge=1, le=365),
+    outcome_type: Optional[OutcomeType] = None,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Numeric outcome analytics computed in the database: per-type averages,
+    trend slopes, effort correlations and an optional daily series for one type.
+    """
+    repo = OutcomeRepository(db)
+    since = datetime.utcnow() - timedelta(days=days)
+    stats = {
+        "period_days": days,
+        "averages": repo.get_type_averages(user_id, since),
+        "trend_per_day": repo.get_trend_slopes(user_id, since),
+        "effort_correlation": repo.get_effort_correlations(user_id, since)
+    }
+    if outcome_type:
+        stats["daily"] = repo.get_daily_trend(user_id, outcome_type, since)
+    return stats
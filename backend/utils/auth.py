@@ -22,8 +22,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.db.connection import get_db_session
+from backend.db.connection import AsyncSessionLocal, get_db_session, get_async_db_session, get_async_read_db_session
 from backend.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -57,3 +58,43 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     print(f"DEBUG: User found: {user.email}")
     return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db_session)):
+    """
+    get_current_user for handlers on the async session: the user is loaded
+    through the same AsyncSession the handler receives.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+    user = await db.get(User, int(payload["sub"]))
+    if user is None:
+        raise credentials_exception
+    return user
+
+async def get_current_user_read(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_read_db_session)):
+    """
+    get_current_user_async for read-only handlers: the user is loaded through
+    the read session, and from the primary if the replica does not have the
+    account yet (it was just registered).
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+    user = await db.get(User, int(payload["sub"]))
+    if user is None:
+        async with AsyncSessionLocal() as primary:
+            user = await primary.get(User, int(payload["sub"]))
+    if user is None:
+        raise credentials_exception
+    return user
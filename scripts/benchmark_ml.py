@@ -0,0 +1,231 @@
+"""
+Benchmarks for ML feature building and inference.
+
+Times, at several synthetic data sizes:
+  - feature extraction from activity_log aggregates (rollup pivot, 7-day window
+    features and weekly time features, as used by backend.ml.features)
+  - single-user inference per model (one pydantic feature row per call)
+  - batch inference per model (one matrix per call)
+  - model load time from the JSON artifacts and from the pickles
+
+No database is needed: synthetic rows have the shape returned by the
+load_daily_rollups query. Results are written as JSON so runs can be compared.
+
+    python scripts/benchmark_ml.py --sizes 100,1000,10000 --output bench.json
+    python scripts/benchmark_ml.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from backend.ml.features import (
+    CATEGORIES, ProductivityFeatures, StudyFeatures, HabitFeatures, RoutineFeatures,
+    rollups_from_rows, window_features, weekly_time_features
+)
+from backend.ml.registry import ModelRegistry, MODELS_DIR, MODEL_FILES, FEATURE_ORDER
+
+FEATURE_MODELS = {
+    "productivity": ProductivityFeatures,
+    "study_performance": StudyFeatures,
+    "habit_risk": HabitFeatures,
+    "routine_cluster": RoutineFeatures,
+}
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Runs `fn` once to warm up, then `repeat` times; returns timings in milliseconds.
+    """
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def synthetic_log_rows(users: int, days: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Per (user_id, day, category) aggregates like the load_daily_rollups query returns:
+    each user logs on ~70% of days, in 1-3 categories per day.
+    """
+    rng = np.random.default_rng(seed)
+    end = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    day_index = np.array([end - timedelta(days=d) for d in range(days)], dtype="datetime64[ns]")
+
+    user_ids = np.repeat(np.arange(1, users + 1), days)
+    day_values = np.tile(day_index, users)
+    active = rng.random(len(user_ids)) < 0.7
+    user_ids, day_values = user_ids[active], day_values[active]
+
+    per_day = rng.integers(1, 4, size=len(user_ids))
+    user_ids = np.repeat(user_ids, per_day)
+    day_values = np.repeat(day_values, per_day)
+    logs = rng.integers(1, 4, size=len(user_ids))
+    completed = rng.binomial(logs, 0.7)
+    planned = rng.binomial(logs, 0.5)
+    frame = pd.DataFrame({
+        "user_id": user_ids,
+        "day": day_values,
+        "category": np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), size=len(user_ids))],
+        "minutes": rng.integers(10, 240, size=len(user_ids)),
+        "logs": logs,
+        "completed": completed,
+        "planned": planned,
+        "planned_completed": np.minimum(planned, completed),
+    })
+    # A user cannot have two rows for the same day and category
+    return frame.drop_duplicates(["user_id", "day", "category"], ignore_index=True)
+
+
+def bench_features(users: int, days: int, repeat: int) -> Dict[str, Any]:
+    rows = synthetic_log_rows(users, days)
+    daily = rollups_from_rows(rows)
+    return {
+        "users": users,
+        "days": days,
+        "aggregate_rows": len(rows),
+        "rollup_rows": len(daily),
+        "rollup_pivot": time_call(lambda: rollups_from_rows(rows), repeat),
+        "window_features_7d": time_call(lambda: window_features(daily, 7), repeat),
+        "weekly_time_features": time_call(lambda: weekly_time_features(daily), repeat),
+    }
+
+
+def bench_model_load(models_dir: str, repeat: int) -> Dict[str, Any]:
+    import joblib
+
+    def load_json():
+        ModelRegistry(models_dir).load()
+
+    result = {"registry_json": time_call(load_json, repeat)}
+    for name, basename in MODEL_FILES.items():
+        path = os.path.join(models_dir, basename + ".pkl")
+        if os.path.exists(path):
+            result[f"pickle:{name}"] = time_call(lambda: joblib.load(path), repeat)
+    return result
+
+
+def bench_inference(registry: ModelRegistry, sizes: List[int], repeat: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(1)
+    single = {
+        "productivity": registry.predict_productivity,
+        "study_performance": registry.predict_study_performance,
+        "habit_risk": registry.predict_habit_risk,
+        "routine_cluster": registry.assign_routine_cluster,
+    }
+    result: Dict[str, Any] = {"single": {}, "batch": {}}
+    for name, predict in single.items():
+        features = FEATURE_MODELS[name](**{f: float(v) for f, v in zip(FEATURE_ORDER[name], rng.uniform(0, 500, len(FEATURE_ORDER[name])))})
+        result["single"][name] = time_call(lambda: predict(features), repeat * 10)
+
+    for rows in sizes:
+        batch = {}
+        for name in MODEL_FILES:
+            X = rng.uniform(0, 500, size=(rows, len(FEATURE_ORDER[name])))
+            timing = time_call(lambda: registry.predict_batch(name, X), repeat)
+            timing["rows_per_second"] = round(rows / (timing["median_ms"] / 1000), 1) if timing["median_ms"] else None
+            batch[name] = timing
+        result["batch"][str(rows)] = batch
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]):
+    if isinstance(value, dict):
+        if "median_ms" in value:
+            out[prefix] = value["median_ms"]
+            return
+        for k, v in value.items():
+            _flatten(f"{prefix}/{k}" if prefix else str(k), v, out)
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Median-time ratios (current / previous) for every benchmark present in both runs.
+    """
+    before, after = {}, {}
+    _flatten("", previous["results"], before)
+    _flatten("", current["results"], after)
+    lines = []
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] else float("nan")
+        lines.append(f"{key:<60}{before[key]:>12.3f}{after[key]:>12.3f}{ratio:>8.2f}x")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ML feature building, inference and model loading.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma separated user counts / batch sizes")
+    parser.add_argument("--days", type=int, default=28, help="days of synthetic history per user")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--output", default="ml_benchmark.json")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    registry = ModelRegistry(args.models_dir)
+    registry.load()
+
+    results = {
+        "model_load": bench_model_load(args.models_dir, args.repeat),
+        "features": {str(n): bench_features(n, args.days, args.repeat) for n in sizes},
+        "inference": bench_inference(registry, sizes, args.repeat),
+    }
+    run = {"environment": environment(), "config": vars(args), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+
+    flat: Dict[str, float] = {}
+    _flatten("", results, flat)
+    for key, median in flat.items():
+        print(f"{key:<60}{median:>12.3f} ms")
+    print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\n{'benchmark (median ms)':<60}{'previous':>12}{'current':>12}{'ratio':>9}")
+        print("\n".join(compare(previous, run)))
+
+
+if __name__ == "__main__":
+    main()
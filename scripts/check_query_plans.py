@@ -0,0 +1,143 @@
+"""
+EXPLAIN check for the per-user hot queries.
+
+Runs each repository call against the configured database, captures the SQL it
+issues and EXPLAINs it with sequential and bitmap scans disabled. On a small dev
+database the planner would otherwise prefer those regardless of indexes; with
+them off it has to choose the index that serves both the user filter and the
+time ordering. Scans of a partition (chat_message is partitioned by month) are
+reported under the parent table and index. Exits with status 1 if a query
+still scans its table or uses another index.
+
+    python scripts/check_query_plans.py [--user-id 1] [--verbose]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.analytics.engine import AnalyticsEngine
+from backend.db.connection import engine
+from backend.db.pagination import encode_cursor
+from backend.db.repositories.activity_log_repo import ActivityLogRepository
+from backend.db.repositories.chat_repo import ChatRepository
+from backend.db.repositories.outcome_repo import OutcomeRepository
+from backend.db.repositories.summary_repo import AnalyticsSummaryRepository
+
+# Keyset pages are checked past a cursor so the (time, id) predicate is part of the plan
+CURSOR = encode_cursor(datetime(2100, 1, 1), 2 ** 31 - 1)
+
+# (description, table, expected index, repository call)
+CHECKS: List[Tuple[str, str, str, Callable[[Session, int], Any]]] = [
+    ("recent activity logs", "activity_log", "ix_activity_log_user_created",
+     lambda db, u: ActivityLogRepository(db).get_user_logs(u, limit=10)),
+    ("activity log page", "activity_log", "ix_activity_log_user_created",
+     lambda db, u: ActivityLogRepository(db).get_user_logs_page(u, 50, CURSOR)),
+    ("activity logs for a period", "activity_log", "ix_activity_log_user_date",
+     lambda db, u: AnalyticsEngine(db).get_user_streak(u)),
+    ("chat context", "chat_message", "ix_chat_message_user_timestamp",
+     lambda db, u: ChatRepository(db).get_recent_context(u, limit=6)),
+    ("chat history page", "chat_message", "ix_chat_message_user_timestamp",
+     lambda db, u: ChatRepository(db).get_history_page(u, 50, CURSOR)),
+    ("latest summaries", "analytics_summary", "ix_analytics_summary_user_generated",
+     lambda db, u: AnalyticsSummaryRepository(db).get_latest_summaries(u, limit=3)),
+    ("recent outcomes", "outcome", "ix_outcome_user_date",
+     lambda db, u: OutcomeRepository(db).get_user_outcomes(u, limit=5)),
+    ("outcome page", "outcome", "ix_outcome_user_date",
+     lambda db, u: OutcomeRepository(db).get_user_outcomes_page(u, 50, CURSOR)),
+]
+
+
+def _scans(plan: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """(node type, relation, index) for every scan node in an EXPLAIN (FORMAT JSON) plan."""
+    found = []
+    if "Relation Name" in plan:
+        index = plan.get("Index Name")
+        if plan["Node Type"] == "Bitmap Heap Scan":
+            # The index is named on the Bitmap Index Scan below it
+            index = ",".join(p["Index Name"] for p in plan.get("Plans", []) if "Index Name" in p) or None
+        found.append((plan["Node Type"], plan["Relation Name"], index))
+    for child in plan.get("Plans", []):
+        found.extend(_scans(child))
+    return found
+
+
+def _partition_roots(cursor, names: List[str]) -> Dict[str, str]:
+    """Maps each partition or partition index name to its partitioned parent; other names map to themselves."""
+    cursor.execute(
+        "SELECT name, COALESCE(pg_partition_root(CAST(name AS regclass))::text, name) FROM unnest(%s) AS name",
+        (names,)
+    )
+    return dict(cursor.fetchall())
+
+
+def explain_call(call: Callable[[Session, int], Any], user_id: int) -> List[Tuple[str, str, str]]:
+    """
+    Runs `call` and returns (node type, table, index) for every scan in the
+    plans of the statements it executed.
+    """
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        conn.exec_driver_sql("SET enable_bitmapscan = off")
+        db = Session(bind=conn)
+        event.listen(conn, "before_cursor_execute", capture)
+        try:
+            call(db, user_id)
+        finally:
+            event.remove(conn, "before_cursor_execute", capture)
+            db.close()
+
+        cursor = conn.connection.cursor()
+        scans = []
+        for statement, parameters in captured:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans.extend(_scans(plan[0]["Plan"]))
+        names = {rel for _, rel, _ in scans} | {i for _, _, idx in scans if idx for i in idx.split(",")}
+        roots = _partition_roots(cursor, sorted(names))
+        cursor.close()
+        conn.rollback()
+    return [(node, roots[rel], idx and ",".join(roots[i] for i in idx.split(","))) for node, rel, idx in scans]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the per-user hot queries use their indexes.")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="print every scan node")
+    args = parser.parse_args()
+
+    failures = 0
+    for description, table, index, call in CHECKS:
+        scans = explain_call(call, args.user_id)
+        on_table = [s for s in scans if s[1] == table]
+        ok = bool(on_table) and all(s[2] == index for s in on_table)
+        failures += not ok
+        # One entry per distinct scan; a partitioned table repeats it for every partition read
+        used = ", ".join(dict.fromkeys(f"{node} ({idx or 'no index'})" for node, _, idx in on_table)) or "table not scanned"
+        print(f"{'✅' if ok else '❌'} {description:<28} {table:<18} expected {index}: {used}")
+        if args.verbose:
+            for node, relation, idx in scans:
+                print(f"      {node} on {relation}" + (f" using {idx}" if idx else ""))
+
+    if failures:
+        print(f"❌ {failures} of {len(CHECKS)} queries do not use their index (run `alembic upgrade head`?)")
+        sys.exit(1)
+    print(f"✅ All {len(CHECKS)} queries use their (user_id, time) index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import pytest
+
+from backend.analytics.alignment import map_to_category, score_alignment
+
+
+@pytest.mark.parametrize("area, category", [
+    ("Workout", "Health"),
+    ("Gym workouts", "Health"),
+    ("Fitness & Workouts", "Health"),
+    ("Homework", "Academic"),
+    ("Work", "Work"),
+    ("Deep work", "Work"),
+    ("Learning", "Academic"),
+    ("Networking", None),
+])
+def test_map_to_category_matches_whole_words(area, category):
+    assert map_to_category(area) == category
+
+
+def test_workout_focus_aligns_with_health_minutes():
+    result = score_alignment(["Workout"], None, {"Health": 300})
+    assert result["score"] == 100.0
+    assert result["neglected_categories"] == []